@@ -0,0 +1,122 @@
+"""Compare Python overhead of GL calls per draw in debug and release GRAPHICS_MODE (see utils.gl_config)
+
+Each mode runs in its own process (PyOpenGL reads its flags at the first import), with the offscreen backend:
+
+- calls: the GL calls of drawing one PHONG object (program, VAO, model matrix, material color, draw of 3 vertices)
+  called --calls times through the functions RenderManager uses, microseconds per call
+- scene: the table scene in hierarchy mode without instancing for --frames frames,
+  time of RenderManager.flush per draw call. It includes the work of the driver, which is large with
+  a software driver (llvmpipe), even with the small framebuffer (--size)
+
+usage (in Project2 directory): python -m bench.gl_overhead [--calls 20000] [--frames 300]
+"""
+import os, sys, time, json
+import argparse
+import subprocess
+
+
+def measure(args):
+    import glm
+    import utils
+    import utils.core.render_manager as render_manager
+    from utils.shader import phong_shader
+    from main import MainContext
+    
+    manager = utils.GraphicsManager(args.size, args.size, "gl overhead", 60)
+    manager.renderer.use_instancing = False
+    manager.set_pacing_mode(utils.PacingMode.UNCAPPED)
+    context = MainContext(manager)
+    utils.asset_loader.flush()
+    manager.set_hierarchy_mode()
+    
+    # draw calls of one object, the same as RenderManager.draw_packet
+    gl = render_manager
+    program = phong_shader.program
+    VAO = context.table.draw_info().VAO
+    M_loc, color_loc = phong_shader.get_uniform_loc("M"), phong_shader.get_uniform_loc("material_color")
+    M = glm.mat4()
+    calls = [
+        ("glUseProgram", lambda: gl.glUseProgram(program)),
+        ("glBindVertexArray", lambda: gl.glBindVertexArray(VAO)),
+        ("glUniformMatrix4fv", lambda: gl.glUniformMatrix4fv(M_loc, 1, gl.GL_FALSE, glm.value_ptr(M))),
+        ("glUniform3f", lambda: gl.glUniform3f(color_loc, 0.5, 0.5, 0.5)),
+        ("glDrawArrays", lambda: gl.glDrawArrays(gl.GL_TRIANGLES, 0, 3)),
+    ]
+    
+    call_us = {}
+    for name, call in calls:
+        start = time.perf_counter()
+        for _ in range(args.calls):
+            call()
+        call_us[name] = (time.perf_counter() - start) / args.calls * 1e6
+        gl.glFinish()
+    
+    def draw():
+        gl.glUseProgram(program)
+        gl.glBindVertexArray(VAO)
+        gl.glUniformMatrix4fv(M_loc, 1, gl.GL_FALSE, glm.value_ptr(M))
+        gl.glUniform3f(color_loc, 0.5, 0.5, 0.5)
+        gl.glDrawArrays(gl.GL_TRIANGLES, 0, 3)
+    
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        draw()
+    draw_us = (time.perf_counter() - start) / args.calls * 1e6
+    
+    manager.backend.max_frames = 30
+    manager.run(context)
+    utils.profiler.enabled = True
+    utils.profiler.clear(args.frames)
+    manager.backend.max_frames = args.frames
+    manager.run(context)
+    phases = utils.profiler.to_dict()
+    draw_calls = manager.renderer.stats.draw_calls
+    manager.exit()
+    
+    return {
+        "mode": utils.GL_MODE,
+        "raw_functions": len(manager.raw_functions),
+        "call_us": call_us,
+        "draw_us": draw_us,
+        "frame_ms": phases["frame"]["mean_ms"],
+        "render_ms": phases["render"]["mean_ms"],
+        "draw_calls": draw_calls,
+        "render_us_per_draw": phases["render"]["mean_ms"] * 1000 / max(1, draw_calls)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--size", type=int, default=16, help="width and height of the framebuffer, small so drawing on the GPU (or llvmpipe) takes little time")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        print(json.dumps(measure(args)))
+        return
+    
+    results = {}
+    for mode in ["debug", "release"]:
+        env = dict(os.environ, GRAPHICS_MODE=mode, GRAPHICS_BACKEND="offscreen")
+        out = subprocess.run(
+            [sys.executable, "-m", "bench.gl_overhead", "--child", "--calls", str(args.calls), "--frames", str(args.frames), "--size", str(args.size)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        results[mode] = json.loads(out.strip().splitlines()[-1])
+    
+    debug, release = results["debug"], results["release"]
+    print(f"release binds {release['raw_functions']} raw GL functions")
+    print(f"{'':<28}{'debug us':>10}{'release us':>12}{'speedup':>9}")
+    for name in debug["call_us"]:
+        d, r = debug["call_us"][name], release["call_us"][name]
+        print(f"{name:<28}{d:>10.2f}{r:>12.2f}{d / r:>8.1f}x")
+    d, r = debug["draw_us"], release["draw_us"]
+    print(f"{'calls of one draw':<28}{d:>10.2f}{r:>12.2f}{d / r:>8.1f}x")
+    d, r = debug["render_us_per_draw"], release["render_us_per_draw"]
+    print(f"{'flush per draw (scene)':<28}{d:>10.2f}{r:>12.2f}{d / r:>8.1f}x")
+    print(f"scene: {debug['draw_calls']} draw calls per frame, frame {debug['frame_ms']:.3f}ms -> {release['frame_ms']:.3f}ms")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""Report how much the indexed mesh mode of from_obj_file reduces the vertex buffers
+
+usage (in Project2 directory): python -m bench.mesh_index [model_dir]
+"""
+import os, sys, glob
+import argparse
+
+from utils.object import VertexObjectHelper, MeshCache
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("model_dir", nargs="?", default=os.path.join(".", "models"))
+    args = parser.parse_args()
+    
+    MeshCache.enabled = False
+    
+    file_paths = sorted(glob.glob(os.path.join(args.model_dir, "**", "*.obj"), recursive=True))
+    if len(file_paths) == 0:
+        print(f"No .obj file in {args.model_dir}")
+        sys.exit(1)
+    
+    print(f"{'model':<20}{'soup verts':>12}{'indexed verts':>15}{'reduction':>11}{'soup KiB':>11}{'VBO+EBO KiB':>13}")
+    
+    total_soup, total_indexed, total_soup_bytes, total_indexed_bytes = 0, 0, 0, 0
+    for file_path in file_paths:
+        soup = VertexObjectHelper.from_obj_file(file_path, print_info=False, indexed=False)
+        indexed = VertexObjectHelper.from_obj_file(file_path, print_info=False, indexed=True)
+        
+        soup_bytes = soup.vertices_arr.nbytes
+        indexed_bytes = indexed.vertices_arr.nbytes + indexed.indices_arr.nbytes # type: ignore
+        
+        total_soup += soup.vertices_num
+        total_indexed += indexed.vertices_num
+        total_soup_bytes += soup_bytes
+        total_indexed_bytes += indexed_bytes
+        
+        print(
+            f"{os.path.basename(file_path):<20}{soup.vertices_num:>12}{indexed.vertices_num:>15}"
+            f"{soup.vertices_num / indexed.vertices_num:>10.1f}x"
+            f"{soup_bytes / 1024:>11.1f}{indexed_bytes / 1024:>13.1f}"
+        )
+        
+    print(
+        f"{'total':<20}{total_soup:>12}{total_indexed:>15}{total_soup / total_indexed:>10.1f}x"
+        f"{total_soup_bytes / 1024:>11.1f}{total_indexed_bytes / 1024:>13.1f}"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compare the line by line obj parser with the bulk numpy parser
+
+- parse: OBJLoader.parse_opj_file vs OBJLoader.parse_obj_arrays
+- load: parse + building the interleaved vertex buffer (what VertexObjectHelper.from_obj_file does)
+
+usage (in Project2 directory): python -m bench.obj_parse [--repeat N] [model_dir]
+"""
+import os, sys, glob, time
+import argparse
+
+import glm
+
+from utils.object import OBJLoader, VertexObjectHelper, MeshCache
+
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+def load_per_line(file_path):
+    """vertex buffer building of from_obj_file before the bulk parser"""
+    obj_faces = OBJLoader.parse_opj_file(file_path, False)
+    vertices = OBJLoader.obj_to_vertices(obj_faces)
+    
+    v_value = []
+    for v in vertices:
+        v_value.extend(v.position.data())
+        v_value.extend(v.normal.data() if v.normal is not None else [1., 1., 1.])
+    return glm.array(glm.float32, *v_value) # type: ignore
+
+def load_bulk(file_path):
+    return VertexObjectHelper.from_obj_file(file_path, print_info=False)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("model_dir", nargs="?", default=os.path.join(".", "models"))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    MeshCache.enabled = False
+    
+    file_paths = sorted(glob.glob(os.path.join(args.model_dir, "**", "*.obj"), recursive=True))
+    if len(file_paths) == 0:
+        print(f"No .obj file in {args.model_dir}")
+        sys.exit(1)
+    
+    print(f"{'':<20}{'':>8}{'---------- parse (ms) ----------':>34}{'---------- load (ms) -----------':>34}")
+    print(f"{'model':<20}{'faces':>8}{'per-line':>12}{'bulk':>12}{'speedup':>10}{'per-line':>12}{'bulk':>12}{'speedup':>10}")
+    
+    totals = [0., 0., 0., 0.]
+    for file_path in file_paths:
+        times = [
+            best_time(lambda: OBJLoader.parse_opj_file(file_path, False), args.repeat),
+            best_time(lambda: OBJLoader.parse_obj_arrays(file_path, False), args.repeat),
+            best_time(lambda: load_per_line(file_path), args.repeat),
+            best_time(lambda: load_bulk(file_path), args.repeat),
+        ]
+        face_num = len(OBJLoader.parse_obj_arrays(file_path, False).face_vertex_counts)
+        
+        totals = [t + dt for t, dt in zip(totals, times)]
+        print(
+            f"{os.path.basename(file_path):<20}{face_num:>8}"
+            f"{times[0] * 1000:>12.2f}{times[1] * 1000:>12.2f}{times[0] / times[1]:>9.1f}x"
+            f"{times[2] * 1000:>12.2f}{times[3] * 1000:>12.2f}{times[2] / times[3]:>9.1f}x"
+        )
+        
+    print(
+        f"{'total':<20}{'':>8}"
+        f"{totals[0] * 1000:>12.2f}{totals[1] * 1000:>12.2f}{totals[0] / totals[1]:>9.1f}x"
+        f"{totals[2] * 1000:>12.2f}{totals[3] * 1000:>12.2f}{totals[2] / totals[3]:>9.1f}x"
+    )
+
+if __name__ == "__main__":
+    main()
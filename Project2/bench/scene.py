@@ -0,0 +1,53 @@
+"""Deterministic benchmark of the table scene (table, dish, burger, candles) in hierarchy mode, results as JSON to compare between commits
+
+Frames run with a simulated clock (--frame-time seconds per frame), on the null backend by default,
+see bench.scene_harness for what is recorded.
+
+usage (in Project2 directory): python -m bench.scene [--frames 600] [--warmup 60] [--no-render-queue] [--no-instancing]
+                                   [--backend null|offscreen|glfw] [--out result.json] [--compare old.json]
+"""
+import argparse
+
+from . import scene_harness
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--no-render-queue", action="store_true")
+    parser.add_argument("--no-instancing", action="store_true")
+    scene_harness.add_arguments(parser)
+    args = parser.parse_args()
+    
+    scene_harness.select_backend(args.backend)
+    import utils
+    from main import MainContext
+    
+    manager = utils.GraphicsManager(800, 800, "scene benchmark", 60)
+    manager.renderer.use_render_queue = not args.no_render_queue
+    manager.renderer.use_instancing = not args.no_instancing
+    
+    context = MainContext(manager)
+    utils.asset_loader.flush()
+    manager.set_hierarchy_mode()
+    
+    def state():
+        # sum of global transforms of every object of the table, same in every run
+        total, stack = 0., [context.table]
+        while len(stack) > 0:
+            obj = stack.pop()
+            total += sum(sum(column) for column in obj.get_global_transfrom())
+            stack.extend(obj.children)
+        return {"time": manager.time, "transform_sum": total}
+    
+    name = "table"
+    if args.no_render_queue:
+        name += ":no-render-queue"
+    elif args.no_instancing:
+        name += ":no-instancing"
+    result = scene_harness.run_scene(name, manager, context, args.frames, args.warmup, args.frame_time, state)
+    manager.exit()
+    
+    scene_harness.finish(result, args)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
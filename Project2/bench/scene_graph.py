@@ -0,0 +1,103 @@
+"""Compare updating global transforms of a tree of BaseObject with SceneArrays (SceneObject handles)
+
+Both scenes have the same tree of --nodes nodes with --children children per node, and are updated
+after each kind of change. The script fails if their global transforms differ by more than 1e-4
+(glm computes in float32, SceneArrays in float64).
+
+- all: rotation of every node is changed through its object
+- bulk: rotation of every node is changed (SceneArrays: one numpy operation on the trs array)
+- root: only the root is moved, every global transform has to be rebuilt
+- static: nothing has changed
+
+usage (in Project2 directory): python -m bench.scene_graph [--nodes 5000] [--children 4] [--repeat 20]
+"""
+import time
+import argparse
+
+import numpy as np
+
+from utils.object import BaseObject, SceneArrays, SceneObject, transform_stats
+from utils.struct import Vec3D
+
+
+def build_tree(node_num, child_num, make_object):
+    rng = np.random.default_rng(0)
+    
+    objects = []
+    for i in range(node_num):
+        o = make_object(f"node{i}")
+        o.local_position = Vec3D(*rng.uniform(-1, 1, 3))
+        o.local_rotation = Vec3D(*rng.uniform(-np.pi, np.pi, 3))
+        o.local_scale = Vec3D(*rng.uniform(0.5, 1.5, 3))
+        if i > 0:
+            objects[(i - 1) // child_num].add_children(o)
+        objects.append(o)
+    
+    return objects
+
+
+def measure(update, change, repeat):
+    times = []
+    for _ in range(repeat):
+        change()
+        transform_stats.clear()
+        start_time = time.perf_counter()
+        update()
+        times.append(time.perf_counter() - start_time)
+    
+    return min(times) * 1000, transform_stats.global_rebuilt
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--children", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    
+    scene = SceneArrays()
+    tree_objs = build_tree(args.nodes, args.children, lambda name: BaseObject(name, None, None))
+    scene_objs = build_tree(args.nodes, args.children, lambda name: SceneObject(name, None, None, scene))
+    
+    def rotate_all(objects):
+        def change():
+            for o in objects:
+                o.local_rotation.y += 0.01
+        return change
+    
+    def rotate_bulk():
+        scene.rotations[:, 1] += 0.01
+        scene.dirty[:scene.count] = True
+    
+    def move_root(objects):
+        def change():
+            objects[0].local_position.x += 0.01
+        return change
+    
+    cases = [
+        ("all", rotate_all(tree_objs), rotate_all(scene_objs)),
+        ("bulk", rotate_all(tree_objs), rotate_bulk),
+        ("root", move_root(tree_objs), move_root(scene_objs)),
+        ("static", lambda: None, lambda: None),
+    ]
+    
+    print(f"{args.nodes} nodes, {args.children} children per node")
+    print(f"{'change':<8}{'tree ms':>10}{'rebuilt':>9}{'arrays ms':>11}{'rebuilt':>9}{'speedup':>9}")
+    
+    for name, tree_change, scene_change in cases:
+        tree_ms, tree_rebuilt = measure(tree_objs[0].update_global_transform, tree_change, args.repeat)
+        scene_ms, scene_rebuilt = measure(scene_objs[0].update_global_transform, scene_change, args.repeat)
+        
+        speedup = f"{tree_ms / scene_ms:.1f}x" if tree_rebuilt > 0 else "-"
+        print(f"{name:<8}{tree_ms:>10.2f}{tree_rebuilt:>9}{scene_ms:>11.2f}{scene_rebuilt:>9}{speedup:>9}")
+    
+    # the same changes were made to both scenes ("bulk" rotates both by the same amount)
+    tree_global = np.array([np.array(o.global_transform) for o in tree_objs])
+    scene_global = scene.global_transforms[[o.idx for o in scene_objs]]
+    err = np.abs(tree_global - scene_global).max()
+    print(f"max difference of global transforms: {err:.2e}")
+    if err > 1e-4:
+        raise Exception("Global transforms of SceneArrays differ from BaseObject")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
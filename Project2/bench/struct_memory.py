@@ -0,0 +1,89 @@
+"""Measure memory of loading an .obj file into per vertex value types (Vec3D, Vertex3D)
+
+- dict: OBJLoader.parse_opj_file + obj_to_vertices with dataclasses with a __dict__ per instance (before __slots__)
+- slots: the same with the slotted Vec3D and Vertex3D of utils.struct
+- struct array: OBJLoader.parse_obj_arrays + ObjectArrays.triangle_vertices (one VERTEX3D_DTYPE array)
+
+Retained is the memory held by the loaded vertices, peak is the highest while loading (tracemalloc).
+
+usage (in Project2 directory): python -m bench.struct_memory [obj_file]
+"""
+import os, time
+import argparse
+import tracemalloc
+from dataclasses import dataclass
+from typing import Union
+
+from utils.object import OBJLoader
+import utils.object.obj_loader as obj_loader
+
+
+@dataclass
+class DictVec3D():
+    x:float=0.
+    y:float=0.
+    z:float=0.
+    w:float=0.
+    
+    # Vec3D checked whether it's a local transform of a BaseObject on every set before TrackedVec3D
+    def __setattr__(self, name, value):
+        owners = self.__dict__.get("_owners")
+        if owners is not None and self.__dict__.get(name) != value:
+            object.__setattr__(self, name, value)
+            for o in owners:
+                o.set_transform_dirty()
+        else:
+            object.__setattr__(self, name, value)
+
+
+@dataclass
+class DictVertex3D():
+    position:DictVec3D = DictVec3D(0, 0, 0, 1)
+    color:Union[object, None] = None
+    normal:Union[DictVec3D, None] = None
+
+
+def load_objects(file_path):
+    return OBJLoader.obj_to_vertices(OBJLoader.parse_opj_file(file_path, print_info=False))
+
+
+def load_dict_objects(file_path):
+    Vec3D, Vertex3D = obj_loader.Vec3D, obj_loader.Vertex3D
+    obj_loader.Vec3D, obj_loader.Vertex3D = DictVec3D, DictVertex3D
+    try:
+        return load_objects(file_path)
+    finally:
+        obj_loader.Vec3D, obj_loader.Vertex3D = Vec3D, Vertex3D
+
+
+def load_struct_array(file_path):
+    return OBJLoader.parse_obj_arrays(file_path, print_info=False).triangle_vertices()
+
+
+def measure(load, file_path):
+    start_time = time.perf_counter()
+    load(file_path)
+    load_time = time.perf_counter() - start_time
+    
+    tracemalloc.start()
+    vertices = load(file_path)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return len(vertices), retained, peak, load_time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("obj_file", nargs="?", default=os.path.join(".", "models", "burger", "lettuce.obj"))
+    args = parser.parse_args()
+    
+    print(f"{os.path.basename(args.obj_file)}")
+    print(f"{'storage':<14}{'vertices':>10}{'retained MiB':>14}{'peak MiB':>10}{'bytes/vertex':>14}{'load s':>9}")
+    
+    for name, load in [("dict", load_dict_objects), ("slots", load_objects), ("struct array", load_struct_array)]:
+        vertex_num, retained, peak, load_time = measure(load, args.obj_file)
+        print(f"{name:<14}{vertex_num:>10}{retained / 1024 / 1024:>14.2f}{peak / 1024 / 1024:>10.2f}{retained / vertex_num:>14.1f}{load_time:>9.3f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,4 +1,5 @@
-import os
+import os, time
+import argparse
 
 from glfw.GLFW import *
 
@@ -23,7 +24,8 @@ class MainContext(utils.ContextBase):
         self.set_single_mode()
         
     def get_obj_from_file(self, file_path):
-        vertices = utils.VertexObjectHelper.from_obj_file(file_path)
+        # file is parsed in background, object is drawn after it's loaded
+        vertices = utils.asset_loader.load_obj(file_path)
         obj = utils.BaseObject(os.path.basename(file_path), self, vertices)
         return obj
     
@@ -31,18 +33,69 @@ class MainContext(utils.ContextBase):
         if key==GLFW_KEY_P and action==GLFW_PRESS:
             self.print_hierarchy()
         
-    def update(self):
-        super().update()
+    def update(self, alpha:float=0):
+        super().update(alpha)
         
         self.draw(self.grid_obj)
         #self.draw(self.frame_obj)
 
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--no-mesh-cache", action="store_true", help="parse every .obj file without reading or writing mesh cache (cold start)")
+    parser.add_argument("--rebuild-mesh-cache", action="store_true", help="parse every .obj file and rewrite mesh cache")
+    parser.add_argument("--startup-time", action="store_true", help="print time spent to load the scene")
+    parser.add_argument("--render-stats", action="store_true", help="print draw calls and GL state changes saved by the render queue every second")
+    parser.add_argument("--no-render-queue", action="store_true", help="draw each object immediately, without sorting by GL state")
+    parser.add_argument("--no-instancing", action="store_true", help="draw objects sharing a mesh one by one instead of with one instanced draw call")
+    parser.add_argument("--pacing", choices=["uncapped", "vsync", "capped", "on-demand"], default="vsync", help="draw as fast as possible, with vsync, at most --max-fps frames per second, or only when something changes")
+    parser.add_argument("--max-fps", type=float, default=60, help="frames per second of --pacing capped")
+    parser.add_argument("--profile", action="store_true", help="print p50/p95/p99 frame time and time of each stage of the frame every second")
+    parser.add_argument("--profile-gpu", action="store_true", help="also measure GPU time of frames with GL_TIME_ELAPSED queries")
+    parser.add_argument("--trace", metavar="JSON_FILE", help="write the last profiled frames as Chrome trace JSON at exit")
+    parser.add_argument("--trace-gl", action="store_true", help="count GL calls and their time per drawn object, print a frame every second and totals at exit")
+    parser.add_argument("--frames", type=int, help="draw this many frames as fast as possible (--pacing uncapped) after loading, then exit and print throughput of the backend (GRAPHICS_BACKEND=glfw|offscreen|null)")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    utils.MeshCache.enabled = not args.no_mesh_cache
+    utils.MeshCache.rebuild = args.rebuild_mesh_cache
+    
     manager = utils.GraphicsManager(800, 800, "(2019039843)", 60)    
+    manager.renderer.use_render_queue = not args.no_render_queue
+    manager.renderer.use_instancing = not args.no_instancing
+    manager.print_render_stats = args.render_stats
+    manager.backend.max_frames = args.frames
+    # runs of --frames frames (or without a window) measure throughput of the whole scene,
+    # so frames are drawn as fast as possible after everything is loaded
+    benchmark = args.frames is not None or manager.backend.window is None
+    pacing = utils.PacingMode.UNCAPPED if benchmark else utils.PacingMode[args.pacing.upper().replace("-", "_")]
+    manager.set_pacing_mode(pacing, args.max_fps)
+    utils.profiler.enabled = args.profile or args.profile_gpu or args.trace is not None
+    utils.profiler.gpu_timing = args.profile_gpu
+    manager.print_profile = args.profile or args.profile_gpu
+    if args.trace_gl:
+        utils.gl_tracer.install()
+        manager.print_gl_trace = True
     
+    start_time = time.perf_counter()
     main_context = MainContext(manager)
+    if args.startup_time or benchmark:
+        utils.asset_loader.flush()
+    if args.startup_time:
+        print(f"Startup time: {time.perf_counter() - start_time:.3f}s (mesh cache hits: {utils.MeshCache.hits}, misses: {utils.MeshCache.misses})")
+        print(f"GPU meshes: {utils.mesh_registry.stats()}")
+    if benchmark:
+        # the table scene, the same as bench.scene
+        manager.set_hierarchy_mode()
     
     manager.run(main_context)
+    if args.trace is not None:
+        utils.profiler.dump_chrome_trace(args.trace)
+    if args.trace_gl:
+        print(utils.gl_tracer.report())
+    if args.frames is not None:
+        print(manager.backend.summary())
 
     manager.exit()
 
@@ -5,30 +5,16 @@ import numpy as np
 import utils
 from .anim_obj import AnimObj
 
-cheese_obj = \
-    utils.VertexObjectHelper.from_obj_file(
-        os.path.join(".", "models", "burger", "cheese.obj")
-    )
+# ingredient meshes are shared by every burger, and loaded when the first burger is made
+ingradient_objs = {}
 
-lettuce_obj = \
-    utils.VertexObjectHelper.from_obj_file(
-        os.path.join(".", "models", "burger", "lettuce.obj")
-    )
-    
-meat_obj = \
-    utils.VertexObjectHelper.from_obj_file(
-        os.path.join(".", "models", "burger", "meat.obj")
-    )
-    
-tomato_obj = \
-    utils.VertexObjectHelper.from_obj_file(
-        os.path.join(".", "models", "burger", "tomato.obj")
-    )
-    
-bun_upper_obj = \
-    utils.VertexObjectHelper.from_obj_file(
-        os.path.join(".", "models", "burger", "bun_upper.obj")
-    )
+def get_ingradient_obj(name):
+    if name not in ingradient_objs:
+        ingradient_objs[name] = \
+            utils.asset_loader.load_obj(
+                os.path.join(".", "models", "burger", f"{name}.obj")
+            )
+    return ingradient_objs[name]
 
 class BurgerIngradient(AnimObj):
     def __init__(self, name: str, context: utils.ContextBase, vertex_obj, base) -> None:
@@ -56,36 +42,34 @@ class BunBottum(AnimObj):
         super().__init__(
             name, 
             context, 
-            utils.VertexObjectHelper.from_obj_file(
-                os.path.join(".", "models", "burger", "bun_bottom.obj")
-            )
+            get_ingradient_obj("bun_bottom")
         )
         
         self.wait_start = wait_start
         
         self.material_color = utils.Color(0.8, 0.6)
         
-        self.cheese = BurgerIngradient("cheese", context, cheese_obj, 0.1)
+        self.cheese = BurgerIngradient("cheese", context, get_ingradient_obj("cheese"), 0.1)
         self.cheese.material_color = utils.Color(1, 0.8, 0.15)
-        self.lettuce = BurgerIngradient("lettuce", context, lettuce_obj, 0.3)
+        self.lettuce = BurgerIngradient("lettuce", context, get_ingradient_obj("lettuce"), 0.3)
         self.lettuce.material_color = utils.Color(0, 0.8, 0.15)
-        self.meat = BurgerIngradient("meat", context, meat_obj, 0.5)
+        self.meat = BurgerIngradient("meat", context, get_ingradient_obj("meat"), 0.5)
         self.meat.material_color = utils.Color(0.67, 0.35)
         
-        self.tomato = BurgerIngradient("tomato", context, tomato_obj, 0.8)
+        self.tomato = BurgerIngradient("tomato", context, get_ingradient_obj("tomato"), 0.8)
         self.tomato.material_color = utils.Color(1, 0)
         self.tomato.local_position.x = -0.3
         self.tomato.local_position.z = -0.3
-        self.tomato2 = BurgerIngradient("tomato", context, tomato_obj, 0.8)
+        self.tomato2 = BurgerIngradient("tomato", context, get_ingradient_obj("tomato"), 0.8)
         self.tomato2.material_color = utils.Color(1, 0)
         self.tomato2.local_position.x = 0
         self.tomato2.local_position.z = 0.3
-        self.tomato3 = BurgerIngradient("tomato", context, tomato_obj, 0.8)
+        self.tomato3 = BurgerIngradient("tomato", context, get_ingradient_obj("tomato"), 0.8)
         self.tomato3.material_color = utils.Color(1, 0)
         self.tomato3.local_position.x = 0.3
         self.tomato3.local_position.z = -0.3
         
-        self.bun_upper = BurgerIngradient("bun_upper", context, bun_upper_obj, 1)
+        self.bun_upper = BurgerIngradient("bun_upper", context, get_ingradient_obj("bun_upper"), 1)
         self.bun_upper.material_color = utils.Color(0.8, 0.6)
         
         self.ingradients = [self.cheese, self.lettuce, self.meat, [self.tomato, self.tomato2, self.tomato3], self.bun_upper]
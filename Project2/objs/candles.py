@@ -10,7 +10,7 @@ class Candle(AnimObj):
         super().__init__(
             name, 
             context, 
-            utils.VertexObjectHelper.from_obj_file(
+            utils.asset_loader.load_obj(
                 os.path.join(".", "models", "candle", path)
             )
         )
@@ -37,7 +37,7 @@ class CandleStick(AnimObj):
         super().__init__(
             name, 
             context, 
-            utils.VertexObjectHelper.from_obj_file(
+            utils.asset_loader.load_obj(
                 os.path.join(".", "models", "candle", "candle_stick.obj")
             )
         )
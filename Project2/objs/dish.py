@@ -10,7 +10,7 @@ class Dish(AnimObj):
         super().__init__(
             name, 
             context, 
-            utils.VertexObjectHelper.from_obj_file(
+            utils.asset_loader.load_obj(
                 os.path.join(".", "models", "dish.obj")
             )
         )
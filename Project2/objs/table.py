@@ -13,7 +13,7 @@ class Table(AnimObj):
         super().__init__(
             name, 
             context, 
-            utils.VertexObjectHelper.from_obj_file(
+            utils.asset_loader.load_obj(
                 os.path.join(".", "models", "WoodenTable.obj")
             )
         )
@@ -1,8 +1,18 @@
-from .core import GraphicsManager
+import os
+
+# PyOpenGL chooses its platform when OpenGL is first imported, the offscreen backend needs EGL
+if os.environ.get("GRAPHICS_BACKEND") == "offscreen":
+    os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+
+# error checking of PyOpenGL is chosen by GRAPHICS_MODE (debug or release) before OpenGL is first imported
+from .gl_config import GL_MODE, configure_opengl
+configure_opengl()
+
+from .core import GraphicsManager, TickStats, FramePacer, PacingMode, profiler, gl_tracer, create_backend
 from .context import ContextBase
 from .core import CameraHelper
 from .event import InputEventHelper, EventType
-from .object import BaseObject, VertexObjectHelper, VertexObjectInfo
+from .object import BaseObject, VertexObjectHelper, VertexObjectInfo, MeshCache, mesh_registry, asset_loader, transform_stats, SceneArrays, SceneObject
 from .struct import Point, Color, Vec3D
 from .coroutine import CoroutineWaitForSeconds, CoroutineEnd
 from .animation import BezierInterpolate
\ No newline at end of file
@@ -21,7 +21,8 @@ class ContextBase():
         self.is_updating:bool = False
         self.coroutines:Dict[Generator[BaseCoroutineCondtion, None, None], Optional[BaseCoroutineCondtion]] = {}
         
-    def update(self):
+    def update(self, alpha:float=0):
+        """draw objects, alpha (0 ~ 1) is how far the frame is between the last fixed_update and the next one"""
         if self.manager.context_mode == ContextMode.SINGLE:
             if self.single_mode_object != None:
                 self.draw(self.single_mode_object)
@@ -43,6 +44,14 @@ class ContextBase():
     def post_update(self):
         self.is_updating = False
         
+    def is_animating(self) -> bool:
+        """True if frames have to be drawn even without input (PacingMode.ON_DEMAND draws only then),
+        objects of the hierarchy move by fixed_update"""
+        return len(self.coroutines) > 0 or (self.manager.context_mode == ContextMode.HIEARARCHI and len(self.hierarchy_objects) > 0)
+    
+    def request_redraw(self):
+        self.manager.frame_pacer.request_redraw()
+        
     def coroutine_update(self):
         for generator, condition in list(self.coroutines.items()):
             if condition == None or condition.check():
@@ -65,8 +74,12 @@ class ContextBase():
     def add_object(self, object:BaseObject):
         self.hierarchy_objects.append(object)
         object.parent = None
+        object.set_transform_dirty()
         
     def set_single_mode_object(self, object:BaseObject):
+        if self.single_mode_object is not None and self.single_mode_object is not object:
+            self.single_mode_object.destroy()
+            
         self.single_mode_object = object
         
     def set_single_mode(self):
@@ -77,7 +90,10 @@ class ContextBase():
         
     def draw(self, object:BaseObject):
         if (self.is_updating):
-            self.manager.renderer.draw(object)
+            if self.manager.renderer.use_render_queue:
+                self.manager.renderer.submit(object)
+            else:
+                self.manager.renderer.draw(object)
             
     def draw_grid(self, object, gap:float, line_num:int, drop_center:bool=False):
         if (self.is_updating):
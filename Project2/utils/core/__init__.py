@@ -1,4 +1,9 @@
 from .camera import CameraHelper
-from .graphics_manager import GraphicsManager
+from .graphics_manager import GraphicsManager, TickStats
 from .render_manager import RenderManager
+from .frame_data import FrameData, Light
+from .frame_pacer import FramePacer, PacingMode, PacingStats
+from .profiler import FrameProfiler, profiler
+from .gl_trace import GLTracer, gl_tracer
+from .backend import Backend, GLFWBackend, OffscreenBackend, NullBackend, RecordingGL, create_backend
 from .screen import Screen
\ No newline at end of file
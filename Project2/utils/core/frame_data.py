@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List
+
+from OpenGL.GL import *
+import glm
+import numpy as np
+
+from ..shader import FRAME_DATA_BINDING
+from .screen import Screen
+from .camera import CameraHelper
+
+
+# size of the light arrays of the FrameData block of shaders
+MAX_LIGHTS = 2
+
+
+@dataclass
+class Light:
+    position: glm.vec3
+    color: glm.vec3
+
+
+class FrameData:
+    """FrameData is the uniform buffer of the FrameData block of shaders (std140 layout),
+    data shared by every draw of a frame:
+    
+        mat4 view;                          // offset 0
+        mat4 projection;                    // 64
+        mat4 VP;                            // 128
+        vec4 camera_pos;                    // 192
+        vec4 light_positions[MAX_LIGHTS];   // 208
+        vec4 light_colors[MAX_LIGHTS];      // 208 + 16 * MAX_LIGHTS
+    
+    It's written once per frame by update and bound to FRAME_DATA_BINDING for all shaders,
+    so draws only upload their model matrix and material.
+    """
+    FLOATS = 16 * 3 + 4 + 4 * MAX_LIGHTS * 2
+    
+    def __init__(self) -> None:
+        self.UBO = None
+        self.data = np.zeros(FrameData.FLOATS, dtype=np.float32)
+        
+        # lights of phong shaders, at most MAX_LIGHTS
+        self.lights: List[Light] = [
+            Light(glm.vec3(6, 4, 11), glm.vec3(0.7, 0.9, 0.6)),
+            Light(glm.vec3(-4, 4, -8), glm.vec3(0.6, 0.1, 0.3)),
+        ]
+        
+        self.VP = glm.mat4()
+    
+    def init(self):
+        self.UBO = glGenBuffers(1)
+        glBindBuffer(GL_UNIFORM_BUFFER, self.UBO)
+        glBufferData(GL_UNIFORM_BUFFER, self.data.nbytes, None, GL_DYNAMIC_DRAW)
+        glBindBufferBase(GL_UNIFORM_BUFFER, FRAME_DATA_BINDING, self.UBO)
+    
+    def update(self, screen:Screen, camera:CameraHelper):
+        """write matrices of the camera and lights of this frame to the uniform buffer"""
+        if len(self.lights) > MAX_LIGHTS:
+            raise Exception(f"At most {MAX_LIGHTS} lights are supported, {len(self.lights)} are set")
+        
+        view = camera.get_view_matrix()
+        projection = screen.get_projection_matrix()
+        self.VP = projection * view
+        camera_pos = camera.get_camera_pos()
+        
+        # matrices are column-major in glm, the same as std140
+        data = self.data
+        data[0:48] = np.frombuffer(glm.array(view, projection, self.VP).to_bytes(), dtype=np.float32)
+        data[48:52] = (camera_pos.x, camera_pos.y, camera_pos.z, 1)
+        
+        positions = 52
+        colors = positions + 4 * MAX_LIGHTS
+        data[positions:] = 0
+        for i, light in enumerate(self.lights):
+            data[positions + 4 * i:positions + 4 * i + 3] = light.position.to_tuple()
+            data[colors + 4 * i:colors + 4 * i + 3] = light.color.to_tuple()
+        
+        glBindBuffer(GL_UNIFORM_BUFFER, self.UBO)
+        glBufferSubData(GL_UNIFORM_BUFFER, 0, data.nbytes, data)
+    
+    def destroy(self):
+        if self.UBO is not None:
+            glDeleteBuffers(1, [self.UBO])
+            self.UBO = None
\ No newline at end of file
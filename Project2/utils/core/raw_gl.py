@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import sys
+import ctypes
+from typing import List, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .backend import Backend
+
+FUNCTYPE = ctypes.WINFUNCTYPE if sys.platform == "win32" else ctypes.CFUNCTYPE
+
+GLenum = ctypes.c_uint
+GLuint = ctypes.c_uint
+GLint = ctypes.c_int
+GLsizei = ctypes.c_int
+GLfloat = ctypes.c_float
+GLboolean = ctypes.c_ubyte
+
+# argument types of the GL functions RenderManager calls for every draw.
+# pointers are c_void_p, which takes glm.value_ptr and None (offset 0 of the bound buffer)
+HOT_FUNCTIONS = {
+    "glUseProgram": [GLuint],
+    "glBindVertexArray": [GLuint],
+    "glPolygonMode": [GLenum, GLenum],
+    "glUniformMatrix4fv": [GLint, GLsizei, GLboolean, ctypes.c_void_p],
+    "glUniform3f": [GLint, GLfloat, GLfloat, GLfloat],
+    "glUniform1i": [GLint, GLint],
+    "glActiveTexture": [GLenum],
+    "glBindTexture": [GLenum, GLuint],
+    "glBindBuffer": [GLenum, GLuint],
+    "glDrawArrays": [GLenum, GLint, GLsizei],
+    "glDrawElements": [GLenum, GLsizei, GLenum, ctypes.c_void_p],
+    "glDrawArraysInstanced": [GLenum, GLint, GLsizei, GLsizei],
+    "glDrawElementsInstanced": [GLenum, GLsizei, GLenum, ctypes.c_void_p, GLsizei],
+}
+
+# modules of the package whose HOT_FUNCTIONS are replaced
+RAW_MODULES = ["core.render_manager"]
+
+
+def bind_raw_functions(backend:Backend, package:Union[str, None]=None) -> List[str]:
+    """replace HOT_FUNCTIONS imported by RAW_MODULES with ctypes functions at their addresses in the GL context
+    of backend, which has to be current. They skip PyOpenGL wrappers (error checking, argument conversion).
+    
+    returns names of the replaced functions, none if backend has no GL driver (NullBackend)
+    """
+    package = package if package is not None else __name__.split(".")[0]
+    
+    functions = {}
+    for name, argtypes in HOT_FUNCTIONS.items():
+        address = backend.get_proc_address(name)
+        if not address:
+            continue
+        functions[name] = FUNCTYPE(None, *argtypes)(address)
+    
+    for module_name in RAW_MODULES:
+        module = sys.modules.get(f"{package}.{module_name}")
+        if module is None:
+            continue
+        
+        for name, function in functions.items():
+            if hasattr(module, name):
+                setattr(module, name, function)
+    
+    return list(functions.keys())
\ No newline at end of file
@@ -14,6 +14,7 @@ class EventType(Enum):
         
 class InputEventHelper():
     def __init__(self, window) -> None:
+        # callbacks are not registered to GLFW without a window (headless backends), they are never called
         self.glfw_window = window
         
         self.EVENT_ENABLE_FLAG = {key: False for key in [k for k in EventType]}
@@ -36,7 +37,8 @@ class InputEventHelper():
             for c in self.EVENT_GLFW_CALLBACKS[EventType.KEYBOARD]:
                 c(window, key, scancode, action, mods)
                 
-        glfwSetKeyCallback(self.glfw_window, keyboard_callback_caller)
+        if self.glfw_window is not None:
+            glfwSetKeyCallback(self.glfw_window, keyboard_callback_caller)
         
     def set_cursor_pos_event(self, callback):
         self._init_callback(EventType.MOUSE_CURSOR_POS, callback)
@@ -45,7 +47,8 @@ class InputEventHelper():
             for c in self.EVENT_GLFW_CALLBACKS[EventType.MOUSE_CURSOR_POS]:
                 c(window, xpos, ypos)
                 
-        glfwSetCursorPosCallback(self.glfw_window, cursor_pos_callback_caller)
+        if self.glfw_window is not None:
+            glfwSetCursorPosCallback(self.glfw_window, cursor_pos_callback_caller)
         
     def set_mouse_button_event(self, callback):
         self._init_callback(EventType.MOUSE_BUTTON, callback)
@@ -54,7 +57,8 @@ class InputEventHelper():
             for c in self.EVENT_GLFW_CALLBACKS[EventType.MOUSE_BUTTON]:
                 c(window, button, action, mods)
                 
-        glfwSetMouseButtonCallback(self.glfw_window, mouse_button_callback_caller)
+        if self.glfw_window is not None:
+            glfwSetMouseButtonCallback(self.glfw_window, mouse_button_callback_caller)
         
     def set_mouse_scroll_event(self, callback):
         self._init_callback(EventType.MOUSE_SCROLL, callback)
@@ -63,7 +67,8 @@ class InputEventHelper():
             for c in self.EVENT_GLFW_CALLBACKS[EventType.MOUSE_SCROLL]:
                 c(window, xoffset, yoffset)
                 
-        glfwSetScrollCallback(self.glfw_window, mouse_scroll_callback_caller)
+        if self.glfw_window is not None:
+            glfwSetScrollCallback(self.glfw_window, mouse_scroll_callback_caller)
     
     def set_frame_buffer_size_event(self, callback):
         self._init_callback(EventType.FRAME_BUFFER_SIZE, callback)
@@ -72,7 +77,8 @@ class InputEventHelper():
             for c in self.EVENT_GLFW_CALLBACKS[EventType.FRAME_BUFFER_SIZE]:
                 c(window, width, height)
                 
-        glfwSetFramebufferSizeCallback(self.glfw_window, frame_buffer_size_callback_caller)
+        if self.glfw_window is not None:
+            glfwSetFramebufferSizeCallback(self.glfw_window, frame_buffer_size_callback_caller)
         
     def set_drag_drop_event(self, callback):
         self._init_callback(EventType.DRAG_DROP, callback)
@@ -81,4 +87,5 @@ class InputEventHelper():
             for c in self.EVENT_GLFW_CALLBACKS[EventType.DRAG_DROP]:
                 c(window, file_path)
                 
-        glfwSetDropCallback(self.glfw_window, drag_drop_callback_caller)
\ No newline at end of file
+        if self.glfw_window is not None:
+            glfwSetDropCallback(self.glfw_window, drag_drop_callback_caller)
\ No newline at end of file
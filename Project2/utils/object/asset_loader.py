@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import os, time, queue
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Tuple, Union, TYPE_CHECKING
+
+from .vertex_object import VertexObjectHelper, VertexObjectInfo
+if TYPE_CHECKING:
+    from .base_object import BaseObject
+
+
+class AssetLoader():
+    """AssetLoader parses asset files on a thread pool, and hands the results to the main thread.
+    
+    GL calls are only allowed on the main thread, so everything touching GL waits in queues 
+    which GraphicsManager drains every frame with process(), within a time budget
+    
+    - waiting: (future, callback) of loads, callback is called with the result when it's finished (eg. to create objects)
+    - calls: callbacks queued by call_soon (from any thread), eg. when a background thread finished its work
+    - uploads: (object, vertices_info) of meshes to upload, queued by BaseObject.init_VAO (from any thread)
+    
+    Parsing (numpy, file reading) can overlap with rendering of the main thread 
+    while results are uploaded a few at a time, so frames are not blocked by large models.
+    """
+    def __init__(self, max_workers:Union[int, None] = None) -> None:
+        self.max_workers = max_workers
+        self.executor:Union[ThreadPoolExecutor, None] = None
+        
+        self.waiting:List[Tuple[Future, Callable[[Any], None]]] = []
+        self.calls:queue.Queue[Callable[[], None]] = queue.Queue()
+        self.uploads:queue.Queue[Tuple[BaseObject, VertexObjectInfo]] = queue.Queue()
+        
+        self.obj_futures:Dict[Tuple[str, bool], Future] = {}
+        
+        self.uploaded_count = 0
+        self.over_budget_frames = 0
+    
+    def submit(self, func:Callable[..., Any], *args, on_loaded:Union[Callable[[Any], None], None] = None) -> Future:
+        """run func(*args) on the thread pool, on_loaded is called on the main thread with its result"""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="asset_loader")
+        
+        future = self.executor.submit(func, *args)
+        
+        if on_loaded is not None:
+            self.when_loaded(future, on_loaded)
+        
+        return future
+    
+    def when_loaded(self, future:Future, callback:Callable[[Any], None]):
+        """call callback with the result of future on the main thread"""
+        self.waiting.append((future, callback))
+    
+    def call_soon(self, callback:Callable[[], None]):
+        """call callback on the main thread, can be called from any thread"""
+        self.calls.put(callback)
+    
+    def load_obj(self, file_path:str, indexed:bool=True) -> Future:
+        """parse .obj file on the thread pool, return Future of VertexObjectInfo
+        
+        Loads of the same file which are not finished yet share one Future
+        """
+        key = (os.path.abspath(file_path), indexed)
+        
+        future = self.obj_futures.get(key)
+        if future is None:
+            future = self.submit(VertexObjectHelper.from_obj_file, file_path, False, indexed)
+            self.obj_futures[key] = future
+            future.add_done_callback(lambda f: self.obj_futures.pop(key, None))
+        
+        return future
+    
+    def request_upload(self, object:BaseObject, vertices_info:VertexObjectInfo):
+        self.uploads.put((object, vertices_info))
+    
+    def pending(self) -> int:
+        return len(self.waiting) + self.calls.qsize() + self.uploads.qsize()
+    
+    def process(self, budget:float):
+        """run callbacks of finished loads and queued calls, and upload queued meshes on the main thread, 
+        until budget (seconds) is used up. At least one item is processed each call
+        """
+        start_time = time.perf_counter()
+        processed = 0
+        
+        # callbacks can add new loads to waiting
+        waiting = self.waiting
+        self.waiting = []
+        
+        for future, callback in waiting:
+            if not future.done() or (processed > 0 and time.perf_counter() - start_time >= budget):
+                self.waiting.append((future, callback))
+                continue
+            
+            processed += 1
+            e = future.exception()
+            if e is not None:
+                print(f"Failed to load asset: {e}")
+                continue
+            callback(future.result())
+        
+        while processed == 0 or time.perf_counter() - start_time < budget:
+            try:
+                callback = self.calls.get_nowait()
+            except queue.Empty:
+                break
+            
+            processed += 1
+            callback()
+        
+        while processed == 0 or time.perf_counter() - start_time < budget:
+            try:
+                object, vertices_info = self.uploads.get_nowait()
+            except queue.Empty:
+                break
+            
+            processed += 1
+            object.upload_mesh(vertices_info)
+            self.uploaded_count += 1
+        
+        if time.perf_counter() - start_time > budget:
+            self.over_budget_frames += 1
+    
+    def flush(self):
+        """wait for every load and upload everything (blocks the main thread)"""
+        while self.pending() > 0:
+            wait([future for future, _ in self.waiting])
+            self.process(float("inf"))
+    
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+asset_loader = AssetLoader()
\ No newline at end of file
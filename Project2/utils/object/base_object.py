@@ -1,24 +1,66 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import Union, List
+from concurrent.futures import Future
 
 from OpenGL.GL import *
 import glm
 
 from .vertex_object import VertexObjectInfo
-from ..struct import Vec3D, Color
+from .mesh_registry import mesh_registry
+from .asset_loader import asset_loader
+from ..struct import Vec3D, TrackedVec3D, Color
 
 from ..context import ContextBase
 
+@dataclass
+class TransformStats:
+    """Matrices rebuilt by BaseObject.update_global_transform in one frame"""
+    objects: int = 0
+    local_rebuilt: int = 0
+    global_rebuilt: int = 0
+    
+    def clear(self):
+        self.objects = 0
+        self.local_rebuilt = 0
+        self.global_rebuilt = 0
+    
+    def __str__(self) -> str:
+        return f"local matrices rebuilt: {self.local_rebuilt}, global matrices rebuilt: {self.global_rebuilt} of {self.objects} objects"
+    
+    
+transform_stats = TransformStats()
+
+
 class BaseObject:
-    def __init__(self, name:str, context:ContextBase, vertices_info:VertexObjectInfo) -> None:
+    def __init__(self, name:str, context:ContextBase, vertices_info:Union[VertexObjectInfo, Future, None]) -> None:
+        """vertices_info can be a Future of asset_loader (eg. asset_loader.load_obj), 
+        the object is drawn after it's loaded and uploaded
+        """
         self.name = name
         self.context:ContextBase = context
         
-        self.vertices_info = vertices_info
+        self.vertices_info:Union[VertexObjectInfo, None] = None
         self.global_transform = glm.mat4()
         
-        self.init_VAO()
+        # meshes used by this object, uploaded ones and ones waiting for upload
+        self.meshes:List[VertexObjectInfo] = []
+        self.pending_meshes:List[VertexObjectInfo] = []
+        self.destroyed = False
+        if isinstance(vertices_info, Future):
+            asset_loader.when_loaded(vertices_info, self.set_vertices_info)
+        else:
+            self.set_vertices_info(vertices_info)
+        
+        self.parent:Union[BaseObject, None] = None
+        self.children:List[BaseObject] = []
+        
+        # global transform is rebuilt only when local transform of this object or its ancestors has changed,
+        # subtree_dirty is set on every ancestor of a dirty object so clean subtrees are skipped
+        self.local_transform = glm.mat4()
+        self.transform_dirty = True
+        self.subtree_dirty = True
         
         self.local_position:Vec3D = Vec3D(0, 0, 0, 1)
         self.local_rotation:Vec3D = Vec3D(0, 0, 0)
@@ -29,35 +71,40 @@ class BaseObject:
         
         self.pre_scale:Vec3D = Vec3D(1, 1, 1)
         
-        self.parent:Union[BaseObject, None] = None
-        self.children:List[BaseObject] = []
-        
         self.material_color = Color.WHITE()
         
+    def set_vertices_info(self, vertices_info:Union[VertexObjectInfo, None]):
+        # objects without mesh (eg. group of objects) are not drawn
+        if self.destroyed or vertices_info is None:
+            return
+        
+        self.vertices_info = vertices_info
+        self.init_VAO()
+        
     def init_VAO(self):
-        VAO = glGenVertexArrays(1)
-        glBindVertexArray(VAO)
-
-        VBO = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, VBO)
-
-        vertices = self.vertices_info.vertices_arr
-        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices.ptr, GL_STATIC_DRAW)
-
-        stride = self.vertices_info.dimension * (len(self.vertices_info.enabled_attr))
-        for i in range(len(self.vertices_info.enabled_attr)):
-            pointer = i * self.vertices_info.dimension
-            glVertexAttribPointer(
-                i, 
-                self.vertices_info.dimension, 
-                GL_FLOAT, 
-                GL_FALSE, 
-                stride * glm.sizeof(glm.float32), 
-                None if pointer == 0 else ctypes.c_void_p(pointer*glm.sizeof(glm.float32))
-            )
-            glEnableVertexAttribArray(i)
-        
-        self.vertices_info.VAO = VAO
+        # VAO is created on the main thread by asset_loader, within the upload budget of a frame
+        self.pending_meshes.append(self.vertices_info)
+        asset_loader.request_upload(self, self.vertices_info)
+        
+    def upload_mesh(self, vertices_info:VertexObjectInfo):
+        for i, m in enumerate(self.pending_meshes):
+            if m is vertices_info:
+                del self.pending_meshes[i]
+                mesh_registry.acquire(vertices_info)
+                self.meshes.append(vertices_info)
+                return
+        
+    def destroy(self):
+        """Release GPU meshes used by this object and its children"""
+        self.destroyed = True
+        
+        for m in self.meshes:
+            mesh_registry.release(m)
+        self.meshes = []
+        self.pending_meshes = []
+        
+        for c in self.children:
+            c.destroy()
         
     def draw_info(self):
         return self.vertices_info
@@ -69,33 +116,101 @@ class BaseObject:
         PS = glm.scale(glm.vec3(self.pre_scale.x, self.pre_scale.y, self.pre_scale.z))
         return self.global_transform * PS
     
-    def update_global_transform(self):
-        parent_transform = glm.mat4()
+    @property
+    def local_position(self) -> Vec3D:
+        return self._local_position
         
-        if self.parent != None:
-            parent_transform = self.parent.get_global_transfrom()
+    @local_position.setter
+    def local_position(self, value:Vec3D):
+        self._local_position = self.track_transform_vec(self.__dict__.get("_local_position"), value)
             
-        S = glm.scale(glm.vec3(self.local_scale.x, self.local_scale.y, self.local_scale.z))
-        
-        Rx = glm.rotate(self.local_rotation.x, glm.vec3(1, 0, 0))
-        Ry = glm.rotate(self.local_rotation.y, glm.vec3(0, 1, 0))
-        Rz = glm.rotate(self.local_rotation.z, glm.vec3(0, 0, 1))
-        R = Rz * Ry * Rx
+    @property
+    def local_rotation(self) -> Vec3D:
+        return self._local_rotation
+        
+    @local_rotation.setter
+    def local_rotation(self, value:Vec3D):
+        self._local_rotation = self.track_transform_vec(self.__dict__.get("_local_rotation"), value)
+        
+    @property
+    def local_scale(self) -> Vec3D:
+        return self._local_scale
+        
+    @local_scale.setter
+    def local_scale(self, value:Vec3D):
+        self._local_scale = self.track_transform_vec(self.__dict__.get("_local_scale"), value)
+        
+    def track_transform_vec(self, old:Union[Vec3D, None], new:Vec3D) -> Vec3D:
+        """mark this object dirty when components of new vector change (eg. local_position.x = 1) instead of old one"""
+        if old is not new:
+            if old is not None:
+                old._owners.remove(self)
+                if len(old._owners) == 0:
+                    old._owners = None
+                    old.__class__ = Vec3D
+            if not isinstance(new, TrackedVec3D):
+                new._owners = []
+                new.__class__ = TrackedVec3D
+            new._owners.append(self)
+        
+        self.set_transform_dirty()
+        return new
+    
+    def set_transform_dirty(self):
+        """rebuild global transform of this object and its children at the next update_global_transform"""
+        self.transform_dirty = True
+        self.subtree_dirty = True
+        
+        if self.context is not None:
+            self.context.request_redraw()
+        
+        node = self.parent
+        while node is not None and not node.subtree_dirty:
+            node.subtree_dirty = True
+            node = node.parent
+    
+    def update_global_transform(self, parent_changed:bool=False):
+        """rebuild global transform if local transform of this object or its ancestors has changed"""
+        transform_stats.objects += 1
         
-        T = glm.translate(glm.vec3(self.local_position.x, self.local_position.y, self.local_position.z))
+        if not (parent_changed or self.subtree_dirty):
+            return self.global_transform
         
-        M = T * R * S
+        changed = parent_changed or self.transform_dirty
+        if changed:
+            if self.transform_dirty:
+                S = glm.scale(glm.vec3(self.local_scale.x, self.local_scale.y, self.local_scale.z))
+                
+                Rx = glm.rotate(self.local_rotation.x, glm.vec3(1, 0, 0))
+                Ry = glm.rotate(self.local_rotation.y, glm.vec3(0, 1, 0))
+                Rz = glm.rotate(self.local_rotation.z, glm.vec3(0, 0, 1))
+                R = Rz * Ry * Rx
+                
+                T = glm.translate(glm.vec3(self.local_position.x, self.local_position.y, self.local_position.z))
+                
+                self.local_transform = T * R * S
+                self.transform_dirty = False
+                transform_stats.local_rebuilt += 1
+            
+            parent_transform = glm.mat4()
+            
+            if self.parent != None:
+                parent_transform = self.parent.get_global_transfrom()
+            
+            self.global_transform = parent_transform * self.local_transform
+            transform_stats.global_rebuilt += 1
         
-        self.global_transform = parent_transform * M
+        self.subtree_dirty = False
         
         for c in self.children:
-            c.update_global_transform()
+            c.update_global_transform(changed)
                 
         return self.global_transform
     
     def add_children(self, object:BaseObject):
         object.parent = self
         self.children.append(object)
+        object.set_transform_dirty()
     
     def update(self):
         for c in self.children:
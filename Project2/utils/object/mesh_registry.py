@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Union, Hashable
+
+from OpenGL.GL import *
+import glm
+
+from .vertex_object import VertexObjectInfo, buffer_ptr, rewrite_buffer
+
+
+@dataclass
+class GPUMesh():
+    vertices_info: VertexObjectInfo
+    VAO: int
+    buffers: List[int] = field(default_factory=list)
+    nbytes: int = 0
+    vertices_nbytes: int = 0
+    ref_count: int = 0
+    # per instance attributes of RenderManager are set in the VAO
+    instanced: bool = False
+
+
+class MeshRegistry():
+    """MeshRegistry uploads each mesh to the GPU once and shares its VAO with every BaseObject using it.
+    
+    Meshes are identified by VertexObjectInfo.source when it is set (eg. .obj file path),
+    or by the VertexObjectInfo instance itself.
+    GL objects of a mesh are deleted when the last object using it releases it.
+    """
+    def __init__(self) -> None:
+        self.meshes: Dict[Hashable, GPUMesh] = {}
+        
+        self.live_vbo_bytes = 0
+        self.live_vao_count = 0
+    
+    @staticmethod
+    def get_key(vertices_info:VertexObjectInfo) -> Hashable:
+        if vertices_info.source is not None:
+            return vertices_info.source
+        return id(vertices_info)
+    
+    def acquire(self, vertices_info:VertexObjectInfo) -> int:
+        """Return VAO of the mesh, uploading it if no one is using it yet"""
+        key = MeshRegistry.get_key(vertices_info)
+        
+        mesh = self.meshes.get(key)
+        if mesh is None:
+            mesh = self.upload(vertices_info)
+            self.meshes[key] = mesh
+            
+            self.live_vbo_bytes += mesh.nbytes
+            self.live_vao_count += 1
+        
+        mesh.ref_count += 1
+        vertices_info.VAO = mesh.VAO
+        
+        return mesh.VAO
+    
+    def get(self, vertices_info:VertexObjectInfo) -> Union[GPUMesh, None]:
+        return self.meshes.get(MeshRegistry.get_key(vertices_info))
+    
+    def release(self, vertices_info:VertexObjectInfo):
+        key = MeshRegistry.get_key(vertices_info)
+        
+        mesh = self.meshes.get(key)
+        if mesh is None:
+            return
+        
+        mesh.ref_count -= 1
+        if mesh.ref_count > 0:
+            return
+        
+        glDeleteVertexArrays(1, [mesh.VAO])
+        glDeleteBuffers(len(mesh.buffers), mesh.buffers)
+        
+        self.live_vbo_bytes -= mesh.nbytes
+        self.live_vao_count -= 1
+        
+        mesh.vertices_info.VAO = None
+        vertices_info.VAO = None
+        del self.meshes[key]
+    
+    def upload(self, vertices_info:VertexObjectInfo) -> GPUMesh:
+        VAO = glGenVertexArrays(1)
+        glBindVertexArray(VAO)
+        
+        VBO = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, VBO)
+        
+        vertices = vertices_info.vertices_arr
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, buffer_ptr(vertices), GL_DYNAMIC_DRAW if vertices_info.dynamic else GL_STATIC_DRAW)
+        
+        stride = vertices_info.dimension * (len(vertices_info.enabled_attr))
+        for i in range(len(vertices_info.enabled_attr)):
+            pointer = i * vertices_info.dimension
+            glVertexAttribPointer(
+                i,
+                vertices_info.dimension,
+                GL_FLOAT,
+                GL_FALSE,
+                stride * glm.sizeof(glm.float32),
+                None if pointer == 0 else ctypes.c_void_p(pointer*glm.sizeof(glm.float32))
+            )
+            glEnableVertexAttribArray(i)
+        
+        mesh = GPUMesh(vertices_info, VAO, [VBO], vertices.nbytes, vertices.nbytes)
+        
+        if vertices_info.indices_arr is not None:
+            EBO = glGenBuffers(1)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, EBO)
+            
+            indices = vertices_info.indices_arr
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, buffer_ptr(indices), GL_STATIC_DRAW)
+            
+            mesh.buffers.append(EBO)
+            mesh.nbytes += indices.nbytes
+        
+        glBindVertexArray(0)
+        
+        return mesh
+    
+    def update_vertices(self, vertices_info:VertexObjectInfo):
+        """Upload vertices_arr of an uploaded dynamic mesh again, into the same VBO (see rewrite_buffer)"""
+        mesh = self.get(vertices_info)
+        if mesh is None:
+            return
+        
+        vertices = vertices_info.vertices_arr
+        if vertices.nbytes != mesh.vertices_nbytes:
+            raise Exception(f"Vertices of {vertices.nbytes} bytes can't be written to a buffer of {mesh.vertices_nbytes} bytes")
+        
+        rewrite_buffer(GL_ARRAY_BUFFER, mesh.buffers[0], vertices)
+    
+    def stats(self):
+        return {
+            "meshes": len(self.meshes),
+            "users": sum(m.ref_count for m in self.meshes.values()),
+            "live_vao_count": self.live_vao_count,
+            "live_vbo_bytes": self.live_vbo_bytes
+        }
+
+
+mesh_registry = MeshRegistry()
\ No newline at end of file
@@ -1,7 +1,11 @@
 from typing import List, Tuple
-import os, time
+from itertools import chain
+from operator import methodcaller
+import os, re, time
 
-from ..struct import Vec3D, Face, TriangleFace, ObjectFaces, Vertex3D
+import numpy as np
+
+from ..struct import Vec3D, Face, TriangleFace, ObjectFaces, Vertex3D, ObjectArrays
 
 
 class OBJLoader:
@@ -14,7 +18,7 @@ class OBJLoader:
         Raises when the obj file has invalid format
     """
     @staticmethod
-    def parse_opj_file(file_path:str, print_info:bool = True) -> ObjectFaces:
+    def parse_opj_file(file_path:str, print_info:bool = True, bulk:bool = False) -> ObjectFaces:
         """Read obj file from given file path and return ObjectFaces instance
     
         Parameters
@@ -23,6 +27,8 @@ class OBJLoader:
             .obj file path as absolute path
         print_info : bool
             print the information of obj file when this set 'true'
+        bulk : bool
+            parse with parse_obj_arrays and return ObjectFaces as a view over the arrays
 
         Returns
         -------
@@ -30,6 +36,9 @@ class OBJLoader:
             - Contains vertices and normal vectors of vertices data.
             - Faces in obj file will be automatically converted into triangles
         """
+        if bulk:
+            return OBJLoader.parse_obj_arrays(file_path, print_info).object_faces()
+        
         vertices: List[Vec3D] = []
         vertex_norms: List[Vec3D] = []
         faces: List[Face] = []
@@ -38,7 +47,7 @@ class OBJLoader:
         vertice4face_num = 0
         vertice_upper_4_face_num = 0
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         with open(file_path, "r") as obj_f:
             i = -1
             
@@ -116,7 +125,7 @@ class OBJLoader:
                 else:
                     continue
         
-        end_time = time.time()
+        end_time = time.perf_counter()
         
         if (print_info):
             print("---------- .obj file info ----------")
@@ -133,6 +142,146 @@ class OBJLoader:
         triangle_faces = OBJLoader.faces_to_triangles(faces)
         
         return ObjectFaces(vertices, vertex_norms, triangle_faces)
+    
+    @staticmethod
+    def parse_obj_arrays(file_path:str, print_info:bool = True) -> ObjectArrays:
+        """Read obj file from given file path in one pass and return ObjectArrays instance.
+        Records are grouped by type first and every group is converted to numpy at once,
+        so no python object is created per vertex, normal or face.
+    
+        Parameters
+        -------
+        file_path : str
+            .obj file path as absolute path
+        print_info : bool
+            print the information of obj file when this set 'true'
+
+        Returns
+        -------
+        ObjectArrays
+            - positions (N x 4), normals (M x 3) as float32
+            - face corner indices (0-based) and number of corners of each face as int32
+        """
+        start_time = time.perf_counter()
+        with open(file_path, "r") as obj_f:
+            text = obj_f.read()
+        
+        # values part of every 'v', 'vn' and 'f' line, in file order
+        v_records: List[str] = OBJLoader._find_records(text, 'v')
+        vn_records: List[str] = OBJLoader._find_records(text, 'vn')
+        f_records: List[str] = OBJLoader._find_records(text, 'f')
+        
+        positions = OBJLoader._records_to_array(text, 'v', v_records, (3, 4), fill=1.)
+        normals = OBJLoader._records_to_array(text, 'vn', vn_records, (3,), fill=0.)
+        
+        face_corners = [r.split() for r in f_records]
+        face_vertex_counts = np.fromiter(map(len, face_corners), dtype=np.int32, count=len(face_corners))
+        if np.any(face_vertex_counts < 3):
+            OBJLoader._records_error(text, 'f', f_records, int(np.argmax(face_vertex_counts < 3)))
+            
+        corners = list(chain.from_iterable(face_corners))
+        face_vertex_idx, face_normal_idx = OBJLoader._corners_to_indices(text, f_records, corners)
+        
+        end_time = time.perf_counter()
+        
+        if (print_info):
+            print("---------- .obj file info ----------")
+            print(f"File name: {os.path.basename(file_path)}")
+            print("")
+            print(f"Total number of faces: {len(face_vertex_counts)}")
+            print(f"Number of faces with 3 vertices: {np.count_nonzero(face_vertex_counts == 3)}")
+            print(f"Number of faces with 4 vertices: {np.count_nonzero(face_vertex_counts == 4)}")
+            print(f"Number of faces with more than 4 vertices: {np.count_nonzero(face_vertex_counts > 4)}")
+            print("")
+            print(f"Parse time: {end_time - start_time}")
+            print("------------------------------------")
+        
+        return ObjectArrays(positions, normals, face_vertex_idx, face_normal_idx, face_vertex_counts)
+    
+    @staticmethod
+    def _find_records(text:str, key:str) -> List[str]:
+        return re.findall(r'^[ \t]*' + key + r'(?:[ \t]+(.*))?$', text, re.MULTILINE)
+    
+    @staticmethod
+    def _records_to_array(text:str, key:str, records:List[str], widths:Tuple[int, ...], fill:float) -> np.ndarray:
+        """Convert records of the same type (eg. every 'v' line) to a (len(records) x max(widths)) float32 array.
+        Missing trailing values of shorter records are set to fill
+        """
+        width = max(widths)
+        values_of_records = [r.split() for r in records]
+        counts = np.fromiter(map(len, values_of_records), dtype=np.int64, count=len(values_of_records))
+        
+        invalid = ~np.isin(counts, widths)
+        if np.any(invalid):
+            OBJLoader._records_error(text, key, records, int(np.argmax(invalid)))
+            
+        try:
+            values = np.array(list(chain.from_iterable(values_of_records)), dtype=np.float32)
+        except ValueError:
+            for i, vars in enumerate(values_of_records):
+                try:
+                    [float(x) for x in vars]
+                except ValueError:
+                    OBJLoader._records_error(text, key, records, i)
+            raise
+        
+        if np.all(counts == width):
+            return values.reshape(len(records), width)
+        
+        arr = np.full((len(records), width), fill, dtype=np.float32)
+        rows = np.repeat(np.arange(len(records)), counts)
+        cols = np.arange(len(values)) - np.repeat(np.cumsum(counts) - counts, counts)
+        arr[rows, cols] = values
+        return arr
+    
+    @staticmethod
+    def _corners_to_indices(text:str, f_records:List[str], corners:List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Convert face corners ('v', 'v/vt', 'v//vn' or 'v/vt/vn') to 0-based vertex and normal index arrays"""
+        if len(corners) == 0:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+        
+        # every corner in a file usually has the same format, so parse them all at once
+        parts = corners[0].count('/') + 1
+        slashes = np.fromiter(map(methodcaller('count', '/'), corners), dtype=np.int64, count=len(corners))
+        
+        if parts <= 3 and np.all(slashes == parts - 1):
+            joined = " ".join(corners)
+            if '//' in joined:
+                joined = joined.replace('//', '/0/')
+            idx = np.array(joined.replace('/', ' ').split(), dtype=np.int32).reshape(len(corners), parts)
+            vertex_idx = idx[:, 0] - 1
+            if parts == 3:
+                normal_idx = idx[:, 2] - 1
+            else:
+                normal_idx = np.full(len(corners), -1, dtype=np.int32)
+            return vertex_idx, normal_idx
+        
+        # mixed corner formats
+        vertex_idx = np.empty(len(corners), dtype=np.int32)
+        normal_idx = np.empty(len(corners), dtype=np.int32)
+        for i, c in enumerate(corners):
+            f_info = c.split('/')
+            f_info_num = len(f_info)
+            if f_info_num == 1 or f_info_num == 2:
+                vertex_idx[i], normal_idx[i] = int(f_info[0]) - 1, -1
+            elif f_info_num == 3:
+                vertex_idx[i], normal_idx[i] = int(f_info[0]) - 1, int(f_info[2]) - 1
+            else:
+                face_i = next(j for j, r in enumerate(f_records) if c in r.split())
+                OBJLoader._records_error(text, 'f', f_records, face_i)
+        return vertex_idx, normal_idx
+    
+    @staticmethod
+    def _records_error(text:str, key:str, records:List[str], record_idx:int):
+        """Raise parse_error with the line number of records[record_idx]"""
+        found = -1
+        for i, line in enumerate(text.splitlines()):
+            vars = line.split(None, 1)
+            if len(vars) > 0 and vars[0] == key:
+                found = found + 1
+                if found == record_idx:
+                    OBJLoader.parse_error(i, line)
+        OBJLoader.parse_error(-1, records[record_idx])
                 
     @staticmethod
     def parse_error(linenum, line):
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+from typing import Union, List
+from concurrent.futures import Future
+
+import glm
+import numpy as np
+
+from .vertex_object import VertexObjectInfo
+from .base_object import BaseObject, transform_stats
+from ..struct import Vec3D
+
+from ..context import ContextBase
+
+class SceneArrays:
+    """SceneArrays stores transforms of every node of a scene in contiguous numpy arrays, one row per node
+    
+    - parents: (N) row index of the parent node, -1 for roots
+    - trs: (N x 9) local position, rotation (radians, applied in x, y, z order) and scale
+    - local_transforms, global_transforms: (N x 4 x 4) row-major matrices
+    - dirty: (N) True if trs of the node has changed since the last update
+    
+    Nodes are grouped by depth in topological order (parents before children), and update()
+    rebuilds matrices with one vectorized pass per depth level, only for dirty nodes and their descendants.
+    Rows of removed nodes are reused by new nodes.
+    """
+    def __init__(self, capacity:int=64) -> None:
+        self.count = 0
+        self.free: List[int] = []
+        
+        self.parents = np.full(capacity, -1, dtype=np.int64)
+        self.trs = np.zeros((capacity, 9))
+        self.local_transforms = np.tile(np.eye(4), (capacity, 1, 1))
+        self.global_transforms = np.tile(np.eye(4), (capacity, 1, 1))
+        self.dirty = np.zeros(capacity, dtype=bool)
+        self.alive = np.zeros(capacity, dtype=bool)
+        
+        # row indices of each depth level, rebuilt when parents change
+        self.levels: Union[List[np.ndarray], None] = None
+    
+    def __len__(self) -> int:
+        return self.count - len(self.free)
+    
+    @property
+    def positions(self) -> np.ndarray:
+        return self.trs[:self.count, 0:3]
+    
+    @property
+    def rotations(self) -> np.ndarray:
+        return self.trs[:self.count, 3:6]
+    
+    @property
+    def scales(self) -> np.ndarray:
+        return self.trs[:self.count, 6:9]
+    
+    def add_node(self, parent:int=-1) -> int:
+        if len(self.free) > 0:
+            idx = self.free.pop()
+        else:
+            if self.count == len(self.parents):
+                self.grow(len(self.parents) * 2)
+            idx = self.count
+            self.count += 1
+        
+        self.trs[idx] = (0, 0, 0, 0, 0, 0, 1, 1, 1)
+        self.local_transforms[idx] = np.eye(4)
+        self.global_transforms[idx] = np.eye(4)
+        self.alive[idx] = True
+        self.set_parent(idx, parent)
+        
+        return idx
+    
+    def remove_node(self, idx:int):
+        self.alive[idx] = False
+        self.dirty[idx] = False
+        self.parents[idx] = -1
+        self.free.append(idx)
+        self.levels = None
+    
+    def grow(self, capacity:int):
+        count = len(self.parents)
+        
+        self.parents = np.concatenate([self.parents, np.full(capacity - count, -1, dtype=np.int64)])
+        self.trs = np.concatenate([self.trs, np.zeros((capacity - count, 9))])
+        self.local_transforms = np.concatenate([self.local_transforms, np.tile(np.eye(4), (capacity - count, 1, 1))])
+        self.global_transforms = np.concatenate([self.global_transforms, np.tile(np.eye(4), (capacity - count, 1, 1))])
+        self.dirty = np.concatenate([self.dirty, np.zeros(capacity - count, dtype=bool)])
+        self.alive = np.concatenate([self.alive, np.zeros(capacity - count, dtype=bool)])
+    
+    def set_parent(self, idx:int, parent:int):
+        self.parents[idx] = parent
+        self.dirty[idx] = True
+        self.levels = None
+    
+    def set_dirty(self, idx:int):
+        self.dirty[idx] = True
+    
+    def build_levels(self):
+        parents = self.parents[:self.count]
+        has_parent = parents >= 0
+        
+        # depth of a node is one more than its parent's, it's settled after (max depth) passes
+        depths = np.zeros(self.count, dtype=np.int64)
+        for _ in range(self.count):
+            new_depths = np.where(has_parent, depths[parents] + 1, 0)
+            if np.array_equal(new_depths, depths):
+                break
+            depths = new_depths
+        else:
+            raise Exception("Scene graph has a cycle")
+        
+        alive = self.alive[:self.count]
+        self.levels = [np.nonzero(alive & (depths == d))[0] for d in range(depths.max(initial=0) + 1)]
+    
+    def compose_local(self, rows:np.ndarray) -> np.ndarray:
+        """return (len(rows) x 4 x 4) T * Rz * Ry * Rx * S of rows, the same as BaseObject.update_global_transform"""
+        trs = self.trs[rows]
+        cx, cy, cz = np.cos(trs[:, 3:6]).T
+        sx, sy, sz = np.sin(trs[:, 3:6]).T
+        
+        M = np.zeros((len(rows), 4, 4))
+        M[:, 0, 0] = cz * cy
+        M[:, 0, 1] = cz * sy * sx - sz * cx
+        M[:, 0, 2] = cz * sy * cx + sz * sx
+        M[:, 1, 0] = sz * cy
+        M[:, 1, 1] = sz * sy * sx + cz * cx
+        M[:, 1, 2] = sz * sy * cx - cz * sx
+        M[:, 2, 0] = -sy
+        M[:, 2, 1] = cy * sx
+        M[:, 2, 2] = cy * cx
+        
+        # R * S scales the columns of R
+        M[:, :3, :3] *= trs[:, None, 6:9]
+        M[:, :3, 3] = trs[:, 0:3]
+        M[:, 3, 3] = 1
+        
+        return M
+    
+    def update(self):
+        """rebuild local transforms of dirty nodes and global transforms of them and their descendants"""
+        dirty = self.dirty[:self.count]
+        if not dirty.any():
+            return
+        
+        if self.levels is None:
+            self.build_levels()
+        
+        rows = np.nonzero(dirty)[0]
+        self.local_transforms[rows] = self.compose_local(rows)
+        
+        changed = dirty.copy()
+        for depth, level in enumerate(self.levels):
+            if depth > 0:
+                changed[level] |= changed[self.parents[level]]
+            
+            rows_changed = level[changed[level]]
+            if len(rows_changed) == 0:
+                continue
+            
+            if depth == 0:
+                self.global_transforms[rows_changed] = self.local_transforms[rows_changed]
+            else:
+                self.global_transforms[rows_changed] = self.global_transforms[self.parents[rows_changed]] @ self.local_transforms[rows_changed]
+        
+        transform_stats.local_rebuilt += len(rows)
+        transform_stats.global_rebuilt += int(changed.sum())
+        
+        dirty[:] = False
+
+
+class Vec3DRow:
+    """Vec3D-like view of one vector (position, rotation or scale) of a node of SceneArrays,
+    setting a component marks the node dirty
+    """
+    __slots__ = ("scene", "idx", "col")
+    
+    def __init__(self, scene:SceneArrays, idx:int, col:int) -> None:
+        self.scene = scene
+        self.idx = idx
+        self.col = col
+    
+    def get(self, i:int) -> float:
+        return float(self.scene.trs[self.idx, self.col + i])
+    
+    def set(self, i:int, value:float):
+        if self.scene.trs[self.idx, self.col + i] != value:
+            self.scene.trs[self.idx, self.col + i] = value
+            self.scene.dirty[self.idx] = True
+    
+    @property
+    def x(self) -> float:
+        return self.get(0)
+    
+    @x.setter
+    def x(self, value:float):
+        self.set(0, value)
+    
+    @property
+    def y(self) -> float:
+        return self.get(1)
+    
+    @y.setter
+    def y(self, value:float):
+        self.set(1, value)
+    
+    @property
+    def z(self) -> float:
+        return self.get(2)
+    
+    @z.setter
+    def z(self, value:float):
+        self.set(2, value)
+    
+    @property
+    def w(self) -> float:
+        return 0.
+    
+    def data(self, contain_w:bool=False):
+        if contain_w:
+            return [self.x, self.y, self.z, self.w]
+        else:
+            return [self.x, self.y, self.z]
+    
+    def __repr__(self) -> str:
+        return f"Vec3DRow(x={self.x}, y={self.y}, z={self.z})"
+
+
+class SceneObject(BaseObject):
+    """BaseObject whose transforms are stored in a row of SceneArrays
+    
+    local_position, local_rotation and local_scale are Vec3DRow views of the row,
+    assigning a Vec3D copies its values (the Vec3D is not shared with the object).
+    Global transforms of all nodes of the scene are updated at once by SceneArrays.update,
+    so every object of a hierarchy has to be a SceneObject of the same scene.
+    """
+    def __init__(self, name:str, context:ContextBase, vertices_info:Union[VertexObjectInfo, Future, None], scene:SceneArrays) -> None:
+        self.scene = scene
+        self.idx = scene.add_node()
+        
+        super().__init__(name, context, vertices_info)
+    
+    def set_vec(self, col:int, value:Union[Vec3D, Vec3DRow]):
+        self.scene.trs[self.idx, col:col + 3] = (value.x, value.y, value.z)
+        self.scene.dirty[self.idx] = True
+    
+    @property
+    def local_position(self) -> Vec3DRow:
+        return Vec3DRow(self.scene, self.idx, 0)
+    
+    @local_position.setter
+    def local_position(self, value:Union[Vec3D, Vec3DRow]):
+        self.set_vec(0, value)
+    
+    @property
+    def local_rotation(self) -> Vec3DRow:
+        return Vec3DRow(self.scene, self.idx, 3)
+    
+    @local_rotation.setter
+    def local_rotation(self, value:Union[Vec3D, Vec3DRow]):
+        self.set_vec(3, value)
+    
+    @property
+    def local_scale(self) -> Vec3DRow:
+        return Vec3DRow(self.scene, self.idx, 6)
+    
+    @local_scale.setter
+    def local_scale(self, value:Union[Vec3D, Vec3DRow]):
+        self.set_vec(6, value)
+    
+    @property
+    def parent(self) -> Union[BaseObject, None]:
+        return self.__dict__.get("_parent")
+    
+    @parent.setter
+    def parent(self, value:Union[BaseObject, None]):
+        if value is not None and not (isinstance(value, SceneObject) and value.scene is self.scene):
+            raise Exception(f"Parent of {self.name} has to be a SceneObject of the same SceneArrays")
+        
+        self.__dict__["_parent"] = value
+        self.scene.set_parent(self.idx, value.idx if value is not None else -1)
+    
+    def add_children(self, object:BaseObject):
+        if not (isinstance(object, SceneObject) and object.scene is self.scene):
+            raise Exception(f"Child of {self.name} has to be a SceneObject of the same SceneArrays")
+        
+        super().add_children(object)
+    
+    @property
+    def global_transform(self) -> glm.mat4:
+        return glm.mat4(self.scene.global_transforms[self.idx])
+    
+    @global_transform.setter
+    def global_transform(self, value:glm.mat4):
+        self.scene.global_transforms[self.idx] = np.array(value)
+    
+    def set_transform_dirty(self):
+        self.scene.dirty[self.idx] = True
+    
+    def update_global_transform(self, parent_changed:bool=False):
+        """update global transforms of every node of the scene, not only this object and its children"""
+        transform_stats.objects += 1
+        self.scene.update()
+        
+        return self.global_transform
+    
+    def destroy(self):
+        super().destroy()
+        
+        if self.scene.alive[self.idx]:
+            self.scene.remove_node(self.idx)
\ No newline at end of file
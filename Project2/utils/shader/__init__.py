@@ -1 +1 @@
-from .shaders import get_shader_program, Shader, frame_shader, phong_shader
\ No newline at end of file
+from .shaders import get_shader_program, Shader, FRAME_DATA_BINDING, frame_shader, phong_shader, instanced_phong_shader
\ No newline at end of file
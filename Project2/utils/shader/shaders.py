@@ -2,23 +2,40 @@ from .load import load_shaders
 
 from OpenGL.GL import *
 
+# uniform buffer binding point of the FrameData block, see core.frame_data
+FRAME_DATA_BINDING = 0
+
+# data shared by every draw of a frame, written once per frame by FrameData (std140 layout)
+g_frame_data_block = \
+"""
+    layout (std140) uniform FrameData
+    {
+        mat4 view;
+        mat4 projection;
+        mat4 VP;
+        vec4 camera_pos;
+        vec4 light_positions[2];
+        vec4 light_colors[2];
+    };
+"""
+
 g_vertex_shader_src = \
 """
     #version 330 core
-
+""" + g_frame_data_block + """
     layout (location = 0) in vec3 vin_pos; 
     layout (location = 1) in vec3 vin_color; 
 
     out vec4 vout_color;
 
-    uniform mat4 MVP;
+    uniform mat4 M;
 
     void main()
     {
         // 3D points in homogeneous coordinates
         vec4 p3D_in_hcoord = vec4(vin_pos.xyz, 1.0);
 
-        gl_Position = MVP * p3D_in_hcoord;
+        gl_Position = VP * M * p3D_in_hcoord;
 
         vout_color = vec4(vin_color, 1.);
     }
@@ -40,22 +57,21 @@ g_fragment_shader_src = \
 g_vertex_shader_src2 = \
 '''
     #version 330 core
-
+''' + g_frame_data_block + '''
     layout (location = 0) in vec3 vin_pos; 
     layout (location = 1) in vec3 vin_normal; 
 
     out vec3 vout_surface_pos;
     out vec3 vout_normal;
 
-    uniform mat4 MVP;
     uniform mat4 M;
 
     void main()
     {
-        vec4 p3D_in_hcoord = vec4(vin_pos.xyz, 1.0);
-        gl_Position = MVP * p3D_in_hcoord;
+        vec4 surface_pos = M * vec4(vin_pos.xyz, 1.0);
+        gl_Position = VP * surface_pos;
 
-        vout_surface_pos = vec3(M * vec4(vin_pos, 1));
+        vout_surface_pos = vec3(surface_pos);
         vout_normal = normalize( mat3(inverse(transpose(M)) ) * vin_normal);
     }
 '''
@@ -63,25 +79,125 @@ g_vertex_shader_src2 = \
 g_fragment_shader_src2 = \
 '''
     #version 330 core
-
+''' + g_frame_data_block + '''
     in vec3 vout_surface_pos;
     in vec3 vout_normal;
 
     out vec4 FragColor;
 
-    uniform vec3 view_pos;
     uniform vec3 material_color;
 
     void main()
     {
+        vec3 view_pos = camera_pos.xyz;
+        
         // light and material properties
-        vec3 light_pos = vec3(6,4,11);
-        vec3 light_color = vec3(0.7,0.9,0.6);
+        vec3 light_pos = light_positions[0].xyz;
+        vec3 light_color = light_colors[0].rgb;
         // vec3 material_color = vec3(0.5,0.5,0.9);
         float material_shininess = 64.0;
         
-        vec3 light_pos2 = vec3(-4,4,-8);
-        vec3 light_color2 = vec3(0.6,0.1,0.3);
+        vec3 light_pos2 = light_positions[1].xyz;
+        vec3 light_color2 = light_colors[1].rgb;
+
+        // light components
+        vec3 light_ambient = 0.1*light_color;
+        vec3 light_diffuse = light_color;
+        vec3 light_specular = light_color;
+        
+        vec3 light_ambient2 = 0.1*light_color2;
+        vec3 light_diffuse2 = light_color2;
+        vec3 light_specular2 = light_color2;
+
+        // material components
+        vec3 material_ambient = material_color;
+        vec3 material_diffuse = material_color;
+        vec3 material_specular = light_color;  // for non-metal material
+        
+        vec3 material_specular2 = light_color2;
+
+        // ambient
+        vec3 ambient = light_ambient * material_ambient;
+        
+        vec3 ambient2 = light_ambient2 * material_ambient;
+
+        // for diffiuse and specular
+        vec3 normal = normalize(vout_normal);
+        vec3 surface_pos = vout_surface_pos;
+        vec3 light_dir = normalize(light_pos - surface_pos);
+        
+        vec3 light_dir2 = normalize(light_pos2 - surface_pos);
+
+        // diffuse
+        float diff = max(dot(normal, light_dir), 0);
+        vec3 diffuse = diff * light_diffuse * material_diffuse;
+        
+        float diff2 = max(dot(normal, light_dir2), 0);
+        vec3 diffuse2 = diff2 * light_diffuse2 * material_diffuse;
+
+        // specular
+        vec3 view_dir = normalize(view_pos - surface_pos);
+        vec3 reflect_dir = reflect(-light_dir, normal);
+        float spec = pow( max(dot(view_dir, reflect_dir), 0.0), material_shininess);
+        vec3 specular = spec * light_specular * material_specular;
+        
+        vec3 reflect_dir2 = reflect(-light_dir2, normal);
+        float spec2 = pow( max(dot(view_dir, reflect_dir2), 0.0), material_shininess);
+        vec3 specular2 = spec * light_specular2 * material_specular;
+
+        vec3 color = ambient + diffuse + specular + ambient2 + diffuse2 + specular2;
+        FragColor = vec4(color, 1.);
+    }
+'''
+
+# phong shader drawing many instances of a mesh at once,
+# model matrix and material color are per instance attributes instead of uniforms
+g_vertex_shader_src2_instanced = \
+'''
+    #version 330 core
+''' + g_frame_data_block + '''
+    layout (location = 0) in vec3 vin_pos; 
+    layout (location = 1) in vec3 vin_normal; 
+    layout (location = 2) in mat4 vin_M;                // locations 2 ~ 5, one column each
+    layout (location = 6) in vec3 vin_material_color;
+
+    out vec3 vout_surface_pos;
+    out vec3 vout_normal;
+    flat out vec3 material_color;
+
+    void main()
+    {
+        vec4 surface_pos = vin_M * vec4(vin_pos.xyz, 1.0);
+        gl_Position = VP * surface_pos;
+
+        vout_surface_pos = vec3(surface_pos);
+        vout_normal = normalize( mat3(inverse(transpose(vin_M)) ) * vin_normal);
+        material_color = vin_material_color;
+    }
+'''
+
+g_fragment_shader_src2_instanced = \
+'''
+    #version 330 core
+''' + g_frame_data_block + '''
+    in vec3 vout_surface_pos;
+    in vec3 vout_normal;
+
+    out vec4 FragColor;
+
+    flat in vec3 material_color;             // per instance, from the vertex shader
+
+    void main()
+    {
+        vec3 view_pos = camera_pos.xyz;
+        
+        // light and material properties
+        vec3 light_pos = light_positions[0].xyz;
+        vec3 light_color = light_colors[0].rgb;
+        float material_shininess = 64.0;
+        
+        vec3 light_pos2 = light_positions[1].xyz;
+        vec3 light_color2 = light_colors[1].rgb;
 
         // light components
         vec3 light_ambient = 0.1*light_color;
@@ -161,6 +277,12 @@ class Shader():
         for uv in self.uniform_vars:
             self.uniform_var_locs[uv] = glGetUniformLocation(self.program, uv)
         
+        # FrameData block is read from the uniform buffer at FRAME_DATA_BINDING
+        block_index = glGetUniformBlockIndex(self.program, "FrameData")
+        if block_index != GL_INVALID_INDEX:
+            glUniformBlockBinding(self.program, block_index, FRAME_DATA_BINDING)
+            
             
-frame_shader = Shader(g_vertex_shader_src, g_fragment_shader_src, ['MVP'])
-phong_shader = Shader(g_vertex_shader_src2, g_fragment_shader_src2, ['MVP',"M","view_pos", "material_color"])
\ No newline at end of file
+frame_shader = Shader(g_vertex_shader_src, g_fragment_shader_src, ['M'])
+phong_shader = Shader(g_vertex_shader_src2, g_fragment_shader_src2, ["M", "material_color"])
+instanced_phong_shader = Shader(g_vertex_shader_src2_instanced, g_fragment_shader_src2_instanced, [])
\ No newline at end of file
@@ -1 +1 @@
-from .primitive import Color, Point, Vec2D, Vec3D, Face, TriangleFace, ObjectFaces, Vertex3D
\ No newline at end of file
+from .primitive import Color, Point, Vec2D, Vec3D, TrackedVec3D, Face, TriangleFace, ObjectFaces, Vertex3D, ObjectArrays, StructArrayView, VEC3D_DTYPE, COLOR_DTYPE, VERTEX3D_DTYPE
\ No newline at end of file
@@ -1,7 +1,33 @@
-from dataclasses import dataclass, astuple # module
-from typing import List, Tuple, Union
+from dataclasses import dataclass, astuple, fields # module
+from typing import List, Tuple, Union, Sequence
 
+import numpy as np
 
+
+def slotted(*extra_slots:str):
+    """Give a dataclass __slots__ of its fields (and extra_slots) instead of a per instance __dict__,
+    the same as dataclass(slots=True) of python 3.10, which isn't available on older versions.
+    
+    Default values stay in the generated __init__, they are removed from the class.
+    """
+    def wrap(cls):
+        names = tuple(f.name for f in fields(cls))
+        
+        cls_dict = dict(cls.__dict__)
+        cls_dict["__slots__"] = names + extra_slots
+        for name in names:
+            cls_dict.pop(name, None)
+        cls_dict.pop("__dict__", None)
+        cls_dict.pop("__weakref__", None)
+        
+        new_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+        new_cls.__qualname__ = cls.__qualname__
+        return new_cls
+    
+    return wrap
+
+
+@slotted()
 @dataclass
 class Color():
     r:float=0
@@ -25,6 +51,7 @@ class Color():
         return Color(1.0, 1.0, 1.0)
     
 
+@slotted()
 @dataclass
 class Point():
     x:float=0.
@@ -39,25 +66,56 @@ class Point():
             return (self.x, self.y, self.z, *astuple(Color.WHITE()))        
         
         
+@slotted()
 @dataclass
 class Vec2D():
     x:float=0.
     y:float=0.
     w:float=0.
 
-@dataclass
+@slotted("_owners")
+@dataclass(eq=False)
 class Vec3D():
     x:float=0.
     y:float=0.
     z:float=0.
     w:float=0.
     
+    def __eq__(self, other):
+        # TrackedVec3D is equal to Vec3D with the same values
+        if not isinstance(other, Vec3D):
+            return NotImplemented
+        return (self.x, self.y, self.z, self.w) == (other.x, other.y, other.z, other.w)
+    
     def data(self, contain_w:bool=False):
         if contain_w:
             return [self.x, self.y, self.z, self.w]
         else:
             return [self.x, self.y, self.z]
     
+    @staticmethod
+    def from_record(record) -> "Vec3D":
+        """Vec3D of an element of VEC3D_DTYPE array"""
+        return Vec3D(float(record["x"]), float(record["y"]), float(record["z"]), float(record["w"]))
+    
+    
+class TrackedVec3D(Vec3D):
+    """Vec3D used as local transform of BaseObjects, they are marked dirty when a component changes.
+    
+    BaseObject.track_transform_vec turns a Vec3D into TrackedVec3D (and back) by changing its class,
+    so setting a component of other Vec3D doesn't pay for the check.
+    """
+    __slots__ = ()
+    
+    def __setattr__(self, name, value):
+        owners = self._owners
+        if owners is not None and getattr(self, name) != value:
+            object.__setattr__(self, name, value)
+            for o in owners:
+                o.set_transform_dirty()
+        else:
+            object.__setattr__(self, name, value)
+    
     
 @dataclass
 class Face():
@@ -76,9 +134,142 @@ class ObjectFaces():
     faces: List[TriangleFace] # List[(vertex inx, vertex normal idx)]
     
 
+@slotted()
 @dataclass
 class Vertex3D():
     position:Vec3D = Vec3D(0, 0, 0, 1)
     color:Union[Color, None] = None
     normal:Union[Vec3D, None] = None
-    
\ No newline at end of file
+    
+    @staticmethod
+    def from_record(record) -> "Vertex3D":
+        """Vertex3D of an element of VERTEX3D_DTYPE array, color and normal are None if they are NaN"""
+        color, normal = record["color"], record["normal"]
+        return Vertex3D(
+            Vec3D.from_record(record["position"]),
+            None if np.isnan(color["r"]) else Color(float(color["r"]), float(color["g"]), float(color["b"])),
+            None if np.isnan(normal["x"]) else Vec3D.from_record(normal)
+        )
+    
+    
+# numpy dtypes with the fields of the value types, to keep many of them in one structured array
+VEC3D_DTYPE = np.dtype([("x", np.float32), ("y", np.float32), ("z", np.float32), ("w", np.float32)])
+COLOR_DTYPE = np.dtype([("r", np.float32), ("g", np.float32), ("b", np.float32)])
+VERTEX3D_DTYPE = np.dtype([("position", VEC3D_DTYPE), ("color", COLOR_DTYPE), ("normal", VEC3D_DTYPE)])
+
+
+class StructArrayView(Sequence):
+    """List of value types (eg. Vertex3D) backed by a numpy structured array of their dtype (eg. VERTEX3D_DTYPE).
+    A field of every element is a numpy array (view["position"]["x"]), 
+    and an instance of the value type is created only when an element is accessed.
+    """
+    def __init__(self, arr:np.ndarray, from_record) -> None:
+        self.arr = arr
+        self.from_record = from_record
+        
+    def __len__(self) -> int:
+        return len(self.arr)
+    
+    def __getitem__(self, idx):
+        if isinstance(idx, str):
+            return self.arr[idx]
+        if isinstance(idx, slice):
+            return StructArrayView(self.arr[idx], self.from_record)
+        return self.from_record(self.arr[idx])
+    
+    
+
+class Vec3DArrayView(Sequence):
+    """Read-only list of Vec3D backed by a (N, 3) or (N, 4) numpy array.
+    Vec3D instances are created only when an element is accessed.
+    """
+    def __init__(self, arr:np.ndarray) -> None:
+        self.arr = arr
+        
+    def __len__(self) -> int:
+        return len(self.arr)
+    
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return Vec3DArrayView(self.arr[idx])
+        return Vec3D(*self.arr[idx].tolist())
+    
+
+class TriangleFaceArrayView(Sequence):
+    """Read-only list of TriangleFace backed by two (T, 3) index arrays
+    (vertex index, vertex normal index) for the corners of each triangle.
+    """
+    def __init__(self, vertex_idx:np.ndarray, normal_idx:np.ndarray) -> None:
+        self.vertex_idx = vertex_idx
+        self.normal_idx = normal_idx
+        
+    def __len__(self) -> int:
+        return len(self.vertex_idx)
+    
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return TriangleFaceArrayView(self.vertex_idx[idx], self.normal_idx[idx])
+        v = self.vertex_idx[idx].tolist()
+        n = self.normal_idx[idx].tolist()
+        return TriangleFace((v[0], n[0]), (v[1], n[1]), (v[2], n[2]))
+
+
+@dataclass
+class ObjectArrays():
+    """Contiguous numpy storage of an obj file
+    
+    - positions: (N, 4) float32, w is 1 when the file omits it
+    - normals: (M, 3) float32
+    - face_vertex_idx, face_normal_idx: (K,) int32, corners of all faces in file order (-1 when a corner has no normal)
+    - face_vertex_counts: (F,) int32, number of corners of each face
+    """
+    positions: np.ndarray
+    normals: np.ndarray
+    face_vertex_idx: np.ndarray
+    face_normal_idx: np.ndarray
+    face_vertex_counts: np.ndarray
+    
+    def triangle_corners(self) -> np.ndarray:
+        """Fan-triangulate every face (same order as OBJLoader.faces_to_triangles)
+        and return (T, 3) indices into the flattened corner arrays
+        """
+        counts = self.face_vertex_counts.astype(np.int64)
+        tri_counts = counts - 2
+        first_corner = np.cumsum(counts) - counts
+        
+        tri_first = np.repeat(first_corner, tri_counts)
+        tri_offset = np.cumsum(tri_counts) - tri_counts
+        fan_idx = np.arange(int(tri_counts.sum())) - np.repeat(tri_offset, tri_counts) + 1
+        
+        return np.stack([tri_first, tri_first + fan_idx, tri_first + fan_idx + 1], axis=1)
+    
+    def object_faces(self) -> ObjectFaces:
+        """ObjectFaces view over the arrays; no per vertex objects are created up front"""
+        tri = self.triangle_corners()
+        return ObjectFaces(
+            Vec3DArrayView(self.positions), 
+            Vec3DArrayView(self.normals), 
+            TriangleFaceArrayView(self.face_vertex_idx[tri], self.face_normal_idx[tri])
+        )
+    
+    def triangle_vertices(self) -> StructArrayView:
+        """Vertex3D of every triangle corner (same as OBJLoader.obj_to_vertices) in one VERTEX3D_DTYPE array"""
+        corners = self.triangle_corners().reshape(-1)
+        vertex_idx = self.face_vertex_idx[corners]
+        normal_idx = self.face_normal_idx[corners]
+        
+        vertices = np.empty(len(corners), dtype=VERTEX3D_DTYPE)
+        positions = self.positions[vertex_idx]
+        for i, name in enumerate("xyzw"):
+            vertices["position"][name] = positions[:, i]
+        
+        vertices["color"] = (np.nan, np.nan, np.nan)
+        
+        has_normal = normal_idx >= 0
+        normals = np.full((len(corners), 3), np.nan, dtype=np.float32)
+        normals[has_normal] = self.normals[normal_idx[has_normal]]
+        for i, name in enumerate("xyz"):
+            vertices["normal"][name] = normals[:, i]
+        vertices["normal"]["w"] = 0
+        
+        return StructArrayView(vertices, Vertex3D.from_record)
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""Check ForwardKinematics against joint transforms composed with glm per joint and per channel 
+(how BVHObject.update_global_transform computed them before), and compare their speed
+
+Every frame of the file is checked, the script fails if any transform differs by more than --tol.
+
+usage (in Project3 directory): python -m bench.bvh_fk [--tol 2e-6] [bvh_file]
+"""
+import time
+import argparse
+
+import glm
+import numpy as np
+
+from utils.animation import ForwardKinematics
+from utils.animation.bvh_object import ChannelType
+
+
+class Joint:
+    def __init__(self, parents, offsets, channels, j) -> None:
+        self.parent = parents[j]
+        self.offset = offsets[j]
+        self.channels = channels[j]
+
+
+def read_skeleton(file_path):
+    """return parents, offsets, channels of each joint and (frames x channels) motion, read without BVHLoader (no GL objects)"""
+    parents, offsets, channels = [], [], []
+    stack = []
+    
+    with open(file_path, "r") as f:
+        lines = f.read().splitlines()
+    
+    i = 0
+    in_end_site = False
+    while i < len(lines):
+        v = lines[i].split()
+        i += 1
+        if len(v) == 0:
+            continue
+        if v[0] in ("ROOT", "JOINT"):
+            parents.append(stack[-1] if stack else -1)
+            stack.append(len(parents) - 1)
+        elif v[0] == "End":
+            in_end_site = True
+        elif v[0] == "OFFSET" and not in_end_site:
+            offsets.append([float(x) for x in v[1:4]])
+        elif v[0] == "CHANNELS":
+            channels.append([ChannelType[c] for c in v[2:]])
+        elif v[0] == "}":
+            if in_end_site:
+                in_end_site = False
+            else:
+                stack.pop()
+        elif v[0] == "Frame" and v[1] == "Time:":
+            break
+    
+    motion = np.loadtxt(lines[i:], dtype=np.float32, ndmin=2)
+    return parents, offsets, channels, motion
+
+def glm_pose(joints, scales, frame):
+    """global transforms of one frame, composed the same way as BVHObject.update_global_transform before ForwardKinematics"""
+    transforms = []
+    chan_idx = 0
+    for j, jo in enumerate(joints):
+        anim_data = frame[chan_idx:chan_idx + len(jo.channels)].tolist()
+        chan_idx += len(jo.channels)
+        
+        parent_transform = glm.mat4() if jo.parent < 0 else transforms[jo.parent]
+        
+        M = glm.translate(glm.vec3(*jo.offset))
+        for i, c in enumerate(jo.channels):
+            if c.value < 3:
+                t = glm.vec3(0, 0, 0)
+                t[c.value] = anim_data[i]
+                M = M * glm.translate(t)
+            else:
+                axis = glm.vec3(0, 0, 0)
+                axis[c.value - 3] = 1
+                M = M * glm.rotate(glm.radians(anim_data[i]), axis)
+        
+        S = glm.scale(glm.vec3(*scales[j]))
+        transforms.append(parent_transform * S * M)
+    
+    return transforms
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("bvh_file", nargs="?", default="0007_Crawling001.bvh.txt")
+    parser.add_argument("--tol", type=float, default=2e-6, help="max difference relative to the largest translation (float32 rounding of glm, see tests.test_bvh_fk)")
+    args = parser.parse_args()
+    
+    parents, offsets, channels, motion = read_skeleton(args.bvh_file)
+    scales = [[1, 1, 1] for _ in parents]
+    scales[0] = [0.01, 0.01, 0.01]
+    
+    joints = [Joint(parents, offsets, channels, j) for j in range(len(parents))]
+    fk = ForwardKinematics(
+        parents=parents,
+        offsets=offsets,
+        scales=scales,
+        chan_types=[c.value for chans in channels for c in chans],
+        chan_joints=[j for j, chans in enumerate(channels) for _ in chans]
+    )
+    
+    start_time = time.perf_counter()
+    reference = np.array([[np.array(m) for m in glm_pose(joints, scales, frame)] for frame in motion])
+    glm_time = time.perf_counter() - start_time
+    
+    start_time = time.perf_counter()
+    for frame in motion:
+        fk.evaluate(frame)
+    fk_frame_time = time.perf_counter() - start_time
+    
+    start_time = time.perf_counter()
+    poses = fk.evaluate(motion)
+    fk_batch_time = time.perf_counter() - start_time
+    
+    scale = max(1., np.abs(reference[:, :, :3, 3]).max())
+    err = np.abs(poses - reference).max() / scale
+    
+    frames = len(motion)
+    print(f"{frames} frames, {len(parents)} joints, {fk.chan_num} channels")
+    print(f"glm per joint:     {glm_time / frames * 1e6:10.1f} us / frame")
+    print(f"fk one frame:      {fk_frame_time / frames * 1e6:10.1f} us / frame")
+    print(f"fk all frames:     {fk_batch_time / frames * 1e6:10.1f} us / frame")
+    print(f"max relative diff: {err:.2e}")
+    
+    if err > args.tol:
+        raise Exception(f"ForwardKinematics is not matching glm transforms, max relative diff {err}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""Compare parsing the MOTION block of a .bvh file into per joint lists of floats 
+(how BVHLoader stored anim_frames before) with the columnar numpy parser (BVHLoader.parse_motion)
+
+A synthetic file is written with the hierarchy of the given .bvh file and random motion data.
+Memory is the size of the parsed motion data kept after parsing, measured with tracemalloc.
+
+usage (in Project3 directory): python -m bench.bvh_motion [--frames 100000] [bvh_file]
+"""
+import os, time, tempfile, tracemalloc
+import argparse
+
+import numpy as np
+
+from utils.animation import BVHLoader
+
+
+def split_bvh(file_path):
+    """return (hierarchy text, number of channels)"""
+    with open(file_path, "r") as f:
+        text = f.read()
+    
+    hierarchy = text[:text.index("MOTION")]
+    chan_nums = [int(l.split()[1]) for l in hierarchy.splitlines() if l.strip().startswith("CHANNELS")]
+    
+    return hierarchy, sum(chan_nums), chan_nums
+
+def write_synthetic_bvh(hierarchy, chan_num, frames):
+    rng = np.random.default_rng(0)
+    motion = rng.uniform(-180, 180, (frames, chan_num))
+    
+    f = tempfile.NamedTemporaryFile("w", suffix=".bvh", delete=False)
+    with f:
+        f.write(hierarchy)
+        f.write(f"MOTION\nFrames: {frames}\nFrame Time: 0.008333\n")
+        np.savetxt(f, motion, fmt="%.4f")
+    
+    return f.name
+
+def read_motion_text(file_path):
+    with open(file_path, "r") as f:
+        text = f.read()
+    return text[text.index("Frame Time:"):].split("\n", 1)[1]
+
+def parse_per_joint(text, chan_nums):
+    """motion parsing of BVHLoader before columnar storage, one list per joint per frame"""
+    anim_frames = [[] for _ in chan_nums]
+    for line in text.splitlines():
+        if len(line.strip()) == 0:
+            continue
+        vars = line.split()
+        data_idx = 0
+        for jo, chan_num in enumerate(chan_nums):
+            chan_data = []
+            for data_i in range(chan_num):
+                chan_data.append(float(vars[data_idx + data_i]))
+            anim_frames[jo].append(chan_data)
+            data_idx = data_idx + chan_num
+    return anim_frames
+
+def measure(func):
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start_time
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current, peak
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("bvh_file", nargs="?", default="0007_Crawling001.bvh.txt")
+    parser.add_argument("--frames", type=int, default=100000)
+    args = parser.parse_args()
+    
+    hierarchy, chan_num, chan_nums = split_bvh(args.bvh_file)
+    file_path = write_synthetic_bvh(hierarchy, chan_num, args.frames)
+    
+    try:
+        text = read_motion_text(file_path)
+        print(f"{args.frames} frames, {len(chan_nums)} joints, {chan_num} channels, {os.path.getsize(file_path) / 2**20:.1f} MiB")
+        print(f"{'':>12}{'parse (s)':>12}{'kept (MiB)':>12}{'peak (MiB)':>12}")
+        
+        per_joint, t, cur, peak = measure(lambda: parse_per_joint(text, chan_nums))
+        print(f"{'per joint':>12}{t:>12.3f}{cur / 2**20:>12.1f}{peak / 2**20:>12.1f}")
+        
+        motion, t, cur, peak = measure(lambda: BVHLoader.parse_motion(text, chan_num))
+        print(f"{'columnar':>12}{t:>12.3f}{cur / 2**20:>12.1f}{peak / 2**20:>12.1f}")
+        
+        if not np.allclose(np.array(per_joint[-1], dtype=np.float32), motion[:, -chan_nums[-1]:]):
+            raise Exception("parsed motion data is not matching")
+    finally:
+        os.remove(file_path)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
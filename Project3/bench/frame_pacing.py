@@ -0,0 +1,102 @@
+"""Compare CPU usage of the pacing modes of FramePacer
+
+- window (default): the viewer with a paused .bvh file (or only the grid) is run for --seconds in each mode,
+  nothing changes on the screen, so ON_DEMAND should only wait for events
+- --synthetic: no window, a frame is --work-ms of busy work, paced by FramePacer.end_frame.
+  CAPPED is compared with sleep only (spin_time=0), sleep and spin (default) and spin only.
+  Late is how much longer than 1 / max_fps the interval between two frames was (p99)
+
+CPU is CPU time of the process per wall time (100% is a whole core).
+
+usage (in Project3 directory): python -m bench.frame_pacing [--seconds 3] [--synthetic] [--work-ms 2] [bvh_file]
+"""
+import time
+import argparse
+import threading
+
+import numpy as np
+
+from utils.core.frame_pacer import FramePacer, PacingMode
+
+
+def run_window(bvh_file, seconds):
+    import utils
+    
+    manager = utils.GraphicsManager(800, 800, "frame pacing", 60)
+    context = utils.BVHContext(manager)
+    context.stream_motion = False
+    if bvh_file is not None:
+        context.load_bvh_file(bvh_file)
+        utils.asset_loader.flush()
+    
+    print(f"{'mode':<12}{'frames':>8}{'fps':>8}{'idle waits':>12}{'cpu %':>8}")
+    for mode in [PacingMode.UNCAPPED, PacingMode.VSYNC, PacingMode.CAPPED, PacingMode.ON_DEMAND]:
+        manager.set_pacing_mode(mode)
+        manager.backend.set_should_close(False)
+        
+        # window can be closed from another thread, the loop also stops while waiting for events
+        timer = threading.Timer(seconds, lambda: manager.backend.set_should_close(True))
+        
+        stats = manager.frame_pacer.stats
+        stats.clear()
+        timer.start()
+        manager.run(context)
+        timer.join()
+        
+        cpu = stats.cpu_usage() * 100
+        print(f"{mode.name:<12}{stats.frames:>8}{stats.frames / seconds:>8.1f}{stats.idle_waits:>12}{cpu:>8.1f}")
+    
+    manager.exit()
+
+
+def run_synthetic(seconds, work_ms, max_fps):
+    cases = [
+        ("UNCAPPED", PacingMode.UNCAPPED, 0.002),
+        ("sleep", PacingMode.CAPPED, 0),
+        ("sleep+spin", PacingMode.CAPPED, 0.002),
+        ("spin", PacingMode.CAPPED, float("inf")),
+    ]
+    
+    print(f"{work_ms}ms of work per frame, max fps {max_fps}")
+    print(f"{'mode':<12}{'frames':>8}{'fps':>8}{'p99 late ms':>13}{'cpu %':>8}")
+    for name, mode, spin_time in cases:
+        pacer = FramePacer(mode, max_fps, spin_time)
+        pacer.stats.clear()
+        
+        starts = []
+        end_time = time.perf_counter() + seconds
+        while time.perf_counter() < end_time:
+            pacer.begin_frame()
+            frame_start = time.perf_counter()
+            starts.append(frame_start)
+            while time.perf_counter() - frame_start < work_ms / 1000:
+                pass
+            pacer.end_frame()
+        
+        cpu = pacer.stats.cpu_usage() * 100
+        fps = pacer.stats.frames / seconds
+        if mode == PacingMode.CAPPED:
+            # frame i should start 1 / max_fps after frame i - 1 at the latest
+            late = np.diff(starts) - 1 / max_fps
+            late = f"{np.percentile(late, 99) * 1000:.3f}"
+        else:
+            late = "-"
+        print(f"{name:<12}{pacer.stats.frames:>8}{fps:>8.1f}{late:>13}{cpu:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("bvh_file", nargs="?")
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--synthetic", action="store_true", help="pace busy work frames without a window")
+    parser.add_argument("--work-ms", type=float, default=2)
+    parser.add_argument("--max-fps", type=float, default=60)
+    args = parser.parse_args()
+    
+    if args.synthetic:
+        run_synthetic(args.seconds, args.work_ms, args.max_fps)
+    else:
+        run_window(args.bvh_file, args.seconds)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
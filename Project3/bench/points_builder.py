@@ -0,0 +1,59 @@
+"""Compare building point buffers with glm.array.concat in a loop (how VertexObjectHelper.points 
+used to work) with the numpy builder
+
+usage (in Project3 directory): python -m bench.points_builder [--sizes 10000 100000 1000000] [--concat-limit N]
+"""
+import time
+import argparse
+
+import glm
+import numpy as np
+
+from utils.struct import Point, Color
+from utils.object import VertexObjectHelper, VertexAttribute
+from OpenGL.GL import GL_POINTS
+
+
+def points_concat(points):
+    points_vertex_arr = glm.array(glm.float32, *(points[0].data(True))) # type: ignore
+    for p in points[1:]:
+        points_vertex_arr = points_vertex_arr.concat(glm.array(glm.float32, *(p.data(True))))
+    return points_vertex_arr
+
+def timeit(func):
+    start_time = time.perf_counter()
+    func()
+    return time.perf_counter() - start_time
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--concat-limit", type=int, default=20000, help="larger sizes are extrapolated for the concat loop (O(n^2))")
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(0)
+    
+    print(f"{'points':>10}{'concat loop (s)':>18}{'List[Point] (s)':>18}{'ndarray (s)':>14}")
+    
+    concat_measured = None
+    for n in args.sizes:
+        arr = rng.random((n, 6), dtype=np.float32)
+        points = [Point(*row[:3], Color(*row[3:])) for row in arr.tolist()]
+        
+        if n <= args.concat_limit:
+            concat_time = timeit(lambda: points_concat(points))
+            concat_measured = (n, concat_time)
+            concat_str = f"{concat_time:.4f}"
+        elif concat_measured is not None:
+            m, t = concat_measured
+            concat_str = f"~{t * (n / m) ** 2:.1f} (est.)"
+        else:
+            concat_str = "skipped"
+        
+        list_time = timeit(lambda: VertexObjectHelper.points(points, has_color=True, drawtype=GL_POINTS))
+        array_time = timeit(lambda: VertexObjectHelper.from_array(arr, GL_POINTS, VertexAttribute.VERTEX | VertexAttribute.COLOR))
+        
+        print(f"{n:>10}{concat_str:>18}{list_time:>18.4f}{array_time:>14.6f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
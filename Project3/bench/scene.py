@@ -0,0 +1,48 @@
+"""Deterministic benchmark of the BVH viewer playing a .bvh file, results as JSON to compare between commits
+
+Frames run with a simulated clock (--frame-time seconds per frame), on the null backend by default,
+see bench.scene_harness for what is recorded.
+
+usage (in Project3 directory): python -m bench.scene [bvh_file] [--mode line|box] [--frames 600] [--warmup 60]
+                                   [--backend null|offscreen|glfw] [--out result.json] [--compare old.json]
+"""
+import argparse
+
+from . import scene_harness
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("bvh_file", nargs="?", default="0007_Crawling001.bvh.txt")
+    parser.add_argument("--mode", choices=["line", "box"], default="line")
+    parser.add_argument("--no-joint-palette", action="store_true")
+    parser.add_argument("--no-interpolation", action="store_true")
+    scene_harness.add_arguments(parser)
+    args = parser.parse_args()
+    
+    scene_harness.select_backend(args.backend)
+    import utils
+    from utils.animation.bvh_enum import BVHRenderMode
+    
+    manager = utils.GraphicsManager(800, 800, "scene benchmark", 60)
+    context = utils.BVHContext(manager)
+    context.stream_motion = False
+    context.use_joint_palette = not args.no_joint_palette
+    context.interpolate_pose = not args.no_interpolation
+    context.render_mode = BVHRenderMode[args.mode.upper()]
+    
+    context.load_bvh_file(args.bvh_file)
+    utils.asset_loader.flush()
+    context.start_anim()
+    
+    def state():
+        return {"cur_frame": context.cur_frame, "pose_sum": float(context.pose.sum()) if context.pose is not None else None}
+    
+    name = f"bvh:{args.bvh_file}:{args.mode}"
+    result = scene_harness.run_scene(name, manager, context, args.frames, args.warmup, args.frame_time, state)
+    manager.exit()
+    
+    scene_harness.finish(result, args)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
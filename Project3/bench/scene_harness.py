@@ -0,0 +1,157 @@
+"""Run a scene for a number of frames with a simulated clock and record what its frames cost
+
+Every frame is run by GraphicsManager.run (pre_update, fixed_update, update, render, coroutine_update, ...),
+but time advances by 1 / framerate per frame instead of following the wall clock (Backend.simulated_frame_time),
+so every run of a scene does the same work.
+
+- phases: mean and p50/p95/p99 milliseconds of the frame and each scope of the frame profiler
+- throughput: frames per second of wall time
+- memory: tracemalloc of a separate run of the same number of frames (it slows down everything)
+- gl_calls: GL calls per frame counted by the null backend
+
+Used by bench.scene.
+"""
+import os, sys, json, platform, subprocess, tracemalloc
+from dataclasses import asdict
+
+
+def select_backend(name):
+    """has to be called before utils (and OpenGL) is imported"""
+    os.environ["GRAPHICS_BACKEND"] = name
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_frames(manager, context, frames):
+    manager.backend.max_frames = frames
+    manager.run(context)
+
+
+def run_scene(name, manager, context, frames, warmup, frame_time, state=None):
+    """run warmup frames, then frames twice (timings, then allocations) with frame_time seconds per frame,
+    return results as a dict
+    
+    state is called after the runs, to record values which show the scene ran the same way (eg. current frame)
+    """
+    import utils
+    
+    backend = manager.backend
+    backend.simulated_frame_time = frame_time
+    manager.set_pacing_mode(utils.PacingMode.UNCAPPED)
+    
+    # meshes are uploaded and caches are filled in warmup frames
+    run_frames(manager, context, warmup)
+    
+    gl = getattr(backend, "gl", None)
+    if gl is not None:
+        gl.calls.clear()
+    manager.tick_stats.clear()
+    utils.profiler.enabled = True
+    utils.profiler.clear(frames)
+    
+    run_frames(manager, context, frames)
+    
+    utils.profiler.enabled = False
+    throughput = backend.stats()
+    phases = utils.profiler.to_dict()
+    ticks = asdict(manager.tick_stats)
+    render_stats = asdict(manager.renderer.stats)
+    gl_calls = dict(gl.calls) if gl is not None else None
+    
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    
+    run_frames(manager, context, frames)
+    
+    current, peak = tracemalloc.get_traced_memory()
+    top = tracemalloc.take_snapshot().compare_to(snapshot, "lineno")[:5]
+    tracemalloc.stop()
+    
+    result = {
+        "scene": name,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "backend": type(backend).__name__,
+        "frames": frames,
+        "warmup": warmup,
+        "frame_time": backend.simulated_frame_time,
+        "fps": throughput["fps"],
+        "phases": phases,
+        "ticks": ticks,
+        "render": render_stats,
+        "memory": {
+            "retained_bytes": current - base,
+            "peak_bytes": peak - base,
+            "retained_bytes_per_frame": (current - base) / frames,
+            "top": [{"line": str(s.traceback), "size_diff": s.size_diff, "count_diff": s.count_diff} for s in top]
+        },
+        "gl_calls": None if gl_calls is None else {
+            "total": sum(gl_calls.values()),
+            "per_frame": sum(gl_calls.values()) / frames,
+            "by_function": dict(sorted(gl_calls.items(), key=lambda item: -item[1]))
+        },
+        "state": state() if state is not None else None
+    }
+    
+    return result
+
+
+def print_result(result):
+    print(f"{result['scene']} ({result['backend']}, {result['frames']} frames): {result['fps']:.1f} fps")
+    print(f"{'phase':<28}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for path, times in result["phases"].items():
+        print(f"{path:<28}{times['mean_ms']:>10.3f}{times['p50_ms']:>10.3f}{times['p95_ms']:>10.3f}{times['p99_ms']:>10.3f}")
+    
+    memory = result["memory"]
+    print(f"memory: retained {memory['retained_bytes'] / 1024:.1f} KiB ({memory['retained_bytes_per_frame']:.1f} B/frame), peak {memory['peak_bytes'] / 1024:.1f} KiB")
+    if result["gl_calls"] is not None:
+        print(f"GL calls: {result['gl_calls']['per_frame']:.1f} per frame")
+
+
+def compare(result, old_path):
+    """print changes of result from the result saved at old_path"""
+    with open(old_path, "r") as f:
+        old = json.load(f)
+    
+    print(f"compared with {old_path} (commit {old.get('commit')})")
+    print(f"{'phase':<28}{'old ms':>10}{'new ms':>10}{'change':>10}")
+    for path, times in result["phases"].items():
+        if path not in old["phases"]:
+            continue
+        old_ms, new_ms = old["phases"][path]["mean_ms"], times["mean_ms"]
+        change = f"{(new_ms / old_ms - 1) * 100:+.1f}%" if old_ms > 0 else "-"
+        print(f"{path:<28}{old_ms:>10.3f}{new_ms:>10.3f}{change:>10}")
+    
+    if result["gl_calls"] is not None and old.get("gl_calls") is not None:
+        print(f"GL calls per frame: {old['gl_calls']['per_frame']:.1f} -> {result['gl_calls']['per_frame']:.1f}")
+    if old.get("state") != result["state"]:
+        print(f"state differs: {old.get('state')} -> {result['state']}")
+
+
+def add_arguments(parser):
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--warmup", type=int, default=60)
+    parser.add_argument("--frame-time", type=float, default=1 / 60, help="simulated seconds per frame")
+    parser.add_argument("--backend", choices=["null", "offscreen", "glfw"], default="null", help="null counts GL calls, offscreen draws with EGL")
+    parser.add_argument("--out", help="write results to this JSON file (printed if it's not given)")
+    parser.add_argument("--compare", metavar="JSON_FILE", help="print changes from results of another run")
+
+
+def finish(result, args):
+    print_result(result)
+    if args.compare is not None:
+        compare(result, args.compare)
+    
+    if args.out is not None:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+    else:
+        json.dump(result, sys.stdout, indent=2)
+        print()
\ No newline at end of file
@@ -1,16 +1,61 @@
 import os
+import argparse
 
 from glfw.GLFW import *
 
 import utils
 import objs
 
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("bvh_file", nargs="?", help=".bvh file to load at start (files can also be dropped on the window)")
+    parser.add_argument("--render-stats", action="store_true", help="print draw calls and GL state changes of a frame and fixed_update ticks every second")
+    parser.add_argument("--no-joint-palette", action="store_true", help="draw a box per joint in BOX mode instead of all boxes with one draw call")
+    parser.add_argument("--no-interpolation", action="store_true", help="draw the pose of the current frame instead of blending it into the next frame")
+    parser.add_argument("--pacing", choices=["uncapped", "vsync", "capped", "on-demand"], default="on-demand", help="draw as fast as possible, with vsync, at most --max-fps frames per second, or only when something changes")
+    parser.add_argument("--max-fps", type=float, default=60, help="frames per second of --pacing capped")
+    parser.add_argument("--profile", action="store_true", help="print p50/p95/p99 frame time and time of each stage of the frame every second")
+    parser.add_argument("--profile-gpu", action="store_true", help="also measure GPU time of frames with GL_TIME_ELAPSED queries")
+    parser.add_argument("--trace", metavar="JSON_FILE", help="write the last profiled frames as Chrome trace JSON at exit")
+    parser.add_argument("--trace-gl", action="store_true", help="count GL calls and their time per drawn object, print a frame every second and totals at exit")
+    parser.add_argument("--frames", type=int, help="draw this many frames as fast as possible (--pacing uncapped) after loading, then exit and print throughput of the backend (GRAPHICS_BACKEND=glfw|offscreen|null)")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    
     manager = utils.GraphicsManager(800, 800, "(2019039843)", 60)    
+    manager.print_render_stats = args.render_stats
+    manager.backend.max_frames = args.frames
+    # runs of --frames frames (or without a window) measure throughput of the whole scene,
+    # so frames are drawn as fast as possible after everything is loaded
+    benchmark = args.frames is not None or manager.backend.window is None
+    pacing = utils.PacingMode.UNCAPPED if benchmark else utils.PacingMode[args.pacing.upper().replace("-", "_")]
+    manager.set_pacing_mode(pacing, args.max_fps)
+    utils.profiler.enabled = args.profile or args.profile_gpu or args.trace is not None
+    utils.profiler.gpu_timing = args.profile_gpu
+    manager.print_profile = args.profile or args.profile_gpu
+    if args.trace_gl:
+        utils.gl_tracer.install()
+        manager.print_gl_trace = True
     
     main_context = utils.BVHContext(manager)
+    main_context.use_joint_palette = not args.no_joint_palette
+    main_context.interpolate_pose = not args.no_interpolation
+    if args.bvh_file is not None:
+        main_context.stream_motion = not benchmark
+        main_context.load_bvh_file(args.bvh_file)
+        if benchmark:
+            utils.asset_loader.flush()
+            main_context.start_anim()
     
     manager.run(main_context)
+    if args.trace is not None:
+        utils.profiler.dump_chrome_trace(args.trace)
+    if args.trace_gl:
+        print(utils.gl_tracer.report())
+    if args.frames is not None:
+        print(manager.backend.summary())
 
     manager.exit()
 
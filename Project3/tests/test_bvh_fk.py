@@ -0,0 +1,151 @@
+"""Check ForwardKinematics against the glm recursion BVHObject.update_global_transform used before it,
+on the .bvh file of the repo loaded by BVHLoader (root scale and End Sites included)
+
+usage (in Project3 directory): python -m unittest tests.test_bvh_fk
+"""
+import os
+import unittest
+
+os.environ.setdefault("GRAPHICS_BACKEND", "null")
+
+import glm
+import numpy as np
+
+import utils
+from utils.animation import ForwardKinematics
+from utils.animation.bvh_loader import BVHLoader
+
+BVH_FILE = os.path.join(os.path.dirname(__file__), "..", "0007_Crawling001.bvh.txt")
+
+# the glm recursion computes in float32 and ForwardKinematics in float64, so they differ by float32 rounding:
+# about 1.2e-7 (machine epsilon of float32) per operation relative to the magnitude of the values,
+# times the number of matrix products from the root to a joint (4 per joint, up to ~10 joints deep).
+# Differences are measured relative to the largest translation of the frame, they are at most 3.3e-7 over all
+# frames of the file. 2e-6 is ~17 epsilons, while moving one joint by 1% of a bone changes them by 1.8e-3
+TOLERANCE = 2e-6
+
+
+def glm_global_transform(jo, frame, parent_transform, transforms):
+    """global transform of joint jo and its children at frame, composed per channel with glm (float32)
+    the same way as BVHObject.update_global_transform before ForwardKinematics"""
+    anim_data = jo.anim_frames[frame].tolist()
+    
+    local_position = glm.vec3()
+    local_rotation = glm.vec3()
+    for i, c in enumerate(jo.channels):
+        if c.value < 3:
+            local_position[c.value] = anim_data[i]
+        else:
+            local_rotation[c.value - 3] = glm.radians(anim_data[i])
+    
+    Rs = [glm.rotate(local_rotation.x, glm.vec3(1, 0, 0)), glm.rotate(local_rotation.y, glm.vec3(0, 1, 0)), glm.rotate(local_rotation.z, glm.vec3(0, 0, 1))]
+    Ts = [glm.translate(glm.vec3(local_position.x, 0, 0)), glm.translate(glm.vec3(0, local_position.y, 0)), glm.translate(glm.vec3(0, 0, local_position.z))]
+    
+    M = glm.translate(glm.vec3(jo.offset.x, jo.offset.y, jo.offset.z))
+    for c in jo.channels:
+        M = M * (Ts[c.value] if c.value < 3 else Rs[c.value - 3])
+    
+    S = glm.scale(glm.vec3(jo.local_scale.x, jo.local_scale.y, jo.local_scale.z))
+    
+    global_transform = parent_transform * S * M
+    transforms[jo.idx] = global_transform
+    
+    for c in jo.children:
+        glm_global_transform(c, frame, global_transform, transforms)
+
+def end_site_positions(bvh_objs, pose):
+    """positions of End Sites (and other end points of bones) in (J x 4 x 4) pose, one row per end point"""
+    positions = []
+    for jo in bvh_objs:
+        for ep in jo.end_points:
+            positions.append(pose[jo.idx] @ np.array([ep.x, ep.y, ep.z, 1]))
+    return np.array(positions)[:, :3]
+
+
+class ForwardKinematicsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.manager = utils.GraphicsManager(64, 64, "test", 60)
+        context = utils.BVHContext(cls.manager)
+        cls.anim_info = BVHLoader.parse_bvh_file(BVH_FILE, context, False, False)
+        cls.bvh_objs = cls.anim_info.bvh_objects
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.manager.exit()
+    
+    def frames(self):
+        frames = self.anim_info.frames
+        return sorted({0, 1, 2, frames // 3, frames // 2, frames - 2, frames - 1})
+    
+    def glm_pose(self, frame):
+        transforms = {}
+        glm_global_transform(self.bvh_objs[0], frame, glm.mat4(), transforms)
+        # glm matrices are column-major, np.array of them is row-major like ForwardKinematics
+        return np.array([np.array(transforms[jo.idx]) for jo in self.bvh_objs], dtype=np.float64)
+    
+    def assert_pose_equal(self, pose, reference, frame):
+        scale = max(1., np.abs(reference[:, :3, 3]).max())
+        err = np.abs(pose - reference).max() / scale
+        self.assertLessEqual(err, TOLERANCE, f"joint transforms of frame {frame} differ by {err} (relative)")
+        
+        positions, reference_positions = end_site_positions(self.bvh_objs, pose), end_site_positions(self.bvh_objs, reference)
+        err = np.abs(positions - reference_positions).max() / scale
+        self.assertLessEqual(err, TOLERANCE, f"end sites of frame {frame} differ by {err} (relative)")
+    
+    def test_root_is_scaled(self):
+        scale = self.bvh_objs[0].local_scale.x
+        self.assertNotEqual(scale, 1)
+        np.testing.assert_allclose(self.anim_info.fk.scales[0], [scale, scale, scale])
+        self.assertTrue(any(jo.is_end_site for jo in self.bvh_objs))
+    
+    def test_frames_match_glm(self):
+        fk = self.anim_info.fk
+        for frame in self.frames():
+            self.assert_pose_equal(fk.evaluate(self.anim_info.motion[frame]), self.glm_pose(frame), frame)
+    
+    def test_batch_matches_glm(self):
+        fk = self.anim_info.fk
+        frames = self.frames()
+        poses = fk.evaluate(self.anim_info.motion[frames])
+        for pose, frame in zip(poses, frames):
+            self.assert_pose_equal(pose, self.glm_pose(frame), frame)
+    
+    def test_rest_pose_matches_glm(self):
+        motion = self.anim_info.motion
+        saved = motion.copy()
+        try:
+            motion[:] = 0
+            self.assert_pose_equal(self.anim_info.fk.rest_pose(), self.glm_pose(0), "rest")
+        finally:
+            motion[:] = saved
+    
+    def test_blend_keeps_rotations(self):
+        # blended transforms are rotations scaled by the root scale, equal to the poses at alpha 0 and 1
+        fk = self.anim_info.fk
+        pose, next_pose = fk.evaluate(self.anim_info.motion[100]), fk.evaluate(self.anim_info.motion[104])
+        np.testing.assert_allclose(ForwardKinematics.blend(pose, next_pose, 0), pose, atol=1e-12)
+        np.testing.assert_allclose(ForwardKinematics.blend(pose, next_pose, 1), next_pose, atol=1e-12)
+        
+        scale = self.bvh_objs[0].local_scale.x
+        for alpha in [0.25, 0.5, 0.75]:
+            blended = ForwardKinematics.blend(pose, next_pose, alpha)
+            R = blended[:, :3, :3] / scale
+            np.testing.assert_allclose(R.transpose(0, 2, 1) @ R, np.broadcast_to(np.eye(3), R.shape), atol=1e-12)
+            np.testing.assert_allclose(blended[:, :3, 3], pose[:, :3, 3] + (next_pose[:, :3, 3] - pose[:, :3, 3]) * alpha, atol=1e-12)
+    
+    def test_mismatch_fails(self):
+        # the last joint moved by 1% of the median bone length has to be caught by the tolerance
+        fk = self.anim_info.fk
+        j = len(self.bvh_objs) - 1
+        saved = fk.offsets[j].copy()
+        try:
+            fk.offsets[j] += 0.01 * np.median(np.linalg.norm(fk.offsets[1:], axis=1))
+            with self.assertRaises(AssertionError):
+                self.assert_pose_equal(fk.evaluate(self.anim_info.motion[1]), self.glm_pose(1), 1)
+        finally:
+            fk.offsets[j] = saved
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
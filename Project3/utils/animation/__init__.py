@@ -1,3 +1,6 @@
 from .lerp import BezierInterpolate
 from .bvh_loader import BVHLoader
-from .bvh_context import BVHContext
\ No newline at end of file
+from .bvh_context import BVHContext
+from .bvh_fk import ForwardKinematics
+from .bvh_pose_cache import PoseCache, WindowedPoseCache
+from .bvh_skeleton import BVHSkeletonLines, BVHJointBoxes
\ No newline at end of file
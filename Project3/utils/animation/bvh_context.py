@@ -1,15 +1,20 @@
 import os
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Union
 from enum import Enum
 
+import numpy as np
+
 from glfw.GLFW import *
 
 from ..core import GraphicsManager
 from ..context import ContextBase
-from ..object import BaseObject, VertexObjectHelper
+from ..object import BaseObject, VertexObjectHelper, asset_loader
 from ..struct import Vec3D
 from ..event import EventType
 from .bvh_loader import BVHLoader
+from .bvh_fk import ForwardKinematics
+from .bvh_pose_cache import PoseCache, WindowedPoseCache
+from .bvh_skeleton import BVHSkeletonLines, BVHJointBoxes
 from .bvh_enum import BVHRenderMode
 
 class BVHContext(ContextBase):
@@ -23,17 +28,98 @@ class BVHContext(ContextBase):
         self.anim_info = None
         self.render_mode = BVHRenderMode.LINE
         
+        # pose is (joints x 4 x 4) global transforms of joints of the current frame,
+        # global transforms of joints are baked for all frames after loading if bake_pose is True,
+        # takes larger than max_pose_cache_bytes are baked by windows while playing
+        self.bake_pose = True
+        self.max_pose_cache_bytes = 256 * 1024 * 1024
+        self.pose_cache: Union[PoseCache, None] = None
+        self.pose: Union[np.ndarray, None] = None
+        
+        # frames are drawn with the pose blended between the current frame and the next one by
+        # the interpolation alpha of GraphicsManager, so playback is smooth when the display rate isn't the frame rate
+        self.interpolate_pose = True
+        
+        # bones of LINE mode are drawn from the pose with one draw call,
+        # boxes of BOX mode too if use_joint_palette is True (or with a draw per joint if it's False)
+        self.skeleton_lines: Union[BVHSkeletonLines, None] = None
+        self.use_joint_palette = True
+        self.joint_boxes: Union[BVHJointBoxes, None] = None
+        
+        # MOTION of dropped files is read on a background thread if stream_motion is True,
+        # playback can start with the frames loaded so far
+        self.stream_motion = True
+        self.shown_progress = None
+        self.load_future = None
+        
         self.manager.event_helper.set_drag_drop_event(self.bvh_file_load_on_dragdrop)
         self.manager.event_helper.add_callback(EventType.KEYBOARD, self.print_hierarchy_on_p)
         self.manager.event_helper.add_callback(EventType.KEYBOARD, self.start_anim_on_space)
         self.manager.event_helper.add_callback(EventType.KEYBOARD, self.toggle_render_mode)
     
     def bvh_file_load_on_dragdrop(self, window, file_paths):
-        self.anim_info = BVHLoader.parse_bvh_file(file_paths[0], self)
-        self.set_object(self.anim_info.bvh_objects[0])
+        self.load_bvh_file(file_paths[0])
+        
+    def load_bvh_file(self, file_path):
+        # file is parsed on the thread pool of asset_loader, joint meshes are uploaded on the main thread
+        future = asset_loader.submit(
+            BVHLoader.parse_bvh_file, file_path, self, True, self.stream_motion,
+            on_loaded=lambda anim_info: self.set_anim_info(anim_info, future)
+        )
+        self.load_future = future
+        
+    def set_anim_info(self, anim_info, future):
+        # another file was dropped while parsing
+        if future is not self.load_future:
+            anim_info.bvh_objects[0].destroy()
+            if anim_info.stream is not None:
+                anim_info.stream.cancel()
+            return
+        
+        if self.anim_info is not None and self.anim_info.stream is not None:
+            self.anim_info.stream.cancel()
+        
+        self.pose_cache = None
+        self.pose = None
+        
+        self.anim_info = anim_info
+        self.set_object(anim_info.bvh_objects[0])
+        
+        if self.skeleton_lines is not None:
+            self.skeleton_lines.destroy()
+            self.joint_boxes.destroy()
+        self.skeleton_lines = BVHSkeletonLines("skeleton_lines", self, anim_info.bvh_objects)
+        self.joint_boxes = BVHJointBoxes("joint_boxes", self, anim_info.bvh_objects)
+        
+        if self.bake_pose:
+            if anim_info.stream is not None:
+                # all frames are needed for baking, which is done on the main thread
+                anim_info.stream.add_loaded_callback(lambda: asset_loader.call_soon(lambda: self.bake_pose_cache(anim_info)))
+            else:
+                self.bake_pose_cache(anim_info)
+        
+        self.pose = self.anim_info.fk.rest_pose()
+        
         self.set_frame_rate(1 / self.anim_info.frame_time)
         self.stop_anim()
     
+    def bake_pose_cache(self, anim_info):
+        # file can be changed while its motion is streamed
+        if anim_info is not self.anim_info:
+            return
+        
+        joint_num = len(self.anim_info.bvh_objects)
+        nbytes = self.anim_info.frames * joint_num * 16 * 4
+        
+        if nbytes <= self.max_pose_cache_bytes:
+            self.pose_cache = PoseCache(anim_info)
+            print(f"Pose cache: {self.anim_info.frames} frames baked ({nbytes / 1024 / 1024:.1f} MiB)")
+        else:
+            window_size = 256
+            max_windows = max(1, self.max_pose_cache_bytes // (window_size * joint_num * 16 * 4))
+            self.pose_cache = WindowedPoseCache(anim_info, window_size, max_windows)
+            print(f"Pose cache: {max_windows} windows of {window_size} frames")
+    
     def print_hierarchy_on_p(self, window, key, scancode, action, mods):
         if key==GLFW_KEY_P and action==GLFW_PRESS:
             self.print_hierarchy()
@@ -61,16 +147,95 @@ class BVHContext(ContextBase):
         self.cur_frame = 0
         self.play_anim = False
         
+    def is_animating(self) -> bool:
+        # loading progress is shown while the file is parsed and its motion is streamed
+        loading = (self.load_future is not None and not self.load_future.done()) or \
+            (self.anim_info is not None and self.anim_info.stream is not None and not self.anim_info.stream.done)
+        return super().is_animating() or (self.play_anim and self.anim_info is not None) or loading
+    
+    def get_next_frame(self) -> Union[int, None]:
+        """return the frame after cur_frame (looping to the first one), None if it's not loaded yet"""
+        frames = self.anim_info.frames
+        loaded_frames = self.anim_info.loaded_frames()
+        if self.anim_info.stream is not None and self.anim_info.stream.error is not None:
+            frames = loaded_frames
+        
+        next_frame = self.cur_frame + 1
+        if (next_frame > frames):
+            next_frame = 1
+        
+        if next_frame > loaded_frames:
+            return None
+        return next_frame
+    
+    def get_frame_pose(self, frame:int) -> np.ndarray:
+        if self.pose_cache is not None:
+            return self.pose_cache.get(frame - 1)
+        else:
+            return self.anim_info.fk.evaluate(self.anim_info.motion[frame - 1])
+        
     def fixed_update(self):
         if self.play_anim and self.anim_info is not None:
-            self.cur_frame = self.cur_frame + 1
-            
-            if (self.cur_frame > self.anim_info.frames):
-                self.cur_frame = 1
+            # wait for the next frame if it's not loaded yet
+            next_frame = self.get_next_frame()
+            if next_frame is not None:
+                self.cur_frame = next_frame
+        
+        if self.play_anim and self.anim_info is not None and self.cur_frame > 0:
+            self.pose = self.get_frame_pose(self.cur_frame)
         
         super().fixed_update()
         
-    def update(self):
-        super().update()
+    def get_render_pose(self, alpha:float) -> Union[np.ndarray, None]:
+        """return the pose blended from the current frame to the next one by alpha"""
+        if not self.interpolate_pose or not self.play_anim or self.anim_info is None or self.cur_frame == 0 or alpha <= 0:
+            return self.pose
+        
+        # don't blend the last frame into the first one when the animation loops
+        next_frame = self.get_next_frame()
+        if next_frame is None or next_frame < self.cur_frame:
+            return self.pose
+        
+        # translations and scales of joints are lerped between the frames and rotations are nlerped
+        return ForwardKinematics.blend(self.pose, self.get_frame_pose(next_frame), alpha)
+        
+    def update(self, alpha:float=0):
+        pose = self.get_render_pose(alpha)
+        
+        if self.render_mode == BVHRenderMode.LINE:
+            if self.skeleton_lines is not None and pose is not None:
+                self.skeleton_lines.set_pose(pose)
+                self.draw(self.skeleton_lines)
+        elif self.use_joint_palette:
+            if self.joint_boxes is not None and pose is not None:
+                self.joint_boxes.set_pose(pose)
+                self.draw(self.joint_boxes)
+        else:
+            # joints are drawn one by one, with the blended pose instead of the pose of pre_update
+            if self.anim_info is not None and pose is not None:
+                for jo in self.anim_info.bvh_objects:
+                    jo.set_pose(pose)
+            super().update(alpha)
+        
+        self.draw(self.grid_obj)
+        
+        self.show_load_progress()
+        
+    def show_load_progress(self):
+        """show how many frames are loaded in the window title while motion is streamed"""
+        if self.anim_info is None or self.anim_info.stream is None:
+            return
+        
+        stream = self.anim_info.stream
+        progress = (stream, stream.loaded, stream.done, stream.error is None)
+        if progress == self.shown_progress:
+            return
+        self.shown_progress = progress
+        
+        title = self.manager.window_title
+        if stream.error is not None:
+            title = f"{title} - loading failed at frame {stream.loaded}"
+        elif not stream.done:
+            title = f"{title} - loading {stream.loaded}/{self.anim_info.frames} frames ({stream.progress() * 100:.0f}%)"
         
-        self.draw(self.grid_obj)
\ No newline at end of file
+        self.manager.set_window_title(title)
\ No newline at end of file
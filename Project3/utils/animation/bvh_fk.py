@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+from typing import List, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .bvh_object import BVHObject
+
+class ForwardKinematics:
+    """ForwardKinematics computes global transforms of all joints of a skeleton for many frames at once.
+    
+    The skeleton is described with arrays, joints are indexed in topological order (parent before children)
+    
+    - parents: (J) index of the parent joint, -1 for the root
+    - offsets: (J x 3) offset of each joint from its parent
+    - scales: (J x 3) local scale of each joint
+    - chan_types: (C) ChannelType value of each channel, in the order of a motion data line
+    - chan_joints: (C) index of the joint of each channel
+    
+    Local transform of a joint is S * T(offset) * C1 * C2 * ... with its channel matrices in channel order,
+    and the global transform is the global transform of its parent times the local transform 
+    (the same as BVHObject used to compose with glm)
+    """
+    def __init__(self, parents:np.ndarray, offsets:np.ndarray, scales:np.ndarray, chan_types:np.ndarray, chan_joints:np.ndarray) -> None:
+        self.parents = np.asarray(parents, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.float64)
+        self.scales = np.array(scales, dtype=np.float64)
+        self.chan_types = np.asarray(chan_types, dtype=np.int64)
+        self.chan_joints = np.asarray(chan_joints, dtype=np.int64)
+        
+        self.joint_num = len(self.parents)
+        self.chan_num = len(self.chan_types)
+        
+        # channels grouped by their order in the joint, slot s has s-th channel of every joint with more than s channels
+        chan_slots = np.zeros(self.chan_num, dtype=np.int64)
+        for c in range(1, self.chan_num):
+            if self.chan_joints[c] == self.chan_joints[c - 1]:
+                chan_slots[c] = chan_slots[c - 1] + 1
+        self.slots = [np.nonzero(chan_slots == s)[0] for s in range(chan_slots.max() + 1 if self.chan_num > 0 else 0)]
+        
+        # joints grouped by depth, every level is computed after the level of its parents
+        depths = np.zeros(self.joint_num, dtype=np.int64)
+        for j in range(self.joint_num):
+            if self.parents[j] >= 0:
+                depths[j] = depths[self.parents[j]] + 1
+        self.levels = [np.nonzero(depths == d)[0] for d in range(depths.max() + 1 if self.joint_num > 0 else 0)]
+        
+        is_pos = self.chan_types < 3
+        axes = self.chan_types % 3
+        self.pos_chans = np.nonzero(is_pos)[0]
+        self.pos_axes = axes[is_pos]
+        self.rot_chans = np.nonzero(~is_pos)[0]
+        # the two other axes of each rotation axis in right-handed order, eg. (y, z) for x
+        self.rot_a = (axes[~is_pos] + 1) % 3
+        self.rot_b = (axes[~is_pos] + 2) % 3
+    
+    @staticmethod
+    def from_bvh_objects(bvh_objs:List[BVHObject]) -> ForwardKinematics:
+        joint_idx = {id(jo): i for i, jo in enumerate(bvh_objs)}
+        
+        chan_types = []
+        chan_joints = []
+        for j, jo in enumerate(bvh_objs):
+            for c in jo.channels:
+                chan_types.append(c.value)
+                chan_joints.append(j)
+        
+        return ForwardKinematics(
+            parents=[joint_idx[id(jo.parent)] if jo.parent is not None else -1 for jo in bvh_objs],
+            offsets=[[jo.offset.x, jo.offset.y, jo.offset.z] for jo in bvh_objs],
+            scales=[[jo.local_scale.x, jo.local_scale.y, jo.local_scale.z] for jo in bvh_objs],
+            chan_types=chan_types,
+            chan_joints=chan_joints
+        )
+    
+    def channel_matrices(self, motion:np.ndarray) -> np.ndarray:
+        """return (F x C x 4 x 4) translation / rotation matrix of every channel of (F x C) motion data"""
+        frame_num = len(motion)
+        
+        mats = np.zeros((frame_num, self.chan_num, 4, 4))
+        mats[:, :, [0, 1, 2, 3], [0, 1, 2, 3]] = 1
+        
+        mats[:, self.pos_chans, self.pos_axes, 3] = motion[:, self.pos_chans]
+        
+        rad = np.radians(motion[:, self.rot_chans])
+        cos, sin = np.cos(rad), np.sin(rad)
+        mats[:, self.rot_chans, self.rot_a, self.rot_a] = cos
+        mats[:, self.rot_chans, self.rot_a, self.rot_b] = -sin
+        mats[:, self.rot_chans, self.rot_b, self.rot_a] = sin
+        mats[:, self.rot_chans, self.rot_b, self.rot_b] = cos
+        
+        return mats
+    
+    def local_transforms(self, motion:np.ndarray) -> np.ndarray:
+        """return (F x J x 4 x 4) local transforms of (F x C) motion data"""
+        chan_mats = self.channel_matrices(motion)
+        
+        local = np.zeros((len(motion), self.joint_num, 4, 4))
+        local[:, :, [0, 1, 2, 3], [0, 1, 2, 3]] = 1
+        local[:, :, :3, 3] = self.offsets
+        
+        for chans in self.slots:
+            joints = self.chan_joints[chans]
+            local[:, joints] = local[:, joints] @ chan_mats[:, chans]
+        
+        # S * M, S is diagonal
+        local[:, :, :3, :] *= self.scales[:, :, None]
+        
+        return local
+    
+    def evaluate(self, motion:np.ndarray) -> np.ndarray:
+        """return (F x J x 4 x 4) global transforms of (F x C) motion data, or (J x 4 x 4) of one frame (C)"""
+        motion = np.asarray(motion, dtype=np.float64)
+        if motion.ndim == 1:
+            return self.evaluate(motion[None])[0]
+        
+        transforms = self.local_transforms(motion)
+        
+        for joints in self.levels[1:]:
+            transforms[:, joints] = transforms[:, self.parents[joints]] @ transforms[:, joints]
+        
+        return transforms
+    
+    def rest_pose(self) -> np.ndarray:
+        """return (J x 4 x 4) global transforms with every channel value 0"""
+        return self.evaluate(np.zeros(self.chan_num))
+    
+    @staticmethod
+    def blend(pose:np.ndarray, next_pose:np.ndarray, alpha:float) -> np.ndarray:
+        """return (J x 4 x 4) global transforms blended from pose to next_pose by alpha
+        
+        Lerping whole matrices would shear and shrink their rotations, so each transform is split into
+        translation, scale (length of each column) and rotation: translations and scales are lerped,
+        and rotations are nlerped as quaternions (close to slerp for the small rotations between frames)
+        """
+        # both poses are converted at once
+        joint_num = len(pose)
+        mats = np.concatenate([pose[:, :3, :3], next_pose[:, :3, :3]])
+        both_scales = np.sqrt(np.einsum("nij,nij->nj", mats, mats))
+        both_quats = ForwardKinematics.matrices_to_quats(mats / both_scales[:, None, :])
+        
+        scales, next_scales = both_scales[:joint_num], both_scales[joint_num:]
+        quats, next_quats = both_quats[:joint_num], both_quats[joint_num:]
+        
+        # q and -q are the same rotation, blend along the shorter arc
+        next_quats[np.sum(quats * next_quats, axis=1) < 0] *= -1
+        quats = quats + (next_quats - quats) * alpha
+        quats /= np.linalg.norm(quats, axis=1)[:, None]
+        
+        blended = np.zeros_like(pose)
+        blended[:, :3, :3] = ForwardKinematics.quats_to_matrices(quats) * (scales + (next_scales - scales) * alpha)[:, None, :]
+        blended[:, :3, 3] = pose[:, :3, 3] + (next_pose[:, :3, 3] - pose[:, :3, 3]) * alpha
+        blended[:, 3, 3] = 1
+        return blended
+    
+    @staticmethod
+    def matrices_to_quats(R:np.ndarray) -> np.ndarray:
+        """return (N x 4) unit quaternions (w, x, y, z) of (N x 3 x 3) rotation matrices"""
+        m00, m01, m02 = R[:, 0, 0], R[:, 0, 1], R[:, 0, 2]
+        m10, m11, m12 = R[:, 1, 0], R[:, 1, 1], R[:, 1, 2]
+        m20, m21, m22 = R[:, 2, 0], R[:, 2, 1], R[:, 2, 2]
+        
+        # 4 quaternions scaled by 4 * (w, x, y or z), the one with the largest component is the most accurate
+        candidates = np.stack([
+            np.stack([1 + m00 + m11 + m22, m21 - m12, m02 - m20, m10 - m01], axis=1),
+            np.stack([m21 - m12, 1 + m00 - m11 - m22, m01 + m10, m02 + m20], axis=1),
+            np.stack([m02 - m20, m01 + m10, 1 - m00 + m11 - m22, m12 + m21], axis=1),
+            np.stack([m10 - m01, m02 + m20, m12 + m21, 1 - m00 - m11 + m22], axis=1),
+        ], axis=1)
+        best = np.argmax(candidates[:, [0, 1, 2, 3], [0, 1, 2, 3]], axis=1)
+        
+        quats = candidates[np.arange(len(R)), best]
+        return quats / np.linalg.norm(quats, axis=1)[:, None]
+    
+    @staticmethod
+    def quats_to_matrices(q:np.ndarray) -> np.ndarray:
+        """return (N x 3 x 3) rotation matrices of (N x 4) unit quaternions (w, x, y, z)"""
+        w, x, y, z = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+        
+        R = np.empty((len(q), 3, 3))
+        R[:, 0, 0] = 1 - 2 * (y * y + z * z)
+        R[:, 0, 1] = 2 * (x * y - w * z)
+        R[:, 0, 2] = 2 * (x * z + w * y)
+        R[:, 1, 0] = 2 * (x * y + w * z)
+        R[:, 1, 1] = 1 - 2 * (x * x + z * z)
+        R[:, 1, 2] = 2 * (y * z - w * x)
+        R[:, 2, 0] = 2 * (x * z - w * y)
+        R[:, 2, 1] = 2 * (y * z + w * x)
+        R[:, 2, 2] = 1 - 2 * (x * x + y * y)
+        return R
\ No newline at end of file
@@ -1,10 +1,14 @@
-from typing import List, Tuple
-import os, time
+from typing import List, Tuple, Union
+import os, io, time
 from enum import Enum
 from dataclasses import dataclass
 
+import numpy as np
+
 from ..struct import Vec3D, Face, TriangleFace, ObjectFaces, Vertex3D
 from .bvh_object import BVHObject, ChannelType
+from .bvh_fk import ForwardKinematics
+from .bvh_stream import MotionStream
 
 class ParsingStep(Enum):
     START = 0
@@ -18,18 +22,34 @@ class BVHAnimInfo:
     bvh_objects: List[BVHObject]
     frames: int
     frame_time: float
+    motion: np.ndarray
+    fk: ForwardKinematics
+    stream: Union[MotionStream, None] = None
+    
+    def loaded_frames(self) -> int:
+        """number of frames of motion which can be played"""
+        if self.stream is None:
+            return self.frames
+        return self.stream.loaded
 
 class BVHLoader:
     @staticmethod
-    def parse_bvh_file(file_path:str, context, print_info:bool = True):
+    def parse_bvh_file(file_path:str, context, print_info:bool = True, stream:bool = False):
+        """parse .bvh file and return BVHAnimInfo
+        
+        If stream is True, only HIERARCHY is parsed before returning, 
+        and MOTION is read on a background thread by BVHAnimInfo.stream (started already)
+        """
         bvh_objs: List[BVHObject] = []
         bvh_obj_stack: List[BVHObject] = []
         parsed_frame: int = 0
         frame: int = 0
         frametime: float = 0
+        motion = np.zeros((0, 0), dtype=np.float32)
+        motion_stream = None
         parsing_step = ParsingStep.START
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         with open(file_path, "r") as bvh_f:
             i = -1
             
@@ -112,7 +132,7 @@ class BVHLoader:
                             break
                         
                         parent = bvh_obj_stack[-1]
-                        idx = len(bvh_objs) - 1
+                        idx = len(bvh_objs)
                         
                         joint_obj = BVHObject(name, idx, context, offset, chan_list)
                         parent.add_children(joint_obj)
@@ -168,42 +188,48 @@ class BVHLoader:
                             BVHLoader.parse_error(i, line)
                         frametime = float(vars[2])
                         parsing_step = ParsingStep.PARSE_MOTION
+                        
+                        # rest of the file is motion data, parse it at once or on a background thread
+                        chan_num = sum(jo.get_chan_num() for jo in bvh_objs)
+                        if stream:
+                            motion = np.zeros((frame, chan_num), dtype=np.float32)
+                            motion_stream = MotionStream(file_path, bvh_f.tell(), i + 1, motion, print_info)
+                        else:
+                            motion = BVHLoader.parse_motion(bvh_f.read(), chan_num, i + 1)
+                        parsed_frame = len(motion)
+                        break
                     
                     else:
                         BVHLoader.parse_error(i, line)
                         
-                elif parsing_step == ParsingStep.PARSE_MOTION:
-                    parsed_frame = parsed_frame + 1
-                    data_idx = 0
-                    for jo in bvh_objs:
-                        chan_num = jo.get_chan_num()
-                        chan_data = []
-                        for data_i in range(chan_num):
-                            chan_data.append(float(vars[data_idx + data_i]))
-                        jo.add_frame_data(chan_data)
-                        data_idx = data_idx + chan_num 
-                        
-        end_time = time.time()
+        end_time = time.perf_counter()
         
         if parsed_frame != frame:
             raise Exception(f"frame number {frame} is not matching with actual parsed lines {parsed_frame}\n")
         
-        bvh_objs[0].update_global_transform()
+        chan_offset = 0
+        for jo in bvh_objs:
+            jo.set_anim_frames(motion, chan_offset)
+            chan_offset = chan_offset + jo.get_chan_num()
+        
+        fk = ForwardKinematics.from_bvh_objects(bvh_objs)
+        rest_pose = fk.rest_pose()
         
         min_y = 100000
         max_y = -100000
-        for jo in bvh_objs:
+        for j, jo in enumerate(bvh_objs):
             if jo.is_end_site:
-                max_y = max(jo.global_transform[3][1], max_y)
-                min_y = min(jo.global_transform[3][1], min_y)
+                max_y = max(rest_pose[j][1][3], max_y)
+                min_y = min(rest_pose[j][1][3], min_y)
                 
         height = max_y - min_y
         #print(f"height: {height}")
         
         bvh_objs[0].local_scale = Vec3D(2/height, 2/height, 2/height)
+        fk.scales[0] = 2/height
         
         for jo in bvh_objs:
-            jo.set_line_vertices(max_y - min_y)
+            jo.set_box_size(max_y - min_y)
         
         if (print_info):
             print("---------- .bvh file info ----------")
@@ -219,7 +245,46 @@ class BVHLoader:
             print(f"Parse time: {end_time - start_time}")
             print("------------------------------------")
         
-        return BVHAnimInfo(bvh_objs, frame, frametime)
+        if motion_stream is not None:
+            motion_stream.start()
+        
+        return BVHAnimInfo(bvh_objs, frame, frametime, motion, fk, motion_stream)
+    
+    @staticmethod
+    def parse_motion(text:str, chan_num:int, first_linenum:int = 0) -> np.ndarray:
+        """parse motion data lines into (frames x chan_num) float32 array
+        
+        Parameters
+        ----------
+        text : str
+            lines after 'Frame Time:', one frame per line
+        chan_num : int
+            total number of channels of all joints
+        first_linenum : int, optional
+            line number of the first line of text, for error messages
+        """
+        if len(text.strip()) == 0:
+            return np.zeros((0, chan_num), dtype=np.float32)
+        
+        try:
+            # loadtxt parses in C and skips empty lines
+            motion = np.loadtxt(io.StringIO(text), dtype=np.float32, ndmin=2)
+        except ValueError:
+            motion = None
+        
+        if motion is None or (len(motion) > 0 and motion.shape[1] != chan_num):
+            # find the line with wrong number of values
+            for j, l in enumerate(text.splitlines()):
+                if len(l.strip()) == 0:
+                    continue
+                try:
+                    if len(np.array(l.split(), dtype=np.float32)) != chan_num:
+                        BVHLoader.parse_error(first_linenum + j, l)
+                except ValueError:
+                    BVHLoader.parse_error(first_linenum + j, l)
+            raise Exception("Invalid bvh motion data.\n")
+        
+        return motion.reshape(-1, chan_num)
                 
     @staticmethod
     def parse_error(linenum, line):
@@ -8,7 +8,7 @@ import numpy as np
 if TYPE_CHECKING:
     from .bvh_context import BVHContext
 from .bvh_enum import BVHRenderMode
-from ..object import BaseObject, VertexObjectHelper, VertexObjectInfo
+from ..object import BaseObject, VertexObjectHelper, VertexObjectInfo, transform_stats
 from ..struct import Point, Vec3D, Color
 
 class ChannelType(Enum):
@@ -33,23 +33,24 @@ class BVHObject(BaseObject):
         
         self.channels = channels
         self.offset = offset
-        self.local_position = offset
         
         self.min_size_neg = Vec3D(0.05, 0.05, 0.05)
         self.min_size_pos = Vec3D(0.05, 0.05, 0.05)
         
         self.is_end_site = False
         
-        self.anim_frames: List[List[float]] = []
+        # (frames x channels) view of the motion array of BVHAnimInfo
+        self.anim_frames: np.ndarray = np.zeros((0, len(channels)), dtype=np.float32)
+        self.chan_offset = 0
         
         vertices_obj = VertexObjectHelper.cube_phong()
         
-        self.line_vertices_info:VertexObjectInfo
-        
         self.context:BVHContext
         
         super().__init__(name, context, vertices_obj)
         
+        self.local_position = offset
+        
     def add_end_point(self, point: Point):
         self.end_points.append(point)
     
@@ -59,19 +60,17 @@ class BVHObject(BaseObject):
     def get_chan_num(self):
         return len(self.channels)
     
-    def add_frame_data(self, data: List[float]):
-        self.anim_frames.append(data)
+    def set_anim_frames(self, motion: np.ndarray, chan_offset: int):
+        """use columns [chan_offset, chan_offset + channel number) of motion array as animation data of this joint, without copying"""
+        self.chan_offset = chan_offset
+        self.anim_frames = motion[:, chan_offset:chan_offset + len(self.channels)]
     
-    def set_line_vertices(self, height):
-        p_list = []
-        
+    def set_box_size(self, height):
+        """fit the box of this joint in BOX mode to its end points, lines of LINE mode are drawn by BVHSkeletonLines"""
         self.min_size_neg = Vec3D(0.05, 0.05, 0.05)
         self.min_size_pos = Vec3D(0.05, 0.05, 0.05)
         
         for ep in self.end_points:
-            p_list.append(Point())
-            p_list.append(ep)
-            
             if (ep.x < 0):
                 if glm.abs(ep.x) > self.min_size_neg.x:
                     self.min_size_neg.x = glm.abs(ep.x)
@@ -113,108 +112,42 @@ class BVHObject(BaseObject):
                     
         #print(f"{self.name} {max_l} {scale_factor}")
             
-        vertices_obj = VertexObjectHelper.points(
-            p_list,
-            has_color=True,
-            drawtype=OpenGL.GL.GL_LINES
-        )
-        
-        self.line_vertices_info = self.init_VAO(vertices_obj)
-        
-    def draw_info(self):
-        if self.context.render_mode == BVHRenderMode.LINE:
-            return self.line_vertices_info
-        else:
-            return self.vertices_info
+    def get_box_matrix(self):
+        """transform of the unit cube to the box of this joint in BOX mode, in joint space"""
+        S = glm.scale(glm.vec3(
+            (self.min_size_neg.x + self.min_size_pos.x),
+            (self.min_size_neg.y + self.min_size_pos.y),
+            (self.min_size_neg.z + self.min_size_pos.z),
+        ))
+        
+        ST = glm.translate(glm.vec3(
+            -(self.min_size_neg.x - self.min_size_pos.x) / 2, 
+            -(self.min_size_neg.y - self.min_size_pos.y) / 2, 
+            -(self.min_size_neg.z - self.min_size_pos.z) / 2
+        ))
+        #ST = glm.mat4()
+        
+        return ST * S
     
-    def fixed_update(self):
-        if self.context.play_anim:
-            anim_data = self.anim_frames[self.context.cur_frame - 1]
-            
-            self.local_position = Vec3D()
-            self.local_rotation = Vec3D()
-            
-            for i, c in enumerate(self.channels):
-                if c is ChannelType.XPOSITION:
-                    self.local_position.x = anim_data[i]
-            
-                elif c is ChannelType.YPOSITION:
-                    self.local_position.y = anim_data[i]
-                    
-                elif c is ChannelType.ZPOSITION:
-                    self.local_position.z = anim_data[i]
-                    
-                elif c is ChannelType.XROTATION:
-                    self.local_rotation.x = glm.radians(anim_data[i])
-                    
-                elif c is ChannelType.YROTATION:
-                    self.local_rotation.y = glm.radians(anim_data[i])
-                    
-                elif c is ChannelType.ZROTATION:
-                    self.local_rotation.z = glm.radians(anim_data[i])
-        
-        super().fixed_update()
-        
     def get_transform_matrix(self):
         if self.context.render_mode == BVHRenderMode.BOX:
-            S = glm.scale(glm.vec3(
-                (self.min_size_neg.x + self.min_size_pos.x),
-                (self.min_size_neg.y + self.min_size_pos.y),
-                (self.min_size_neg.z + self.min_size_pos.z),
-            ))
-            
-            ST = glm.translate(glm.vec3(
-                -(self.min_size_neg.x - self.min_size_pos.x) / 2, 
-                -(self.min_size_neg.y - self.min_size_pos.y) / 2, 
-                -(self.min_size_neg.z - self.min_size_pos.z) / 2
-            ))
-            #ST = glm.mat4()
-            
-            return self.global_transform * ST * S
+            return self.global_transform * self.get_box_matrix()
         else:
             return self.global_transform
     
-    def update_global_transform(self):
-        parent_transform = glm.mat4()
-        
-        if self.parent != None:
-            parent_transform = self.parent.get_global_transfrom()
-        
-        Rx = glm.rotate(self.local_rotation.x, glm.vec3(1, 0, 0))
-        Ry = glm.rotate(self.local_rotation.y, glm.vec3(0, 1, 0))
-        Rz = glm.rotate(self.local_rotation.z, glm.vec3(0, 0, 1))
-        
-        Tx = glm.translate(glm.vec3(self.local_position.x, 0, 0))
-        Ty = glm.translate(glm.vec3(0, self.local_position.y, 0))
-        Tz = glm.translate(glm.vec3(0, 0, self.local_position.z))
-        
-        M = glm.translate(glm.vec3(self.offset.x, self.offset.y, self.offset.z))
-        
-        for c in self.channels:
-            if c is ChannelType.XPOSITION:
-                M = M * Tx
-            
-            elif c is ChannelType.YPOSITION:
-                M = M * Ty
-                
-            elif c is ChannelType.ZPOSITION:
-                M = M * Tz
-                
-            elif c is ChannelType.XROTATION:
-                M = M * Rx
-                
-            elif c is ChannelType.YROTATION:
-                M = M * Ry
-                
-            elif c is ChannelType.ZROTATION:
-                M = M * Rz
-                
-        S = glm.scale(glm.vec3(self.local_scale.x, self.local_scale.y, self.local_scale.z))
-        
-        self.global_transform = parent_transform * S * M
+    def set_pose(self, pose:np.ndarray):
+        """set global transform of this joint to its transform in (joints x 4 x 4) pose"""
+        self.global_transform = glm.mat4(pose[self.idx])
+    
+    def update_global_transform(self, parent_changed:bool=False):
+        """set global transform of joints to the current pose of context, computed by ForwardKinematics"""
+        transform_stats.objects += 1
+        if self.context.pose is not None:
+            self.set_pose(self.context.pose)
+            transform_stats.global_rebuilt += 1
         
         for c in self.children:
-            c.update_global_transform()
+            c.update_global_transform(True)
                 
         return self.global_transform
     
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+import glm
+import numpy as np
+
+if TYPE_CHECKING:
+    from .bvh_loader import BVHAnimInfo
+
+class PoseCache:
+    """PoseCache keeps global transforms of all frames, baked once with ForwardKinematics of the animation
+    
+    Frames are evaluated by chunks of BAKE_CHUNK frames to keep float64 temporaries small.
+    """
+    BAKE_CHUNK = 4096
+    
+    def __init__(self, anim_info:BVHAnimInfo) -> None:
+        self.anim_info = anim_info
+        self.poses = self.bake(0, len(anim_info.motion))
+    
+    def bake(self, start:int, stop:int) -> np.ndarray:
+        """return (stop - start) x joints x 4 x 4 float32 array of global transforms"""
+        fk = self.anim_info.fk
+        poses = np.empty((stop - start, fk.joint_num, 4, 4), dtype=np.float32)
+        
+        for s in range(start, stop, PoseCache.BAKE_CHUNK):
+            e = min(s + PoseCache.BAKE_CHUNK, stop)
+            poses[s - start:e - start] = fk.evaluate(self.anim_info.motion[s:e])
+        
+        return poses
+    
+    def get(self, frame:int) -> np.ndarray:
+        """return joints x 4 x 4 array of global transforms of frame"""
+        return self.poses[frame]
+    
+    def get_transform(self, frame:int, joint_idx:int) -> glm.mat4:
+        return glm.mat4(self.get(frame)[joint_idx])
+    
+    @property
+    def nbytes(self):
+        return self.poses.nbytes
+
+class WindowedPoseCache(PoseCache):
+    """WindowedPoseCache bakes frames in windows of window_size frames when they are first needed,
+    and keeps at most max_windows of the most recently used windows, evicting the least recently used one.
+    
+    Used for takes too long to bake at once.
+    """
+    def __init__(self, anim_info:BVHAnimInfo, window_size:int = 256, max_windows:int = 8) -> None:
+        self.anim_info = anim_info
+        self.window_size = window_size
+        self.max_windows = max_windows
+        
+        self.windows: OrderedDict[int, np.ndarray] = OrderedDict()
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, frame:int) -> np.ndarray:
+        window_idx = frame // self.window_size
+        
+        window = self.windows.get(window_idx)
+        if window is None:
+            self.misses += 1
+            
+            start = window_idx * self.window_size
+            window = self.bake(start, min(start + self.window_size, len(self.anim_info.motion)))
+            self.windows[window_idx] = window
+            
+            if len(self.windows) > self.max_windows:
+                self.windows.popitem(last=False)
+        else:
+            self.hits += 1
+            self.windows.move_to_end(window_idx)
+        
+        return window[frame - window_idx * self.window_size]
+    
+    @property
+    def nbytes(self):
+        return sum(w.nbytes for w in self.windows.values())
\ No newline at end of file
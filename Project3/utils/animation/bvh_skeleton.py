@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from typing import List, TYPE_CHECKING
+
+from OpenGL.GL import *
+import glm
+import numpy as np
+
+if TYPE_CHECKING:
+    from .bvh_object import BVHObject
+from ..object import BaseObject, VertexObjectHelper, VertexAttribute, ShaderType, mesh_registry
+from ..object.vertex_object import buffer_ptr, rewrite_buffer
+from ..struct import Color
+
+class BVHSkeletonLines(BaseObject):
+    """BVHSkeletonLines draws every bone of a skeleton with one GL_LINES draw call.
+    
+    A bone is a line from a joint to one of its end points (offset of a child joint or End Site).
+    Both ends of every bone are computed in world space from the (J x 4 x 4) pose of the context
+    and written to one dynamic VBO, instead of drawing a line mesh per joint with its own transform.
+    """
+    def __init__(self, name: str, context, bvh_objs: List[BVHObject], color: Color=Color.WHITE()) -> None:
+        bone_joints = []
+        bone_ends = []
+        for jo in bvh_objs:
+            for ep in jo.end_points:
+                bone_joints.append(jo.idx)
+                bone_ends.append((ep.x, ep.y, ep.z))
+        
+        # (B) joint index and (B x 3) joint space end point of each bone
+        self.bone_joints = np.array(bone_joints, dtype=np.int64)
+        self.bone_ends = np.array(bone_ends, dtype=np.float64).reshape(-1, 3)
+        
+        # (B x 2 x 6) start and end vertex of each bone, with position and color
+        self.lines = np.zeros((len(self.bone_joints), 2, 6), dtype=np.float32)
+        self.lines[:, :, 3:] = (color.r, color.g, color.b)
+        
+        vertices_obj = VertexObjectHelper.from_array(
+            self.lines.reshape(-1, 6),
+            GL_LINES,
+            VertexAttribute.VERTEX | VertexAttribute.COLOR
+        )
+        vertices_obj.dynamic = True
+        # write poses to the vertex buffer directly
+        self.lines = vertices_obj.vertices_arr.reshape(self.lines.shape)
+        
+        self.cur_pose = None
+        
+        super().__init__(name, context, vertices_obj)
+    
+    def set_pose(self, pose: np.ndarray):
+        """compute bones of (J x 4 x 4) global transforms of joints, and upload them if the pose has changed"""
+        if pose is self.cur_pose:
+            return
+        self.cur_pose = pose
+        
+        transforms = pose[self.bone_joints]
+        self.lines[:, 0, :3] = transforms[:, :3, 3]
+        self.lines[:, 1, :3] = np.einsum("bij,bj->bi", transforms[:, :3, :3], self.bone_ends) + transforms[:, :3, 3]
+        
+        if self.vertices_info is not None and self.vertices_info.VAO is not None:
+            mesh_registry.update_vertices(self.vertices_info)
+    
+    def get_transform_matrix(self):
+        # vertices are already in world space
+        return glm.mat4()
+
+
+class BVHJointBoxes(BaseObject):
+    """BVHJointBoxes draws the boxes of every joint of a skeleton (BOX mode) with one draw call.
+    
+    Boxes of all joints are baked into one mesh in joint space, and each vertex has the index of its joint.
+    Global transforms of joints are uploaded once per frame to a texture buffer (the joint palette),
+    and the vertex shader (ShaderType.PALETTE_PHONG) reads the model matrix of its joint from it.
+    """
+    def __init__(self, name: str, context, bvh_objs: List[BVHObject]) -> None:
+        # (36 x 6) position and normal of each vertex of the unit cube
+        cube = VertexObjectHelper.cube_phong().vertices_arr.reshape(-1, 6)
+        
+        # (J x 36 x 9) position, normal and joint index of each vertex of each box
+        boxes = np.zeros((len(bvh_objs), len(cube), 9), dtype=np.float32)
+        for jo in bvh_objs:
+            box = np.array(jo.get_box_matrix())
+            boxes[jo.idx, :, :3] = cube[:, :3] @ box[:3, :3].T + box[:3, 3]
+            # box matrix is axis aligned scale and translation, normals of the cube stay the same
+            boxes[jo.idx, :, 3:6] = cube[:, 3:]
+            boxes[jo.idx, :, 6] = jo.idx
+        
+        vertices_obj = VertexObjectHelper.from_array(
+            boxes.reshape(-1, 9),
+            GL_TRIANGLES,
+            VertexAttribute.VERTEX | VertexAttribute.NORMAL | VertexAttribute.JOINT,
+            shader_type=ShaderType.PALETTE_PHONG
+        )
+        
+        # (J x 16) column-major global transforms of joints
+        self.palette = np.zeros((len(bvh_objs), 16), dtype=np.float32)
+        self.palette_VBO = None
+        self.joint_palette = None
+        
+        self.cur_pose = None
+        
+        super().__init__(name, context, vertices_obj)
+    
+    def set_pose(self, pose: np.ndarray):
+        """upload (J x 4 x 4) global transforms of joints to the joint palette, if the pose has changed"""
+        if pose is self.cur_pose:
+            return
+        self.cur_pose = pose
+        
+        self.palette.reshape(-1, 4, 4)[:] = pose.transpose(0, 2, 1)
+        
+        if self.joint_palette is None:
+            self.palette_VBO = glGenBuffers(1)
+            self.joint_palette = glGenTextures(1)
+            
+            glBindBuffer(GL_TEXTURE_BUFFER, self.palette_VBO)
+            glBufferData(GL_TEXTURE_BUFFER, self.palette.nbytes, buffer_ptr(self.palette), GL_DYNAMIC_DRAW)
+            
+            glBindTexture(GL_TEXTURE_BUFFER, self.joint_palette)
+            glTexBuffer(GL_TEXTURE_BUFFER, GL_RGBA32F, self.palette_VBO)
+            glBindTexture(GL_TEXTURE_BUFFER, 0)
+        else:
+            rewrite_buffer(GL_TEXTURE_BUFFER, self.palette_VBO, self.palette)
+        
+        glBindBuffer(GL_TEXTURE_BUFFER, 0)
+    
+    def draw_info(self):
+        # nothing to draw before the first pose is uploaded
+        if self.joint_palette is None:
+            return None
+        return self.vertices_info
+    
+    def get_transform_matrix(self):
+        # model matrices are read from the joint palette
+        return glm.mat4()
+    
+    def destroy(self):
+        if self.joint_palette is not None:
+            glDeleteTextures(1, [self.joint_palette])
+            glDeleteBuffers(1, [self.palette_VBO])
+            self.joint_palette = None
+            self.palette_VBO = None
+        
+        super().destroy()
\ No newline at end of file
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import threading, time
+from itertools import islice
+from typing import Callable, List, Union
+
+import numpy as np
+
+class MotionStream:
+    """MotionStream reads MOTION lines of a .bvh file on a background thread, CHUNK_FRAMES lines at a time,
+    into rows of a preallocated (frames x channels) motion array.
+    
+    Rows [0, loaded) of the array are complete and can be read from other threads while loading.
+    Callbacks of add_loaded_callback are called on the loading thread when every frame has been read.
+    """
+    CHUNK_FRAMES = 2048
+    
+    def __init__(self, file_path:str, position:int, first_linenum:int, motion:np.ndarray, print_info:bool = True) -> None:
+        self.file_path = file_path
+        self.position = position
+        self.first_linenum = first_linenum
+        self.motion = motion
+        self.print_info = print_info
+        
+        self.loaded = 0
+        self.done = False
+        self.error: Union[Exception, None] = None
+        
+        # done and on_loaded are changed under lock, so a callback added while loading finishes isn't lost
+        self.lock = threading.Lock()
+        self.on_loaded: List[Callable[[], None]] = []
+        
+        self.cancelled = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+    
+    def start(self):
+        self.thread.start()
+    
+    def add_loaded_callback(self, callback:Callable[[], None]):
+        """call callback when every frame has been read, right away (on this thread) if they are already"""
+        with self.lock:
+            if not self.done:
+                self.on_loaded.append(callback)
+                return
+        callback()
+    
+    def cancel(self):
+        self.cancelled = True
+    
+    def join(self, timeout:Union[float, None] = None):
+        self.thread.join(timeout)
+    
+    def progress(self) -> float:
+        return self.loaded / max(1, len(self.motion))
+    
+    def run(self):
+        from .bvh_loader import BVHLoader
+        
+        start_time = time.perf_counter()
+        frames, chan_num = self.motion.shape
+        
+        try:
+            with open(self.file_path, "r") as bvh_f:
+                bvh_f.seek(self.position)
+                linenum = self.first_linenum
+                
+                while not self.cancelled:
+                    lines = list(islice(bvh_f, MotionStream.CHUNK_FRAMES))
+                    if len(lines) == 0:
+                        break
+                    
+                    chunk = BVHLoader.parse_motion("".join(lines), chan_num, linenum)
+                    linenum = linenum + len(lines)
+                    
+                    if self.loaded + len(chunk) > frames:
+                        raise Exception(f"frame number {frames} is not matching with actual parsed lines {self.loaded + len(chunk)}\n")
+                    
+                    self.motion[self.loaded:self.loaded + len(chunk)] = chunk
+                    self.loaded = self.loaded + len(chunk)
+            
+            if self.cancelled:
+                return
+            
+            if self.loaded != frames:
+                raise Exception(f"frame number {frames} is not matching with actual parsed lines {self.loaded}\n")
+        except Exception as e:
+            self.error = e
+            print(f"Failed to load motion of {self.file_path}: {e}")
+            return
+        
+        if self.print_info:
+            print(f"Motion load time: {time.perf_counter() - start_time}")
+        
+        with self.lock:
+            self.done = True
+            callbacks = self.on_loaded
+            self.on_loaded = []
+        
+        for callback in callbacks:
+            callback()
\ No newline at end of file
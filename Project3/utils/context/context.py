@@ -23,7 +23,8 @@ class ContextBase():
         self.is_updating:bool = False
         self.coroutines:Dict[Generator[BaseCoroutineCondtion, None, None], Optional[BaseCoroutineCondtion]] = {}
         
-    def update(self):
+    def update(self, alpha:float=0):
+        """draw objects, alpha (0 ~ 1) is how far the frame is between the last fixed_update and the next one"""
         for o in self.hierarchy_objects:
             self.draw(o)
                 
@@ -41,6 +42,13 @@ class ContextBase():
     def post_update(self):
         self.is_updating = False
         
+    def is_animating(self) -> bool:
+        """True if frames have to be drawn even without input (PacingMode.ON_DEMAND draws only then)"""
+        return len(self.coroutines) > 0
+    
+    def request_redraw(self):
+        self.manager.frame_pacer.request_redraw()
+        
     def coroutine_update(self):
         for generator, condition in list(self.coroutines.items()):
             if condition == None or condition.check():
@@ -63,17 +71,26 @@ class ContextBase():
     def add_object(self, object:BaseObject):
         self.hierarchy_objects.append(object)
         object.parent = None
+        object.set_transform_dirty()
     
     def set_object(self, object:BaseObject):
+        for o in self.hierarchy_objects:
+            if o is not object:
+                o.destroy()
+                
         self.hierarchy_objects = [object]
         object.parent = None
+        object.set_transform_dirty()
         
     def get_time(self):
         return self.manager.time
         
     def draw(self, object:BaseObject):
         if (self.is_updating):
-            self.manager.renderer.draw(object)
+            if self.manager.renderer.use_render_queue:
+                self.manager.renderer.submit(object)
+            else:
+                self.manager.renderer.draw(object)
             
     def draw_grid(self, object, gap:float, line_num:int, drop_center:bool=False):
         if (self.is_updating):
@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+import ctypes
+import itertools
+from collections import Counter
+from typing import Dict, Union
+
+from OpenGL.GL import *
+from OpenGL import platform as gl_platform
+from glfw.GLFW import *
+import numpy as np
+
+
+class Backend:
+    """Backend is the window system under GraphicsManager, it creates the GL context, presents frames and delivers input.
+    
+    window is the GLFW window, None for backends without a window (no input events are delivered).
+    If max_frames is set, should_close becomes True after that many frames, to run a scene for N frames.
+    If simulated_frame_time is set, get_time advances by simulated_frame_time seconds per frame instead of
+    following the wall clock, so runs of a scene are deterministic (eg. benchmarks).
+    """
+    def __init__(self) -> None:
+        self.window = None
+        self.width = 0
+        self.height = 0
+        
+        self.max_frames: Union[int, None] = None
+        self.frame_count = 0
+        self.close_requested = False
+        self.start_time = time.perf_counter()
+        self.run_start_time = self.start_time
+        
+        self.simulated_frame_time: Union[float, None] = None
+        self.simulated_frames = 0
+    
+    def init(self, width:int, height:int, title:str):
+        self.width = width
+        self.height = height
+        self.start_time = time.perf_counter()
+    
+    def begin_run(self):
+        """start counting frames of GraphicsManager.run, throughput of stats doesn't include loading before it"""
+        self.frame_count = 0
+        self.run_start_time = time.perf_counter()
+    
+    def should_close(self) -> bool:
+        return self.close_requested or (self.max_frames is not None and self.frame_count >= self.max_frames)
+    
+    def set_should_close(self, value:bool):
+        self.close_requested = value
+    
+    def swap_buffers(self):
+        self.frame_count += 1
+        self.simulated_frames += 1
+    
+    def poll_events(self):
+        pass
+    
+    def wait_events(self, timeout:float):
+        # no events arrive without a window
+        time.sleep(timeout)
+    
+    def set_swap_interval(self, interval:int):
+        pass
+    
+    def set_title(self, title:str):
+        pass
+    
+    def get_proc_address(self, name:str) -> Union[int, None]:
+        """address of GL function name in the current context, None if there is no GL driver"""
+        return None
+    
+    def get_time(self) -> float:
+        if self.simulated_frame_time is not None:
+            return self.simulated_frames * self.simulated_frame_time
+        return self.wall_time()
+    
+    def wall_time(self) -> float:
+        return time.perf_counter() - self.start_time
+    
+    def terminate(self):
+        pass
+    
+    def stats(self) -> Dict[str, float]:
+        seconds = time.perf_counter() - self.run_start_time
+        return {
+            "frames": self.frame_count,
+            "seconds": seconds,
+            "fps": self.frame_count / seconds if seconds > 0 else 0
+        }
+    
+    def summary(self) -> str:
+        stats = self.stats()
+        return f"{type(self).__name__}: {stats['frames']} frames in {stats['seconds']:.3f}s ({stats['fps']:.1f} fps)"
+
+
+class GLFWBackend(Backend):
+    """window and GL 3.3 core context of GLFW"""
+    def init(self, width:int, height:int, title:str):
+        super().init(width, height, title)
+        
+        # Initialize GLFW
+        if not glfwInit():
+            raise Exception('glfwInit has failed')
+        
+        glfwWindowHint(GLFW_CONTEXT_VERSION_MAJOR, 3)   # OpenGL 3.3
+        glfwWindowHint(GLFW_CONTEXT_VERSION_MINOR, 3)
+        glfwWindowHint(GLFW_OPENGL_PROFILE, GLFW_OPENGL_CORE_PROFILE)  # Do not allow legacy OpenGl API calls
+        glfwWindowHint(GLFW_OPENGL_FORWARD_COMPAT, GL_TRUE) # for macOS
+        
+        # create a window and OpenGL context
+        self.window = glfwCreateWindow(width, height, title, None, None)
+        if not self.window:
+            glfwTerminate()
+            raise Exception('window has not created')
+        
+        glfwMakeContextCurrent(self.window)
+    
+    def should_close(self) -> bool:
+        return glfwWindowShouldClose(self.window) or super().should_close()
+    
+    def set_should_close(self, value:bool):
+        super().set_should_close(value)
+        glfwSetWindowShouldClose(self.window, GLFW_TRUE if value else GLFW_FALSE)
+        # wake up the loop if it's waiting for events
+        glfwPostEmptyEvent()
+    
+    def swap_buffers(self):
+        super().swap_buffers()
+        glfwSwapBuffers(self.window)
+    
+    def poll_events(self):
+        glfwPollEvents()
+    
+    def wait_events(self, timeout:float):
+        glfwWaitEventsTimeout(timeout)
+    
+    def set_swap_interval(self, interval:int):
+        glfwSwapInterval(interval)
+    
+    def set_title(self, title:str):
+        glfwSetWindowTitle(self.window, title)
+    
+    def get_proc_address(self, name:str) -> Union[int, None]:
+        return glfwGetProcAddress(name)
+    
+    def wall_time(self) -> float:
+        return glfwGetTime()
+    
+    def terminate(self):
+        glfwTerminate()
+
+
+class OffscreenBackend(Backend):
+    """GL 3.3 core context of EGL without a window, frames are drawn to a framebuffer object of width x height
+    
+    PyOpenGL chooses its platform when OpenGL is first imported, so PYOPENGL_PLATFORM has to be "egl" before that
+    (utils sets it if GRAPHICS_BACKEND is "offscreen"). The surfaceless platform of Mesa is used if it's available
+    (software rendering without a GPU or display), otherwise the default display of EGL.
+    """
+    EGL_PLATFORM_SURFACELESS_MESA = 0x31DD
+    
+    def __init__(self) -> None:
+        super().__init__()
+        
+        self.display = None
+        self.context = None
+        self.surface = None
+        self.FBO = None
+        self.renderbuffers = None
+    
+    def init(self, width:int, height:int, title:str):
+        super().init(width, height, title)
+        
+        if type(gl_platform.PLATFORM).__name__ != "EGLPlatform":
+            raise Exception("Offscreen backend needs the EGL platform of PyOpenGL, set GRAPHICS_BACKEND=offscreen (or PYOPENGL_PLATFORM=egl) before OpenGL is imported")
+        
+        from OpenGL import EGL
+        
+        self.display = self.get_display(EGL)
+        
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(self.display, ctypes.pointer(major), ctypes.pointer(minor)):
+            raise Exception("eglInitialize has failed")
+        
+        config_attribs = (EGL.EGLint * 13)(
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8,
+            EGL.EGL_DEPTH_SIZE, 24,
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_NONE
+        )
+        config = EGL.EGLConfig()
+        config_num = EGL.EGLint()
+        if not EGL.eglChooseConfig(self.display, config_attribs, ctypes.pointer(config), 1, ctypes.pointer(config_num)) or config_num.value == 0:
+            raise Exception("EGL has no config for OpenGL")
+        
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        context_attribs = (EGL.EGLint * 7)(
+            EGL.EGL_CONTEXT_MAJOR_VERSION, 3,
+            EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+            EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK, EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT,
+            EGL.EGL_NONE
+        )
+        self.context = EGL.eglCreateContext(self.display, config, EGL.EGL_NO_CONTEXT, context_attribs)
+        if not self.context:
+            raise Exception("OpenGL 3.3 context of EGL has not created")
+        
+        # frames are drawn to the FBO, a pbuffer is made only if the context can't be current without a surface
+        self.surface = EGL.EGL_NO_SURFACE
+        try:
+            made_current = EGL.eglMakeCurrent(self.display, self.surface, self.surface, self.context)
+        except EGL.EGLError:
+            made_current = False
+        if not made_current:
+            self.surface = EGL.eglCreatePbufferSurface(self.display, config, (EGL.EGLint * 5)(EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height, EGL.EGL_NONE))
+            EGL.eglMakeCurrent(self.display, self.surface, self.surface, self.context)
+        
+        self.init_framebuffer()
+    
+    def get_display(self, EGL):
+        try:
+            from OpenGL.EGL.EXT.platform_base import eglGetPlatformDisplayEXT
+            display = eglGetPlatformDisplayEXT(OffscreenBackend.EGL_PLATFORM_SURFACELESS_MESA, EGL.EGL_DEFAULT_DISPLAY, None)
+            if display:
+                return display
+        except Exception:
+            pass
+        return EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+    
+    def init_framebuffer(self):
+        self.FBO = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.FBO)
+        
+        self.renderbuffers = glGenRenderbuffers(2)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.renderbuffers[0])
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, self.width, self.height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, self.renderbuffers[0])
+        
+        glBindRenderbuffer(GL_RENDERBUFFER, self.renderbuffers[1])
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH24_STENCIL8, self.width, self.height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_STENCIL_ATTACHMENT, GL_RENDERBUFFER, self.renderbuffers[1])
+        
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise Exception("Framebuffer of the offscreen backend is not complete")
+        
+        glViewport(0, 0, self.width, self.height)
+    
+    def swap_buffers(self):
+        super().swap_buffers()
+        # nothing is presented, wait for the GPU so frames are not only queued
+        glFinish()
+    
+    def get_proc_address(self, name:str) -> Union[int, None]:
+        from OpenGL import EGL
+        return EGL.eglGetProcAddress(name.encode())
+    
+    def read_pixels(self) -> np.ndarray:
+        """(height x width x 4) RGBA pixels of the last frame, top row first"""
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self.FBO)
+        pixels = glReadPixels(0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE)
+        return np.frombuffer(pixels, dtype=np.uint8).reshape(self.height, self.width, 4)[::-1]
+    
+    def terminate(self):
+        from OpenGL import EGL
+        
+        if self.FBO is not None:
+            glDeleteFramebuffers(1, [self.FBO])
+            glDeleteRenderbuffers(2, self.renderbuffers)
+            self.FBO = None
+        
+        if self.display is not None:
+            EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            if self.surface != EGL.EGL_NO_SURFACE:
+                EGL.eglDestroySurface(self.display, self.surface)
+            EGL.eglDestroyContext(self.display, self.context)
+            EGL.eglTerminate(self.display)
+            self.display = None
+
+
+class RecordingGL:
+    """Null GL driver, counts calls of gl* functions and returns ids and successful results without a GL context"""
+    def __init__(self) -> None:
+        self.calls: Counter = Counter()
+        self.ids = itertools.count(1)
+    
+    def make(self, name:str):
+        def call(*args, **kwargs):
+            self.calls[name] += 1
+            return self.result(name, args)
+        call.__name__ = name
+        return call
+    
+    def result(self, name:str, args):
+        if name.startswith("glGen"):
+            n = args[0] if len(args) > 0 else 1
+            if n == 1:
+                return np.uint32(next(self.ids))
+            return np.array([next(self.ids) for _ in range(n)], dtype=np.uint32)
+        if name in ("glCreateShader", "glCreateProgram", "glGetUniformLocation"):
+            return next(self.ids)
+        if name in ("glGetShaderiv", "glGetProgramiv", "glGetQueryObjectiv"):
+            return GL_TRUE
+        if name == "glGetQueryObjectui64v":
+            return 0
+        if name == "glCheckFramebufferStatus":
+            return GL_FRAMEBUFFER_COMPLETE
+        if name == "glGetString":
+            return b"null"
+        return None
+    
+    def install(self, package:str):
+        """replace gl* functions imported by modules of package (eg. "utils") with recording ones,
+        for the rest of the process
+        """
+        for module_name, module in list(sys.modules.items()):
+            if module is None or not (module_name == package or module_name.startswith(package + ".")):
+                continue
+            
+            for attr, value in list(vars(module).items()):
+                if attr.startswith("gl") and not attr.startswith("glfw") and not attr.startswith("glm") and callable(value):
+                    setattr(module, attr, self.make(attr))
+    
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+
+class NullBackend(Backend):
+    """no window and no GL context, GL calls of utils are recorded by RecordingGL and counted
+    
+    CPU cost of the scene (update, transforms, render queue, Python side of GL calls) can be measured
+    on machines without a GPU or display.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.gl = RecordingGL()
+    
+    def init(self, width:int, height:int, title:str):
+        super().init(width, height, title)
+        self.gl.install(__name__.split(".")[0])
+    
+    def stats(self) -> Dict[str, float]:
+        stats = super().stats()
+        stats["gl_calls"] = self.gl.total_calls()
+        stats["gl_calls_per_frame"] = stats["gl_calls"] / max(1, self.frame_count)
+        return stats
+    
+    def summary(self) -> str:
+        stats = self.stats()
+        lines = [super().summary() + f", {stats['gl_calls']} GL calls ({stats['gl_calls_per_frame']:.1f} per frame)"]
+        for name, count in self.gl.calls.most_common(10):
+            lines.append(f"  {name}: {count}")
+        return "\n".join(lines)
+
+
+BACKENDS = {
+    "glfw": GLFWBackend,
+    "offscreen": OffscreenBackend,
+    "null": NullBackend
+}
+
+
+def create_backend(name:Union[str, None]=None) -> Backend:
+    """backend of name, or of GRAPHICS_BACKEND environment variable (glfw if it's not set)"""
+    if name is None:
+        name = os.environ.get("GRAPHICS_BACKEND", "glfw")
+    if name not in BACKENDS:
+        raise Exception(f"Unknown graphics backend {name}, it has to be one of {', '.join(BACKENDS.keys())}")
+    return BACKENDS[name]()
\ No newline at end of file
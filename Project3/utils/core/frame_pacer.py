@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import time
+from enum import Enum
+from dataclasses import dataclass
+from typing import Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .backend import Backend
+
+
+class PacingMode(Enum):
+    # draw as fast as possible
+    UNCAPPED = 0
+    # swap buffers once per refresh of the display
+    VSYNC = 1
+    # at most max_fps frames per second, waiting for the rest of a frame by sleep and spin
+    CAPPED = 2
+    # draw only when redraw is requested (input, object changes) or the context is animating, wait for events otherwise
+    ON_DEMAND = 3
+
+
+@dataclass
+class PacingStats:
+    """Frames drawn and time spent waiting by FramePacer since the last clear"""
+    frames: int = 0
+    idle_waits: int = 0
+    sleep_time: float = 0
+    spin_time: float = 0
+    
+    # wall and CPU time of the process at the last clear, for cpu_usage
+    wall_start: float = 0
+    cpu_start: float = 0
+    
+    def clear(self):
+        self.frames = 0
+        self.idle_waits = 0
+        self.sleep_time = 0
+        self.spin_time = 0
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+    
+    def cpu_usage(self) -> float:
+        """CPU time of the process per wall time since the last clear (1.0 is a whole core)"""
+        wall = time.perf_counter() - self.wall_start
+        if wall <= 0:
+            return 0
+        return (time.process_time() - self.cpu_start) / wall
+    
+    def __str__(self) -> str:
+        wall = time.perf_counter() - self.wall_start
+        fps = self.frames / wall if wall > 0 else 0
+        return f"{self.frames} frames ({fps:.1f} fps), idle waits: {self.idle_waits}, sleep: {self.sleep_time * 1000:.0f}ms, spin: {self.spin_time * 1000:.0f}ms, cpu: {self.cpu_usage() * 100:.1f}%"
+
+
+class FramePacer:
+    """FramePacer decides when GraphicsManager.run draws a frame and how it waits between frames.
+    
+    CAPPED waits until the deadline of the next frame with time.sleep, which can wake up late
+    by the timer resolution of the OS, so the last spin_time seconds before the deadline are spun instead.
+    Deadlines advance by 1 / max_fps from the previous one, so the rate doesn't drift.
+    """
+    def __init__(self, mode:PacingMode=PacingMode.VSYNC, max_fps:float=60, spin_time:float=0.002, backend:Union[Backend, None]=None) -> None:
+        self.mode = mode
+        self.backend = backend
+        self.max_fps = max_fps
+        self.spin_time = spin_time
+        
+        # ON_DEMAND wakes up at least every idle_timeout seconds to check loads finished on other threads
+        self.idle_timeout = 0.1
+        self.redraw_requested = True
+        
+        self.next_deadline = None
+        self.swap_interval = None
+        
+        self.stats = PacingStats()
+        self.stats.clear()
+    
+    def set_mode(self, mode:PacingMode):
+        self.mode = mode
+        self.next_deadline = None
+        self.redraw_requested = True
+        self.apply_swap_interval()
+    
+    def apply_swap_interval(self):
+        """set swap interval of the current GL context for the mode"""
+        swap_interval = 1 if self.mode in (PacingMode.VSYNC, PacingMode.ON_DEMAND) else 0
+        if swap_interval != self.swap_interval and self.backend is not None:
+            self.backend.set_swap_interval(swap_interval)
+            self.swap_interval = swap_interval
+    
+    def request_redraw(self):
+        self.redraw_requested = True
+    
+    def should_draw(self, animating:bool) -> bool:
+        if self.mode != PacingMode.ON_DEMAND:
+            return True
+        return self.redraw_requested or animating
+    
+    def wait_events(self):
+        """block until an input event arrives (or idle_timeout), instead of drawing a frame"""
+        self.stats.idle_waits += 1
+        if self.backend is not None:
+            self.backend.wait_events(self.idle_timeout)
+        else:
+            time.sleep(self.idle_timeout)
+    
+    def begin_frame(self):
+        # changes made while drawing this frame request the next one
+        self.redraw_requested = False
+        self.stats.frames += 1
+    
+    def end_frame(self):
+        if self.mode != PacingMode.CAPPED:
+            return
+        
+        period = 1 / self.max_fps
+        now = time.perf_counter()
+        if self.next_deadline is None or now - self.next_deadline > period:
+            # first frame, or too late to catch up with the schedule
+            self.next_deadline = now + period
+        else:
+            self.next_deadline += period
+        
+        self.wait_until(self.next_deadline)
+    
+    def wait_until(self, deadline:float):
+        """sleep until spin_time before deadline, then spin until deadline"""
+        now = time.perf_counter()
+        if deadline - now > self.spin_time:
+            time.sleep(deadline - now - self.spin_time)
+            after_sleep = time.perf_counter()
+            self.stats.sleep_time += after_sleep - now
+            now = after_sleep
+        
+        spin_start = now
+        while now < deadline:
+            now = time.perf_counter()
+        self.stats.spin_time += now - spin_start
\ No newline at end of file
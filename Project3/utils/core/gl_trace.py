@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import sys
+import time
+from typing import Dict, List, Tuple, Union
+
+
+# modules of the package whose gl* functions are traced, modules which don't exist are skipped
+TRACED_MODULES = [
+    "core.render_manager",
+    "core.frame_data",
+    "object.base_object",
+    "object.vertex_object",
+    "object.mesh_registry",
+    "shader.load",
+    "shader.shaders",
+    "animation.bvh_skeleton",
+]
+
+# columns of the frame table, functions are counted in the first column whose prefix they start with
+COLUMNS = [
+    ("uniform", ("glUniform",)),
+    ("program", ("glUseProgram",)),
+    ("VAO", ("glBindVertexArray",)),
+    ("draw", ("glDraw",)),
+]
+
+NO_OBJECT = "-"
+
+
+class GLTracer:
+    """GLTracer counts calls of gl* functions and Python time spent in them, per frame and in total,
+    attributed to the BaseObject being drawn.
+    
+    install() replaces gl* functions imported by TRACED_MODULES with wrappers until uninstall().
+    RenderManager sets current_object to the name of the object it's drawing,
+    calls made outside of draws (uploads, clears) are counted for NO_OBJECT.
+    """
+    def __init__(self) -> None:
+        self.installed = False
+        self.current_object: Union[str, None] = None
+        
+        # (object name, function name) -> [calls, seconds] of the current frame and of all frames
+        self.frame_calls: Dict[Tuple[str, str], List] = {}
+        self.last_frame_calls: Dict[Tuple[str, str], List] = {}
+        self.total_calls: Dict[Tuple[str, str], List] = {}
+        self.frames = 0
+        
+        # (module, attribute name, original function) replaced by install
+        self.replaced: List[Tuple[object, str, object]] = []
+    
+    def wrap(self, name:str, func):
+        def traced(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start
+                key = (self.current_object or NO_OBJECT, name)
+                entry = self.frame_calls.get(key)
+                if entry is None:
+                    self.frame_calls[key] = [1, duration]
+                else:
+                    entry[0] += 1
+                    entry[1] += duration
+        traced.__name__ = name
+        return traced
+    
+    def install(self, package:Union[str, None]=None):
+        """wrap gl* functions of TRACED_MODULES of package (the package of this module by default)"""
+        if self.installed:
+            return
+        
+        package = package if package is not None else __name__.split(".")[0]
+        for module_name in TRACED_MODULES:
+            module = sys.modules.get(f"{package}.{module_name}")
+            if module is None:
+                continue
+            
+            for attr, value in list(vars(module).items()):
+                if attr.startswith("gl") and not attr.startswith("glfw") and not attr.startswith("glm") and callable(value):
+                    self.replaced.append((module, attr, value))
+                    setattr(module, attr, self.wrap(attr, value))
+        
+        self.installed = True
+        self.clear()
+    
+    def uninstall(self):
+        for module, attr, value in self.replaced:
+            setattr(module, attr, value)
+        self.replaced = []
+        self.installed = False
+    
+    def clear(self):
+        self.frame_calls = {}
+        self.last_frame_calls = {}
+        self.total_calls = {}
+        self.frames = 0
+    
+    def end_frame(self):
+        if not self.installed:
+            return
+        
+        for key, (calls, seconds) in self.frame_calls.items():
+            entry = self.total_calls.get(key)
+            if entry is None:
+                self.total_calls[key] = [calls, seconds]
+            else:
+                entry[0] += calls
+                entry[1] += seconds
+        
+        self.last_frame_calls = self.frame_calls
+        self.frame_calls = {}
+        self.current_object = None
+        self.frames += 1
+    
+    @staticmethod
+    def column(name:str) -> str:
+        for column, prefixes in COLUMNS:
+            if name.startswith(prefixes):
+                return column
+        return "other"
+    
+    def frame_table(self) -> str:
+        """GL calls of the last frame per object, by column of COLUMNS"""
+        columns = [c for c, _ in COLUMNS] + ["other"]
+        rows: Dict[str, Dict[str, float]] = {}
+        for (obj, name), (calls, seconds) in self.last_frame_calls.items():
+            row = rows.setdefault(obj, dict.fromkeys(columns + ["calls", "seconds"], 0))
+            row[GLTracer.column(name)] += calls
+            row["calls"] += calls
+            row["seconds"] += seconds
+        
+        lines = [f"GL calls of frame {self.frames}:", f"  {'object':<24}" + "".join(f"{c:>9}" for c in columns) + f"{'total':>9}{'ms':>9}"]
+        for obj, row in sorted(rows.items(), key=lambda item: -item[1]["calls"]):
+            lines.append(f"  {obj:<24}" + "".join(f"{row[c]:>9}" for c in columns) + f"{row['calls']:>9}{row['seconds'] * 1000:>9.3f}")
+        
+        total_calls = sum(row["calls"] for row in rows.values())
+        total_seconds = sum(row["seconds"] for row in rows.values())
+        lines.append(f"  {'total':<24}" + "".join(f"{sum(row[c] for row in rows.values()):>9}" for c in columns) + f"{total_calls:>9}{total_seconds * 1000:>9.3f}")
+        return "\n".join(lines)
+    
+    def report(self, top:int=20) -> str:
+        """GL calls of all frames since install or clear, per function and per object"""
+        if self.frames == 0:
+            return "GL trace: no frames"
+        
+        functions: Dict[str, List] = {}
+        objects: Dict[str, List] = {}
+        for (obj, name), (calls, seconds) in self.total_calls.items():
+            for table, key in ((functions, name), (objects, obj)):
+                entry = table.setdefault(key, [0, 0.])
+                entry[0] += calls
+                entry[1] += seconds
+        
+        total_calls = sum(calls for calls, _ in functions.values())
+        total_seconds = sum(seconds for _, seconds in functions.values())
+        lines = [f"GL trace of {self.frames} frames: {total_calls / self.frames:.1f} calls per frame, {total_seconds / self.frames * 1000:.3f}ms per frame"]
+        
+        lines.append(f"  {'function':<28}{'calls':>10}{'per frame':>11}{'ms':>10}{'us/call':>10}")
+        for name, (calls, seconds) in sorted(functions.items(), key=lambda item: -item[1][1])[:top]:
+            lines.append(f"  {name:<28}{calls:>10}{calls / self.frames:>11.1f}{seconds * 1000:>10.3f}{seconds / calls * 1e6:>10.2f}")
+        
+        lines.append(f"  {'object':<28}{'calls':>10}{'per frame':>11}{'ms':>10}{'ms/frame':>10}")
+        for obj, (calls, seconds) in sorted(objects.items(), key=lambda item: -item[1][1])[:top]:
+            lines.append(f"  {obj:<28}{calls:>10}{calls / self.frames:>11.1f}{seconds * 1000:>10.3f}{seconds / self.frames * 1000:>10.3f}")
+        
+        return "\n".join(lines)
+
+
+gl_tracer = GLTracer()
\ No newline at end of file
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import math
 from enum import Enum
+from dataclasses import dataclass
 from typing import Dict, List, Union, Callable, Generator, Optional, Any
 
 from OpenGL.GL import *
@@ -9,17 +11,45 @@ import glm
 
 import numpy as np
 
-from ..shader import frame_shader, phong_shader
-from ..object import ShaderType
+from ..shader import frame_shader, phong_shader, instanced_phong_shader, palette_phong_shader
+from ..object import ShaderType, asset_loader, transform_stats
 from .camera import CameraHelper
 from ..event import InputEventHelper, MouseEventHelper, MouseEventType, EventType
 from .screen import Screen
 from .render_manager import RenderManager
+from .frame_pacer import FramePacer, PacingMode
+from .profiler import profiler
+from .gl_trace import gl_tracer
+from .backend import Backend, create_backend
+from .raw_gl import bind_raw_functions
+from ..gl_config import RELEASE
 from ..context import ContextMode, ContextBase
 
 
+@dataclass
+class TickStats:
+    """fixed_update ticks run by GraphicsManager.run since the last clear"""
+    frames: int = 0
+    ticks: int = 0
+    # ticks run in addition to the ticks of a frame at the steady frame period (see GraphicsManager.frame_period),
+    # to catch up with the time of slow frames
+    caught_up: int = 0
+    # ticks skipped because a frame was too late to catch up within max_fixed_steps
+    dropped: int = 0
+    
+    def clear(self):
+        self.frames = 0
+        self.ticks = 0
+        self.caught_up = 0
+        self.dropped = 0
+    
+    def __str__(self) -> str:
+        return f"{self.ticks} ticks in {self.frames} frames, caught up: {self.caught_up}, dropped: {self.dropped}"
+    
+    
 class GraphicsManager():
-    def __init__(self, width, height, title, framerate=30) -> None:
+    def __init__(self, width, height, title, framerate=30, backend:Union[Backend, None]=None) -> None:
+        """backend is created by create_backend (GRAPHICS_BACKEND environment variable, glfw by default) if it's None"""
         self.window_width = width
         self.window_height = height
         self.window_title = title
@@ -32,42 +62,62 @@ class GraphicsManager():
         self.camera.change_radius(10)
         
         self.time:float = 0
-        self.timestamp_for_frame = 0
+        self.timestamp_for_frame = None
         self.framerate = framerate
         
-        self.window = None
-        self.init_glfw()
+        # fixed_update runs once per 1 / framerate seconds of the time accumulated by frames,
+        # at most max_fixed_steps times in a frame, the rest of the time of a late frame is dropped.
+        # fixed_alpha (0 ~ 1) is how far the frame is between the last tick and the next one
+        self.max_fixed_steps = 5
+        self.fixed_accumulator:float = 0
+        self.fixed_alpha:float = 0
+        self.tick_stats = TickStats()
+        
+        # moving average of seconds between frames, frames at this period run framerate * frame_period ticks
+        # (eg. 2 of a 120 Hz animation on a 60 Hz display), only the ticks above that count as caught up
+        self.frame_period: Union[float, None] = None
+        
+        # seconds per frame spent on running load callbacks and uploading meshes of asset_loader
+        self.asset_upload_budget = 0.004
+        
+        # print RenderStats of the render queue and TransformStats every second
+        self.print_render_stats = False
+        self.render_stats_timestamp = 0
+        # print summary of the frame profiler every second (if it's enabled)
+        self.print_profile = False
+        # print GL calls of a frame per object every second (if gl_tracer is installed)
+        self.print_gl_trace = False
+        
+        self.backend = backend if backend is not None else create_backend()
+        self.backend.init(width, height, title)
+        self.window = self.backend.window
+        
+        # GL functions of the draw loop are called without PyOpenGL wrappers in release mode
+        self.raw_functions = bind_raw_functions(self.backend) if RELEASE else []
+        profiler.set_backend(self.backend)
+        
+        self.frame_pacer = FramePacer(backend=self.backend)
+        self.frame_pacer.apply_swap_interval()
         
         self.bind_event_callback()
         
         self.renderer = RenderManager(
             {
                 ShaderType.BASIC: frame_shader,
-                ShaderType.PHONG: phong_shader
+                ShaderType.PHONG: phong_shader,
+                ShaderType.PALETTE_PHONG: palette_phong_shader
             }, 
             self.screen, 
-            self.camera
+            self.camera,
+            {
+                ShaderType.PHONG: instanced_phong_shader
+            }
         )
         self.renderer.init_renderer()
         
     
-    def init_glfw(self):
-        # Initialize GLFW
-        if not glfwInit():
-            raise Exception('glfwInit has failed')
-        
-        glfwWindowHint(GLFW_CONTEXT_VERSION_MAJOR, 3)   # OpenGL 3.3
-        glfwWindowHint(GLFW_CONTEXT_VERSION_MINOR, 3)
-        glfwWindowHint(GLFW_OPENGL_PROFILE, GLFW_OPENGL_CORE_PROFILE)  # Do not allow legacy OpenGl API calls
-        glfwWindowHint(GLFW_OPENGL_FORWARD_COMPAT, GL_TRUE) # for macOS
-
-        # create a window and OpenGL context
-        self.window = glfwCreateWindow(self.window_width, self.window_height, self.window_title, None, None)
-        if not self.window:
-            glfwTerminate()
-            raise Exception('window has not created')
-        
-        glfwMakeContextCurrent(self.window)
+    def set_window_title(self, title:str):
+        self.backend.set_title(title)
         
         
     def bind_event_callback(self):
@@ -114,6 +164,13 @@ class GraphicsManager():
         # Set callback functions for screen size
         self.event_helper.set_frame_buffer_size_event(self.screen.on_viewport_size_change)
     
+        # any input redraws the frame in PacingMode.ON_DEMAND
+        def request_redraw(*args):
+            self.frame_pacer.request_redraw()
+        
+        for event_type in [EventType.KEYBOARD, EventType.MOUSE_SCROLL, EventType.MOUSE_BUTTON, EventType.MOUSE_CURSOR_POS, EventType.FRAME_BUFFER_SIZE, EventType.DRAG_DROP]:
+            self.event_helper.add_callback(event_type, request_redraw)
+    
             
     def _pre_update(self):
         """Update states of all components in Graphics manager 
@@ -121,36 +178,124 @@ class GraphicsManager():
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glEnable(GL_DEPTH_TEST)
         
+        # camera only changes by input events, between frames
+        self.renderer.begin_frame()
+        
         # update event helper
         self.mouse_helper.update_state()
         
         
     def _post_update(self):
         # swap front and back buffers
-        glfwSwapBuffers(self.window)
+        with profiler.scope("swap_buffers"):
+            self.backend.swap_buffers()
 
         # poll events
-        glfwPollEvents()
+        with profiler.scope("poll_events"):
+            self.backend.poll_events()
+        
+    
+    def run_fixed_update(self, context: ContextBase) -> float:
+        """Run fixed_update of context for the time elapsed since the last frame, return the interpolation alpha
+        
+        Time of frames is accumulated and consumed by ticks of 1 / framerate seconds, so ticks keep the rate
+        of real time even if frames are slower or irregular. A late frame runs several ticks to catch up,
+        up to max_fixed_steps, and drops the remaining whole ticks to not fall further behind.
+        """
+        if self.timestamp_for_frame is None:
+            self.timestamp_for_frame = self.time
+        
+        elapsed = self.time - self.timestamp_for_frame
+        self.fixed_accumulator += elapsed
+        self.timestamp_for_frame = self.time
+        
+        step = 1 / self.framerate
+        steps = 0
+        while self.fixed_accumulator >= step and steps < self.max_fixed_steps:
+            context.fixed_update()
+            self.fixed_accumulator -= step
+            steps += 1
         
+        if self.fixed_accumulator >= step:
+            dropped = int(self.fixed_accumulator // step)
+            self.fixed_accumulator -= dropped * step
+            self.tick_stats.dropped += dropped
+        
+        self.tick_stats.frames += 1
+        self.tick_stats.ticks += steps
+        
+        # the first frame sets the period, then it follows frame times slowly so a slow frame stands out.
+        # expected ticks are rounded up (a 60 Hz animation on a 50 Hz display runs 1 or 2 ticks a frame),
+        # a little jitter of frame times doesn't add a tick
+        if self.frame_period is None and elapsed > 0:
+            self.frame_period = elapsed
+        expected_steps = 1 if self.frame_period is None else max(1, math.ceil(self.framerate * self.frame_period - 0.05))
+        self.tick_stats.caught_up += max(0, steps - expected_steps)
+        if elapsed > 0:
+            self.frame_period += (elapsed - self.frame_period) * 0.1
+        
+        return self.fixed_accumulator / step
+    
+    def set_pacing_mode(self, mode:PacingMode, max_fps:Union[float, None]=None):
+        if max_fps is not None:
+            self.frame_pacer.max_fps = max_fps
+        self.frame_pacer.set_mode(mode)
     
     def run(self, context: ContextBase):
-        while not glfwWindowShouldClose(self.window):
+        self.backend.begin_run()
+        while not self.backend.should_close():
+            if not self.frame_pacer.should_draw(context.is_animating() or asset_loader.pending() > 0):
+                self.frame_pacer.wait_events()
+                # time while idle isn't simulated by fixed_update
+                self.timestamp_for_frame = None
+                continue
+            
+            self.frame_pacer.begin_frame()
+            profiler.begin_frame()
             self._pre_update()
             
-            context.pre_update()
+            with profiler.scope("asset_loader"):
+                asset_loader.process(self.asset_upload_budget)
+            
+            transform_stats.clear()
+            with profiler.scope("pre_update"):
+                context.pre_update()
+            
+            self.time = self.backend.get_time()
+            with profiler.scope("fixed_update"):
+                self.fixed_alpha = self.run_fixed_update(context)
             
-            self.time = glfwGetTime()
-            if self.timestamp_for_frame + (1 / self.framerate) <= self.time:
-                self.timestamp_for_frame = self.time
-                context.fixed_update()
+            with profiler.scope("update"):
+                context.update(self.fixed_alpha)
             
-            context.update()
+            with profiler.scope("render"):
+                self.renderer.flush()
+            if (self.print_render_stats or self.print_profile or self.print_gl_trace) and self.render_stats_timestamp + 1 <= self.time:
+                self.render_stats_timestamp = self.time
+                if self.print_render_stats:
+                    print(f"Render stats: {self.renderer.stats}")
+                    print(f"Transform stats: {transform_stats}")
+                    print(f"Tick stats: {self.tick_stats}")
+                    print(f"Pacing stats: {self.frame_pacer.mode.name} {self.frame_pacer.stats}")
+                if self.print_profile and profiler.enabled:
+                    print(profiler.summary())
+                if self.print_gl_trace and gl_tracer.installed:
+                    print(gl_tracer.frame_table())
+                self.tick_stats.clear()
+                self.frame_pacer.stats.clear()
             
-            context.coroutine_update()
+            with profiler.scope("coroutine_update"):
+                context.coroutine_update()
             
             context.post_update()
             
             self._post_update()
+            profiler.end_frame()
+            gl_tracer.end_frame()
+            self.frame_pacer.end_frame()
     
     def exit(self):
-        glfwTerminate()
\ No newline at end of file
+        profiler.destroy()
+        self.renderer.frame_data.destroy()
+        asset_loader.shutdown()
+        self.backend.terminate()
\ No newline at end of file
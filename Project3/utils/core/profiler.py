@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import json
+import time
+import ctypes
+from collections import deque
+from typing import Deque, Dict, List, Tuple, Union, TYPE_CHECKING
+
+from OpenGL.GL import *
+import numpy as np
+
+from .raw_gl import FUNCTYPE
+
+if TYPE_CHECKING:
+    from .backend import Backend
+
+
+class ProfileScope:
+    """Times a block of the current frame, `with profiler.scope(name):`"""
+    __slots__ = ("profiler", "name", "start")
+    
+    def __init__(self, profiler:FrameProfiler, name:str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.
+    
+    def __enter__(self):
+        self.profiler.stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        duration = time.perf_counter() - self.start
+        
+        p = self.profiler
+        path = "/".join(p.stack)
+        p.stack.pop()
+        
+        p.events.append((path, self.start, duration))
+        p.scope_sums[path] = p.scope_sums.get(path, 0.) + duration
+        return False
+
+
+class NullScope:
+    """scope of a disabled profiler, does nothing"""
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SCOPE = NullScope()
+
+
+class FrameProfiler:
+    """FrameProfiler records CPU time of named scopes of each frame of GraphicsManager.run.
+    
+    Scopes are nested, a scope is identified by the path of the scopes it's in (eg. "update/draw"),
+    and its time is the sum of every time it was entered in the frame.
+    The last capacity frames are kept in ring buffers, for percentiles of frame times and the Chrome trace.
+    
+    If gpu_timing is True, GPU time of each frame is measured with a GL_TIME_ELAPSED query.
+    Results are read a few frames later when they are available, without waiting for the GPU.
+    """
+    def __init__(self, capacity:int=600) -> None:
+        self.enabled = False
+        self.gpu_timing = False
+        self.capacity = capacity
+        
+        self.frame_count = 0
+        # seconds of each frame, in ring buffers of capacity frames (index is frame_count % capacity)
+        self.frame_times = np.zeros(capacity)
+        self.gpu_times = np.full(capacity, np.nan)
+        self.scope_times: Dict[str, np.ndarray] = {}
+        # (frame number, start, [(path, start, duration)]) of the last capacity frames, for the Chrome trace
+        self.frames: Deque[Tuple[int, float, List[Tuple[str, float, float]]]] = deque(maxlen=capacity)
+        
+        # state of the current frame
+        self.frame_start: Union[float, None] = None
+        self.stack: List[str] = []
+        self.events: List[Tuple[str, float, float]] = []
+        self.scope_sums: Dict[str, float] = {}
+        
+        # (query, ring buffer index, frame start) of frames waiting for GPU times
+        self.pending_queries: Deque[Tuple[int, int, float]] = deque()
+        self.free_queries: List[int] = []
+        # PyOpenGL can't convert the GLuint64 output of glGetQueryObjectui64v,
+        # the function of the driver is called with ctypes (see set_backend)
+        self.get_query_result = None
+        self.query_result = ctypes.c_uint64()
+        
+        self.origin = time.perf_counter()
+    
+    def clear(self, capacity:Union[int, None]=None):
+        """forget recorded frames, and resize ring buffers to capacity frames if it's given"""
+        if capacity is not None and capacity != self.capacity:
+            self.capacity = capacity
+            self.frame_times = np.zeros(capacity)
+            self.gpu_times = np.full(capacity, np.nan)
+            self.frames = deque(maxlen=capacity)
+        
+        self.frame_count = 0
+        self.frame_times[:] = 0
+        self.gpu_times[:] = np.nan
+        self.scope_times = {}
+        self.frames.clear()
+    
+    def set_backend(self, backend:Backend):
+        """look up glGetQueryObjectui64v in the GL driver of backend, GPU times stay 0 without a driver (NullBackend)"""
+        address = backend.get_proc_address("glGetQueryObjectui64v")
+        if address:
+            self.get_query_result = FUNCTYPE(None, ctypes.c_uint, ctypes.c_uint, ctypes.POINTER(ctypes.c_uint64))(address)
+        else:
+            self.get_query_result = None
+    
+    def scope(self, name:str) -> Union[ProfileScope, NullScope]:
+        if self.frame_start is None:
+            return NULL_SCOPE
+        return ProfileScope(self, name)
+    
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        
+        self.frame_start = time.perf_counter()
+        self.stack = []
+        self.events = []
+        self.scope_sums = {}
+        
+        if self.gpu_timing:
+            # glGenQueries returns an array of ids, glBeginQuery takes an int
+            query = self.free_queries.pop() if len(self.free_queries) > 0 else int(np.ravel(glGenQueries(1))[0])
+            glBeginQuery(GL_TIME_ELAPSED, query)
+            self.pending_queries.append((query, self.frame_count % self.capacity, self.frame_start))
+    
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        
+        end = time.perf_counter()
+        idx = self.frame_count % self.capacity
+        
+        self.frame_times[idx] = end - self.frame_start
+        self.gpu_times[idx] = np.nan
+        for path, times in self.scope_times.items():
+            times[idx] = 0
+        for path, duration in self.scope_sums.items():
+            if path not in self.scope_times:
+                self.scope_times[path] = np.zeros(self.capacity)
+            self.scope_times[path][idx] = duration
+        
+        self.frames.append((self.frame_count, self.frame_start, self.events))
+        
+        if self.gpu_timing:
+            glEndQuery(GL_TIME_ELAPSED)
+        self.read_gpu_queries()
+        
+        self.frame_count += 1
+        self.frame_start = None
+    
+    def read_gpu_queries(self):
+        """store results of finished queries, in order of frames"""
+        while len(self.pending_queries) > 0:
+            query, idx, frame_start = self.pending_queries[0]
+            if not glGetQueryObjectiv(query, GL_QUERY_RESULT_AVAILABLE):
+                break
+            
+            self.pending_queries.popleft()
+            if self.get_query_result is not None:
+                self.get_query_result(query, GL_QUERY_RESULT, ctypes.byref(self.query_result))
+                gpu_time = self.query_result.value / 1e9
+                # the GPU can't take longer than the time since the frame was submitted,
+                # some drivers (llvmpipe) return garbage for the first query of a context
+                self.gpu_times[idx] = gpu_time if gpu_time <= time.perf_counter() - frame_start else np.nan
+            else:
+                self.gpu_times[idx] = 0
+            self.free_queries.append(query)
+    
+    def recorded_frames(self) -> int:
+        return min(self.frame_count, self.capacity)
+    
+    def percentiles(self, times:np.ndarray) -> Tuple[float, float, float]:
+        """p50, p95, p99 of times of recorded frames in milliseconds"""
+        times = times[:self.recorded_frames()]
+        times = times[~np.isnan(times)]
+        if len(times) == 0:
+            return (np.nan, np.nan, np.nan)
+        return tuple(np.percentile(times, [50, 95, 99]) * 1000)
+    
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """mean and p50/p95/p99 in milliseconds of the frame, GPU and every scope of recorded frames"""
+        def times_dict(times):
+            p50, p95, p99 = self.percentiles(times)
+            times = times[:self.recorded_frames()]
+            times = times[~np.isnan(times)]
+            mean = times.mean() * 1000 if len(times) > 0 else np.nan
+            return {"mean_ms": float(mean), "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99)}
+        
+        result = {"frame": times_dict(self.frame_times)}
+        if self.gpu_timing:
+            result["gpu"] = times_dict(self.gpu_times)
+        for path in sorted(self.scope_times.keys()):
+            result[path] = times_dict(self.scope_times[path])
+        return result
+    
+    def summary(self) -> str:
+        frames = self.recorded_frames()
+        if frames == 0:
+            return "Frame profile: no frames"
+        
+        p50, p95, p99 = self.percentiles(self.frame_times)
+        lines = [f"Frame profile of {frames} frames: p50 {p50:.2f}ms, p95 {p95:.2f}ms, p99 {p99:.2f}ms"]
+        if self.gpu_timing:
+            p50, p95, p99 = self.percentiles(self.gpu_times)
+            lines.append(f"  gpu: p50 {p50:.2f}ms, p95 {p95:.2f}ms, p99 {p99:.2f}ms")
+        
+        for path in sorted(self.scope_times.keys()):
+            times = self.scope_times[path][:frames]
+            depth = path.count("/")
+            lines.append(f"  {'  ' * depth}{path.split('/')[-1]}: mean {times.mean() * 1000:.2f}ms, p99 {np.percentile(times, 99) * 1000:.2f}ms")
+        
+        return "\n".join(lines)
+    
+    def dump_chrome_trace(self, file_path:str):
+        """write recorded frames as Chrome trace event JSON (chrome://tracing, Perfetto)
+        
+        Scopes of the CPU are on thread 0. GPU time of a frame is on thread 1 from the start of the frame,
+        the query measures its duration only.
+        """
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": 0, "tid": 0, "args": {"name": "CPU"}},
+            {"name": "thread_name", "ph": "M", "pid": 0, "tid": 1, "args": {"name": "GPU"}},
+        ]
+        
+        def us(t):
+            return (t - self.origin) * 1e6
+        
+        for frame, frame_start, frame_events in self.frames:
+            idx = frame % self.capacity
+            
+            events.append({"name": "frame", "cat": "frame", "ph": "X", "pid": 0, "tid": 0, "ts": us(frame_start), "dur": self.frame_times[idx] * 1e6, "args": {"frame": frame}})
+            for path, start, duration in frame_events:
+                events.append({"name": path.split("/")[-1], "cat": "cpu", "ph": "X", "pid": 0, "tid": 0, "ts": us(start), "dur": duration * 1e6, "args": {"path": path}})
+            
+            if not np.isnan(self.gpu_times[idx]):
+                events.append({"name": "gpu frame", "cat": "gpu", "ph": "X", "pid": 0, "tid": 1, "ts": us(frame_start), "dur": self.gpu_times[idx] * 1e6, "args": {"frame": frame}})
+        
+        with open(file_path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    
+    def destroy(self):
+        queries = self.free_queries + [q for q, _, _ in self.pending_queries]
+        if len(queries) > 0:
+            glDeleteQueries(len(queries), np.array(queries, dtype=np.uint32))
+        self.free_queries = []
+        self.pending_queries.clear()
+
+
+profiler = FrameProfiler()
\ No newline at end of file
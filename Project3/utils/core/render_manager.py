@@ -1,15 +1,21 @@
-from typing import Dict
+from typing import Dict, List, Tuple, Union
+import ctypes
 from enum import Enum
+from dataclasses import dataclass
 
 from OpenGL.GL import *
 import glm
 import numpy as np
 
 from ..object import BaseObject
-from ..object import ShaderType
+from ..object import ShaderType, VertexObjectInfo, mesh_registry
+from ..object.vertex_object import rewrite_buffer
 from ..shader import Shader
 from .screen import Screen
 from .camera import CameraHelper
+from .frame_data import FrameData
+from .profiler import profiler
+from .gl_trace import gl_tracer
 
 
 class PolygonMode(Enum):
@@ -17,19 +23,88 @@ class PolygonMode(Enum):
     SOLID = 1
     
     
+@dataclass
+class DrawPacket:
+    """One draw call submitted to the render queue"""
+    vertices_info: VertexObjectInfo
+    shader: Shader
+    M: glm.mat4
+    material_color: Tuple[float, float, float]
+    # texture buffer of joint matrices, for ShaderType.PALETTE_PHONG
+    joint_palette: Union[int, None] = None
+    # name of the object, for gl_tracer
+    name: str = ""
+    
+    def sort_key(self):
+        return (self.shader.program, self.vertices_info.VAO, self.material_color)
+    
+    
+@dataclass
+class RenderStats:
+    """GL state changes of one flushed frame of the render queue"""
+    packets: int = 0
+    program_changes: int = 0
+    vao_changes: int = 0
+    polygon_mode_changes: int = 0
+    draw_calls: int = 0
+    instanced_draws: int = 0
+    
+    def state_changes(self):
+        return self.program_changes + self.vao_changes + self.polygon_mode_changes
+    
+    def saved(self):
+        # RenderManager.draw sets polygon mode, program and VAO for every object
+        return self.packets * 3 - self.state_changes()
+    
+    def __str__(self) -> str:
+        return f"draws: {self.packets} objects in {self.draw_calls} calls ({self.instanced_draws} instanced), state changes: {self.state_changes()} (program: {self.program_changes}, VAO: {self.vao_changes}, polygon mode: {self.polygon_mode_changes}), saved: {self.saved()}"
+    
+    
 class RenderManager:
-    def __init__(self, shaders: Dict[ShaderType, Shader], screen: Screen, camera: CameraHelper) -> None:
+    # floats of per instance attributes, model matrix (4 columns) and material color
+    INSTANCE_FLOATS = 16 + 3
+    
+    def __init__(self, shaders: Dict[ShaderType, Shader], screen: Screen, camera: CameraHelper, instanced_shaders: Union[Dict[ShaderType, Shader], None] = None) -> None:
         self.shaders = shaders
+        self.instanced_shaders = instanced_shaders if instanced_shaders is not None else {}
         self.screen = screen
         self.camera = camera
         
         self.polygon_mode = PolygonMode.SOLID
         
+        # camera and lights of the frame, shared by all shaders
+        self.frame_data = FrameData()
+        
+        # objects are submitted to packets while updating a frame, and drawn sorted by state at flush
+        self.use_render_queue = True
+        self.packets: List[DrawPacket] = []
+        self.stats = RenderStats()
+        
+        # packets of the same mesh with an instanced shader are drawn with one instanced draw call,
+        # if there are at least min_instances of them
+        self.use_instancing = True
+        self.min_instances = 2
+        self.instance_VBO = None
+        
     def init_renderer(self):
         for type, shader in self.shaders.items():
             shader.init_shader()
+        for type, shader in self.instanced_shaders.items():
+            shader.init_shader()
+        self.frame_data.init()
+    
+    def begin_frame(self):
+        """write camera and lights of this frame to the uniform buffer of FrameData, before anything is drawn"""
+        self.frame_data.update(self.screen, self.camera)
         
     def draw(self, object:BaseObject):
+        """draw object and its children immediately"""
+        with profiler.scope("draw"):
+            self.draw_object(object)
+        gl_tracer.current_object = None
+        
+    def draw_object(self, object:BaseObject):
+        gl_tracer.current_object = object.name
         if (self.polygon_mode == PolygonMode.SOLID):
             glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
         else:
@@ -37,33 +112,195 @@ class RenderManager:
         
         vertices_info = object.draw_info()
         
-        VP = self.screen.get_projection_matrix() * self.camera.get_view_matrix()
-        M = object.get_transform_matrix()
-        MVP = VP * M
+        # mesh is not loaded or uploaded yet
+        if vertices_info is None or vertices_info.VAO is None:
+            for c in object.children:
+                self.draw_object(c)
+            return
         
         shader = self.shaders[vertices_info.shader_type]
         glUseProgram(shader.program)
         
-        glUniformMatrix4fv(shader.get_uniform_loc("MVP"), 1, GL_FALSE, glm.value_ptr(MVP))
-        if vertices_info.shader_type == ShaderType.PHONG:
+        if vertices_info.shader_type == ShaderType.PALETTE_PHONG:
+            self.bind_joint_palette(shader, object.joint_palette)
+        else:
+            M = object.get_transform_matrix()
             glUniformMatrix4fv(shader.get_uniform_loc("M"), 1, GL_FALSE, glm.value_ptr(M))
-            camera_pos = self.camera.get_camera_pos()
-            glUniform3f(shader.get_uniform_loc("view_pos"), camera_pos.x, camera_pos.y, camera_pos.z)
+        if vertices_info.shader_type in (ShaderType.PHONG, ShaderType.PALETTE_PHONG):
             glUniform3f(shader.get_uniform_loc("material_color"), object.material_color.r, object.material_color.g, object.material_color.b)
             
         glBindVertexArray(vertices_info.VAO)
-        glDrawArrays(vertices_info.type, 0, vertices_info.vertices_num)
+        if vertices_info.indices_arr is not None:
+            glDrawElements(vertices_info.type, vertices_info.indices_num, GL_UNSIGNED_INT, None)
+        else:
+            glDrawArrays(vertices_info.type, 0, vertices_info.vertices_num)
+        
+        for c in object.children:
+            self.draw_object(c)
+        
+    def submit(self, object:BaseObject):
+        """add draw packets of object and its children to the render queue"""
+        vertices_info = object.draw_info()
+        
+        if vertices_info is not None and vertices_info.VAO is not None:
+            self.packets.append(DrawPacket(
+                vertices_info,
+                self.shaders[vertices_info.shader_type],
+                object.get_transform_matrix(),
+                (object.material_color.r, object.material_color.g, object.material_color.b),
+                object.joint_palette if vertices_info.shader_type == ShaderType.PALETTE_PHONG else None,
+                object.name
+            ))
         
         for c in object.children:
-            self.draw(c)
+            self.submit(c)
+    
+    def flush(self):
+        """draw submitted packets sorted by shader program, VAO and material, 
+        and skip GL calls which set the same state again
+        """
+        packets = sorted(self.packets, key=DrawPacket.sort_key)
+        self.packets = []
+        
+        self.frame_stats = RenderStats(len(packets))
+        
+        if len(packets) > 0:
+            if (self.polygon_mode == PolygonMode.SOLID):
+                glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+            else:
+                glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
+            self.frame_stats.polygon_mode_changes += 1
+        
+        self.cur_program = None
+        self.cur_VAO = None
+        self.cur_material_color = None
+        
+        i = 0
+        while i < len(packets):
+            packet = packets[i]
+            
+            # packets of the same mesh are next to each other after sorting
+            j = i + 1
+            if self.use_instancing and packet.vertices_info.shader_type in self.instanced_shaders:
+                while j < len(packets) and packets[j].shader is packet.shader and packets[j].vertices_info.VAO == packet.vertices_info.VAO:
+                    j += 1
+                
+            if j - i >= self.min_instances:
+                self.draw_instanced(packets[i:j])
+            else:
+                for k in range(i, j):
+                    self.draw_packet(packets[k])
+            i = j
+            
+        gl_tracer.current_object = None
+        self.stats = self.frame_stats
+            
+    def use_program(self, shader:Shader):
+        if shader.program == self.cur_program:
+            return
+            
+        glUseProgram(shader.program)
+        self.frame_stats.program_changes += 1
+        self.cur_program = shader.program
+        self.cur_material_color = None
+    
+    def bind_VAO(self, VAO:int):
+        if VAO == self.cur_VAO:
+            return
+        
+        glBindVertexArray(VAO)
+        self.frame_stats.vao_changes += 1
+        self.cur_VAO = VAO
+    
+    def draw_packet(self, packet:DrawPacket):
+        gl_tracer.current_object = packet.name
+        shader = packet.shader
+        vertices_info = packet.vertices_info
+        is_phong = vertices_info.shader_type in (ShaderType.PHONG, ShaderType.PALETTE_PHONG)
+        
+        self.use_program(shader)
+        
+        if vertices_info.shader_type == ShaderType.PALETTE_PHONG:
+            self.bind_joint_palette(shader, packet.joint_palette)
+        else:
+            glUniformMatrix4fv(shader.get_uniform_loc("M"), 1, GL_FALSE, glm.value_ptr(packet.M))
+        if is_phong:
+            if packet.material_color != self.cur_material_color:
+                glUniform3f(shader.get_uniform_loc("material_color"), *packet.material_color)
+                self.cur_material_color = packet.material_color
+        
+        self.bind_VAO(vertices_info.VAO)
+        
+        if vertices_info.indices_arr is not None:
+            glDrawElements(vertices_info.type, vertices_info.indices_num, GL_UNSIGNED_INT, None)
+        else:
+            glDrawArrays(vertices_info.type, 0, vertices_info.vertices_num)
+        self.frame_stats.draw_calls += 1
+    
+    def bind_joint_palette(self, shader:Shader, joint_palette:int):
+        """set texture buffer of joint matrices (see ShaderType.PALETTE_PHONG) to texture unit 0"""
+        glActiveTexture(GL_TEXTURE0)
+        glBindTexture(GL_TEXTURE_BUFFER, joint_palette)
+        glUniform1i(shader.get_uniform_loc("joint_palette"), 0)
+    
+    def draw_instanced(self, packets:List[DrawPacket]):
+        """draw packets of one mesh with one instanced draw call"""
+        vertices_info = packets[0].vertices_info
+        shader = self.instanced_shaders[vertices_info.shader_type]
+        if gl_tracer.installed:
+            gl_tracer.current_object = f"{packets[0].name} (x{len(packets)})"
+        
+        # model matrices are column-major in glm.array, the same as mat4 attribute columns
+        instance_data = np.empty((len(packets), RenderManager.INSTANCE_FLOATS), dtype=np.float32)
+        instance_data[:, :16] = np.frombuffer(glm.array([p.M for p in packets]).to_bytes(), dtype=np.float32).reshape(-1, 16)
+        instance_data[:, 16:] = [p.material_color for p in packets]
+        
+        self.use_program(shader)
+        
+        self.bind_VAO(vertices_info.VAO)
+        self.init_instance_attributes(vertices_info)
+        
+        rewrite_buffer(GL_ARRAY_BUFFER, self.instance_VBO, instance_data, GL_STREAM_DRAW)
+        
+        if vertices_info.indices_arr is not None:
+            glDrawElementsInstanced(vertices_info.type, vertices_info.indices_num, GL_UNSIGNED_INT, None, len(packets))
+        else:
+            glDrawArraysInstanced(vertices_info.type, 0, vertices_info.vertices_num, len(packets))
+        self.frame_stats.draw_calls += 1
+        self.frame_stats.instanced_draws += 1
+    
+    def init_instance_attributes(self, vertices_info:VertexObjectInfo):
+        """set per instance attributes (location 2 ~ 6) of the bound VAO of the mesh, reading from instance_VBO"""
+        mesh = mesh_registry.get(vertices_info)
+        if mesh is None or mesh.instanced:
+            return
+        
+        if self.instance_VBO is None:
+            self.instance_VBO = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_VBO)
+        
+        stride = RenderManager.INSTANCE_FLOATS * glm.sizeof(glm.float32)
+        for i in range(4):
+            glEnableVertexAttribArray(2 + i)
+            glVertexAttribPointer(2 + i, 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(4 * i * glm.sizeof(glm.float32)))
+            glVertexAttribDivisor(2 + i, 1)
+        
+        glEnableVertexAttribArray(6)
+        glVertexAttribPointer(6, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(16 * glm.sizeof(glm.float32)))
+        glVertexAttribDivisor(6, 1)
+        
+        mesh.instanced = True
         
     def draw_grid(self, object:BaseObject, gap:float, line_num:int, drop_center:bool=False):
+        gl_tracer.current_object = object.name
         if (self.polygon_mode == PolygonMode.SOLID):
             glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
         else:
             glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
         
         vertices_info = object.draw_info()
+        if vertices_info is None or vertices_info.VAO is None:
+            return
         
         START = glm.translate(glm.vec3(-gap*line_num, 0, 0))
         
@@ -72,9 +309,6 @@ class RenderManager:
         
         W = START
         
-        VP = self.screen.get_projection_matrix() * self.camera.get_view_matrix()
-        MVP = VP * W
-        
         shader = self.shaders[vertices_info.shader_type]
         glUseProgram(shader.program)
         
@@ -84,13 +318,12 @@ class RenderManager:
             if drop_center and i == line_num:
                 W = T * W
                 continue
-            MVP = VP*W
-            glUniformMatrix4fv(shader.get_uniform_loc("MVP"), 1, GL_FALSE, glm.value_ptr(MVP))
+            glUniformMatrix4fv(shader.get_uniform_loc("M"), 1, GL_FALSE, glm.value_ptr(W))
             glDrawArrays(vertices_info.type, 0, vertices_info.vertices_num)
-            MVP = VP*R*W
-            glUniformMatrix4fv(shader.get_uniform_loc("MVP"), 1, GL_FALSE, glm.value_ptr(MVP))
+            glUniformMatrix4fv(shader.get_uniform_loc("M"), 1, GL_FALSE, glm.value_ptr(R*W))
             glDrawArrays(vertices_info.type, 0, vertices_info.vertices_num)
             W = T * W
+        gl_tracer.current_object = None
 
     def toggle_polygon_mode(self):
         if (self.polygon_mode == PolygonMode.SOLID):
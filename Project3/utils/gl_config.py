@@ -0,0 +1,29 @@
+import os
+import sys
+
+# GL_MODE is debug or release, chosen by GRAPHICS_MODE environment variable (debug by default)
+# - debug: PyOpenGL checks glGetError after every call, logs errors and checks sizes of arrays
+# - release: no error checking, logging and array size checks, and the GL functions called for every draw
+#   are raw ctypes functions of the driver (see core.raw_gl), for less Python overhead per draw
+GL_MODE = os.environ.get("GRAPHICS_MODE", "debug")
+if GL_MODE not in ("debug", "release"):
+    raise Exception(f"GRAPHICS_MODE is debug or release, not {GL_MODE}")
+RELEASE = GL_MODE == "release"
+
+
+def configure_opengl():
+    """set flags of PyOpenGL for GL_MODE, they are read when OpenGL.GL is first imported"""
+    import OpenGL
+    
+    if "OpenGL.GL" in sys.modules and RELEASE:
+        print("GRAPHICS_MODE=release: OpenGL.GL was imported before utils, error checking stays on")
+    
+    OpenGL.ERROR_CHECKING = not RELEASE
+    OpenGL.ERROR_LOGGING = not RELEASE
+    OpenGL.ARRAY_SIZE_CHECKING = not RELEASE
+    
+    if RELEASE and os.environ.get("PYOPENGL_PLATFORM") == "egl":
+        # EGL functions of PyOpenGL 3.1 look up _error_checker, which is only defined with ERROR_CHECKING
+        import OpenGL.raw.EGL._errors as egl_errors
+        if not hasattr(egl_errors, "_error_checker"):
+            egl_errors._error_checker = None
\ No newline at end of file
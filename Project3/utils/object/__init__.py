@@ -1,3 +1,7 @@
-from .base_object import BaseObject
+from .base_object import BaseObject, TransformStats, transform_stats
 from .obj_loader import OBJLoader
-from .vertex_object import VertexAttribute, ShaderType, VertexObjectInfo, VertexObjectHelper
\ No newline at end of file
+from .vertex_object import VertexAttribute, ShaderType, VertexObjectInfo, VertexObjectHelper
+from .mesh_cache import MeshCache
+from .scene_graph import SceneArrays, SceneObject
+from .mesh_registry import MeshRegistry, mesh_registry
+from .asset_loader import AssetLoader, asset_loader
\ No newline at end of file
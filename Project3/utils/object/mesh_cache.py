@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from typing import Union, Tuple, Dict, Any, TYPE_CHECKING
+import os, json, hashlib
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .vertex_object import VertexObjectInfo
+
+
+class MeshCache:
+    """MeshCache stores the vertex (and index) buffers built from an .obj file as raw binary data,
+    so the file doesn't have to be parsed again on the next start.
+    
+    For 'models/burger/cheese.obj' two files are written in 'models/burger/__meshcache__/'
+    (or in MeshCache.cache_dir with a hash of the model path in the file names, if it is set)
+    
+    - cheese.obj.indexed.json: header with the layout of buffers, shader type and the source file info
+    - cheese.obj.indexed.bin: float32 interleaved vertices followed by uint32 indices
+    
+    The .bin file is memory-mapped on load and handed to glBufferData as it is.
+    A cache is used only when the source file has the same size and either the same mtime or,
+    if mtime has changed, the same content hash.
+    """
+    VERSION = 1
+    DIR_NAME = "__meshcache__"
+    
+    enabled: bool = True
+    rebuild: bool = False
+    cache_dir: Union[str, None] = None
+    
+    hits: int = 0
+    misses: int = 0
+    
+    @staticmethod
+    def get_cache_paths(file_path:str, indexed:bool) -> Tuple[str, str]:
+        name = os.path.basename(file_path)
+        
+        cache_dir = MeshCache.cache_dir
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(file_path)), MeshCache.DIR_NAME)
+        else:
+            # models from different directories can have the same file name
+            name = f"{name}.{hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()[:8]}"
+        
+        base = os.path.join(cache_dir, f"{name}.{'indexed' if indexed else 'soup'}")
+        return base + ".json", base + ".bin"
+    
+    @staticmethod
+    def file_hash(file_path:str) -> str:
+        with open(file_path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    
+    @staticmethod
+    def load(file_path:str, indexed:bool) -> Union[VertexObjectInfo, None]:
+        """Return VertexObjectInfo with memory-mapped buffers, or None if there is no valid cache"""
+        from .vertex_object import VertexObjectInfo, VertexAttribute, ShaderType
+        
+        header_path, data_path = MeshCache.get_cache_paths(file_path, indexed)
+        
+        if MeshCache.rebuild:
+            MeshCache.misses += 1
+            return None
+        
+        try:
+            with open(header_path, "r") as f:
+                header = json.load(f)
+            stat = os.stat(file_path)
+        except (OSError, ValueError):
+            MeshCache.misses += 1
+            return None
+        
+        if not MeshCache._is_valid(header, header_path, file_path, stat):
+            MeshCache.misses += 1
+            return None
+        
+        try:
+            data = np.memmap(data_path, dtype=np.uint8, mode="r")
+        except (OSError, ValueError):
+            MeshCache.misses += 1
+            return None
+        
+        vertices_nbytes = header["vertices_nbytes"]
+        if len(data) != vertices_nbytes + header["indices_nbytes"]:
+            MeshCache.misses += 1
+            return None
+        
+        MeshCache.hits += 1
+        
+        return VertexObjectInfo(
+            vertices_arr=data[:vertices_nbytes].view(np.float32),
+            vertices_num=header["vertices_num"],
+            dimension=header["dimension"],
+            type=header["type"],
+            enabled_attr=VertexAttribute(header["enabled_attr"]),
+            shader_type=ShaderType[header["shader_type"]],
+            indices_arr=data[vertices_nbytes:].view(np.uint32) if header["indices_num"] > 0 else None,
+            indices_num=header["indices_num"]
+        )
+    
+    @staticmethod
+    def save(file_path:str, indexed:bool, vertex_obj_info:VertexObjectInfo):
+        header_path, data_path = MeshCache.get_cache_paths(file_path, indexed)
+        
+        vertices = np.ascontiguousarray(vertex_obj_info.vertices_arr, dtype=np.float32)
+        indices = np.zeros(0, dtype=np.uint32)
+        if vertex_obj_info.indices_arr is not None:
+            indices = np.ascontiguousarray(vertex_obj_info.indices_arr, dtype=np.uint32)
+        
+        try:
+            stat = os.stat(file_path)
+            header: Dict[str, Any] = {
+                "version": MeshCache.VERSION,
+                "source": {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "sha1": MeshCache.file_hash(file_path)
+                },
+                "shader_type": vertex_obj_info.shader_type.name,
+                "type": int(vertex_obj_info.type),
+                "dimension": vertex_obj_info.dimension,
+                "enabled_attr": vertex_obj_info.enabled_attr.value,
+                "vertices_num": vertex_obj_info.vertices_num,
+                "vertices_nbytes": vertices.nbytes,
+                "indices_num": vertex_obj_info.indices_num,
+                "indices_nbytes": indices.nbytes
+            }
+            
+            os.makedirs(os.path.dirname(header_path), exist_ok=True)
+            
+            # write the data first and replace files atomically, a half written cache is never read
+            with open(data_path + ".tmp", "wb") as f:
+                f.write(vertices.tobytes())
+                f.write(indices.tobytes())
+            os.replace(data_path + ".tmp", data_path)
+            
+            MeshCache._write_header(header_path, header)
+        except OSError as e:
+            print(f"Failed to write mesh cache of {file_path}: {e}")
+    
+    @staticmethod
+    def _is_valid(header:Dict[str, Any], header_path:str, file_path:str, stat:os.stat_result) -> bool:
+        if header.get("version") != MeshCache.VERSION:
+            return False
+        
+        source = header["source"]
+        if source["size"] != stat.st_size:
+            return False
+        
+        if source["mtime_ns"] == stat.st_mtime_ns:
+            return True
+        
+        # file was touched, so check whether the content has really changed
+        if source["sha1"] != MeshCache.file_hash(file_path):
+            return False
+        
+        source["mtime_ns"] = stat.st_mtime_ns
+        try:
+            MeshCache._write_header(header_path, header)
+        except OSError:
+            pass
+        return True
+    
+    @staticmethod
+    def _write_header(header_path:str, header:Dict[str, Any]):
+        with open(header_path + ".tmp", "w") as f:
+            json.dump(header, f, indent=4)
+        os.replace(header_path + ".tmp", header_path)
+    
+    @staticmethod
+    def clear_stats():
+        MeshCache.hits = 0
+        MeshCache.misses = 0
\ No newline at end of file
@@ -1,18 +1,22 @@
 from dataclasses import dataclass, astuple # module
+import os, ctypes
 from typing import List, Tuple, Union # module
 from enum import Flag, auto, Enum
 
 from OpenGL.GL import *
 from glfw.GLFW import *
 import glm
+import numpy as np
 
 from ..struct import Color, Point, ObjectFaces, Vertex3D, Vec3D, PointWithNormal
 from .obj_loader import OBJLoader
+from .mesh_cache import MeshCache
 
 class VertexAttribute(Flag):
     VERTEX = auto()
     COLOR = auto()
     NORMAL = auto()
+    JOINT = auto()      # index of the joint in the joint palette, in the first component
     
     def __len__(self) -> int:
         return bin(self._value_).count('1')
@@ -21,16 +25,38 @@ class ShaderType(Enum):
     BASIC = 0
     FRAME = 1
     PHONG = 2
+    PALETTE_PHONG = 3   # phong with model matrix read from the joint palette by JOINT attribute
 
 @dataclass
 class VertexObjectInfo():
-    vertices_arr:glm.array
+    vertices_arr:Union[glm.array, np.ndarray]
     vertices_num:int
     dimension:int
     type:Constant
     enabled_attr:VertexAttribute=VertexAttribute(0)
     VAO:Union[int, None]=None
     shader_type:ShaderType=ShaderType.BASIC
+    indices_arr:Union[glm.array, np.ndarray, None]=None
+    indices_num:int=0
+    source:Union[str, None]=None    # meshes with the same source share GPU buffers (see MeshRegistry)
+    dynamic:bool=False              # vertices are rewritten every frame (see MeshRegistry.update_vertices)
+    
+
+def buffer_ptr(arr:Union[glm.array, np.ndarray]):
+    """Pointer to the data of glm.array or (memory-mapped) numpy array, to pass it to glBufferData without copy"""
+    if isinstance(arr, np.ndarray):
+        return ctypes.c_void_p(arr.ctypes.data)
+    return arr.ptr
+
+def rewrite_buffer(target:Constant, buffer:int, arr:Union[glm.array, np.ndarray], usage:Constant=GL_DYNAMIC_DRAW):
+    """Replace the data of buffer (bound to target, and left bound) with arr, of any size
+    
+    The previous data is orphaned by glBufferData without data before arr is written with glBufferSubData,
+    so the driver allocates new storage instead of waiting for draws still reading the previous data
+    """
+    glBindBuffer(target, buffer)
+    glBufferData(target, arr.nbytes, None, usage)
+    glBufferSubData(target, 0, arr.nbytes, buffer_ptr(arr))
     
 
 class VertexObjectHelper():
@@ -38,24 +64,69 @@ class VertexObjectHelper():
         pass
     
     @staticmethod
-    def points(points: List[Point], has_color: bool=False, drawtype: Constant=GL_POINTS):
-        if (len(points) == 0):
-            raise Exception("No points in parameter")
+    def from_array(
+        vertices: np.ndarray, 
+        drawtype: Constant, 
+        enabled_attr: VertexAttribute, 
+        shader_type: ShaderType=ShaderType.BASIC, 
+        dimension: int=3
+    ):
+        """return VertexObjectInfo instance of (N x K) vertex array, one row per vertex
+        with every enabled attribute of the vertex (eg. x, y, z, r, g, b)
+        
+        The array is converted to a flat float32 buffer with at most one copy 
+        (no copy if it is already C-contiguous float32), and passed to glBufferData as it is
+        """
+        vertices = np.asarray(vertices)
+        if vertices.ndim != 2 or vertices.shape[1] != dimension * len(enabled_attr):
+            raise Exception(f"Vertex array of shape {vertices.shape} does not match {enabled_attr} with dimension {dimension}")
         
-        points_vertex_arr = glm.array(glm.float32, *(points[0].data(has_color))) # type: ignore
-        for p in points[1:]:
-            points_vertex_arr = points_vertex_arr.concat(glm.array(glm.float32, *(p.data(has_color))))
-            
         vertex_obj_info = VertexObjectInfo (
-            vertices_arr=points_vertex_arr,
-            vertices_num=len(points),
-            dimension=3,
+            vertices_arr=np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1),
+            vertices_num=len(vertices),
+            dimension=dimension,
             type=drawtype,
-            enabled_attr=VertexAttribute.VERTEX | VertexAttribute.COLOR if has_color else VertexAttribute.VERTEX
+            enabled_attr=enabled_attr,
+            shader_type=shader_type
         )
         
         return vertex_obj_info
     
+    @staticmethod
+    def points(points: Union[List[Point], np.ndarray], has_color: bool=False, drawtype: Constant=GL_POINTS):
+        """return VertexObjectInfo instance of points
+        
+        Parameters
+        ----------
+        points : List[Point] | np.ndarray
+            list of Point, or (N x 3) array of positions / (N x 6) array of positions and colors
+        has_color : bool, optional
+            add color attribute of each point (white for N x 3 array), by default False
+        drawtype : Constant, optional
+            primitive type to draw points with, by default GL_POINTS
+        """
+        if (len(points) == 0):
+            raise Exception("No points in parameter")
+        
+        if isinstance(points, np.ndarray):
+            vertices = points
+            if has_color and vertices.shape[1] == 3:
+                vertices = np.empty((len(points), 6), dtype=np.float32)
+                vertices[:, :3] = points
+                vertices[:, 3:] = astuple(Color.WHITE())
+        else:
+            vertices = np.array([p.data(has_color) for p in points], dtype=np.float32)
+            
+        # only positions are in the buffer when color attribute is disabled
+        if not has_color:
+            vertices = vertices[:, :3]
+        
+        return VertexObjectHelper.from_array(
+            vertices, 
+            drawtype, 
+            VertexAttribute.VERTEX | VertexAttribute.COLOR if has_color else VertexAttribute.VERTEX
+        )
+    
     @staticmethod
     def cube_phong():
         points = [
@@ -108,18 +179,13 @@ class VertexObjectHelper():
             PointWithNormal(-.5, -.5, -.5, Point(-1, 0, 0)),
         ]
         
-        points_vertex_arr = glm.array(glm.float32, *(points[0].data())) # type: ignore
-        for p in points[1:]:
-            points_vertex_arr = points_vertex_arr.concat(glm.array(glm.float32, *(p.data())))
-            
-        vertex_obj_info = VertexObjectInfo (
-            vertices_arr=points_vertex_arr,
-            vertices_num=len(points),
-            dimension=3,
-            type=GL_TRIANGLES,
-            enabled_attr=VertexAttribute.VERTEX | VertexAttribute.NORMAL,
+        vertex_obj_info = VertexObjectHelper.from_array(
+            np.array([p.data() for p in points], dtype=np.float32),
+            GL_TRIANGLES,
+            VertexAttribute.VERTEX | VertexAttribute.NORMAL,
             shader_type=ShaderType.PHONG
         )
+        vertex_obj_info.source = "cube_phong"
         
         return vertex_obj_info
     
@@ -203,49 +269,98 @@ class VertexObjectHelper():
         return grid_vertices
     
     @staticmethod
-    def from_obj_file(file_path):
-        obj_faces = OBJLoader.parse_opj_file(file_path)
-        vertices = OBJLoader.obj_to_vertices(obj_faces)
-        
-        shader_type = ShaderType.BASIC if vertices[0].normal == None else ShaderType.PHONG
-        
-        vertex_arr = None
-        v_value = []
-        
-        if shader_type == ShaderType.BASIC:
-            v_value.extend(vertices[0].position.data())
-            v_value.extend(list(astuple(Color.WHITE())))
-            for v in vertices[1:]:
-                v_value.extend(v.position.data())
-                v_value.extend(list(astuple(Color.WHITE())))
-            vertex_arr = glm.array(glm.float32, *v_value) # type: ignore
-                
-        elif shader_type == ShaderType.PHONG:
-            v_value.extend(vertices[0].position.data())
-            v_value.extend(vertices[0].normal.data()) # type: ignore
-            for v in vertices[1:]:
-                v_value.extend(v.position.data())
-                v_value.extend(v.normal.data()) # type: ignore
-            vertex_arr = glm.array(glm.float32, *v_value) # type: ignore
-                
+    def from_obj_file(file_path, print_info:bool=True, indexed:bool=True):
+        """return VertexObjectInfo instance of the triangles in .obj file
+
+        Parameters
+        ----------
+        file_path : str
+            .obj file path
+        print_info : bool, optional
+            print the information of obj file, by default True
+        indexed : bool, optional
+            corners with the same (position, normal) share one vertex and triangles are drawn 
+            with an index buffer (glDrawElements), by default True. 
+            Every triangle corner gets its own vertex (glDrawArrays) if this is False
+        
+        Buffers are read from MeshCache when it has a valid cache of the file, 
+        and written to it after the file is parsed
+        """
+        source = f"{os.path.abspath(file_path)}:{'indexed' if indexed else 'soup'}"
+        
+        if MeshCache.enabled:
+            cached = MeshCache.load(file_path, indexed)
+            if cached is not None:
+                if print_info:
+                    print(f"Loaded {os.path.basename(file_path)} from mesh cache")
+                cached.source = source
+                return cached
+        
+        obj_arrays = OBJLoader.parse_obj_arrays(file_path, print_info)
+        
+        corners = obj_arrays.triangle_corners().reshape(-1)
+        vertex_idx = obj_arrays.face_vertex_idx[corners]
+        normal_idx = obj_arrays.face_normal_idx[corners]
+        
+        if len(corners) == 0:
+            raise Exception(f"Invalid obj file format. {file_path} has no faces\n")
+        
+        # -1 is a corner without normal, normals[-1] would silently read the last normal
+        no_normal = normal_idx < 0
+        if no_normal.any() and not no_normal.all():
+            raise Exception(f"Invalid obj file format. {file_path} has faces with and without normals\n")
+        
+        shader_type = ShaderType.BASIC if no_normal.all() else ShaderType.PHONG
+        
+        positions = obj_arrays.positions[vertex_idx, :3]
+        if shader_type == ShaderType.PHONG:
+            attributes = obj_arrays.normals[normal_idx]
         else:
-            v_value.extend(vertices[0].position.data())
-            v_value.extend(list(astuple(Color.WHITE())))
-            for v in vertices[1:]:
-                v_value.extend(v.position.data())
-                v_value.extend(list(astuple(Color.WHITE())))
-            vertex_arr = glm.array(glm.float32, *v_value) # type: ignore
+            attributes = np.broadcast_to(np.array(astuple(Color.WHITE()), dtype=np.float32), positions.shape)
+            
+        vertices = np.hstack([positions, attributes])
+        indices = None
+        if indexed:
+            vertices, indices = VertexObjectHelper.deduplicate_vertices(vertices)
+            
+            if print_info:
+                print(f"Indexed vertices: {len(corners)} -> {len(vertices)} ({len(corners) / len(vertices):.1f}x fewer)")
+                print("------------------------------------")
                 
         vertex_obj_info = VertexObjectInfo (
-            vertices_arr=vertex_arr,
+            vertices_arr=np.ascontiguousarray(vertices.reshape(-1), dtype=np.float32),
             vertices_num=len(vertices),
             dimension=3,
             type=GL_TRIANGLES,
             enabled_attr=VertexAttribute.VERTEX | VertexAttribute.COLOR if shader_type != ShaderType.PHONG else VertexAttribute.VERTEX | VertexAttribute.NORMAL,
-            shader_type=shader_type
+            shader_type=shader_type,
+            indices_arr=indices,
+            indices_num=0 if indices is None else len(indices),
+            source=source
         )
         
+        if MeshCache.enabled:
+            MeshCache.save(file_path, indexed, vertex_obj_info)
+        
         return vertex_obj_info
     
+    @staticmethod
+    def deduplicate_vertices(vertices:np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Merge identical rows of (N x K) float32 vertex array.
+        Returns unique vertices in order of first appearance and uint32 index of each original row
+        """
+        # -0.0 and 0.0 have different bytes, so normalize before comparing rows as raw bytes
+        vertices = np.ascontiguousarray(vertices + np.float32(0), dtype=np.float32)
+        rows = vertices.view(np.dtype((np.void, vertices.dtype.itemsize * vertices.shape[1]))).reshape(-1)
+        
+        _, first_idx, inverse = np.unique(rows, return_index=True, return_inverse=True)
+        
+        # np.unique sorts rows by their bytes; restore file order to keep neighbouring triangles close in memory
+        order = np.argsort(first_idx)
+        remap = np.empty_like(order)
+        remap[order] = np.arange(len(order))
+        
+        return vertices[first_idx[order]], remap[inverse.reshape(-1)].astype(np.uint32)
+    
     
     
\ No newline at end of file